@@ -5,8 +5,24 @@ Python port of FaBoGPIO_PCAL6408_Modified.cpp
 Exact equivalent of the Arduino library
 """
 
-import smbus2 as smbus
+# smbus2 is only needed on the device - CANMUX_SIMULATE runs without it
+try:
+    import smbus2 as smbus
+except ImportError:
+    smbus = None
 import time
+from metrics import I2C_SECONDS, I2C_ERRORS
+from sim_backend import SIMULATE, SimulatedSMBus
+from flight_recorder import RECORDER, EV_I2C_READ, EV_I2C_WRITE, EV_I2C_ERROR
+from logger import get_logger
+
+log = get_logger("i2c")
+
+# Metric children resolved once - the I2C path only adds to per-thread cells
+_I2C_READ_SECONDS = I2C_SECONDS.labels("read")
+_I2C_WRITE_SECONDS = I2C_SECONDS.labels("write")
+_I2C_READ_ERRORS = I2C_ERRORS.labels("read")
+_I2C_WRITE_ERRORS = I2C_ERRORS.labels("write")
 
 # Register Addresses (from FaBoGPIO_PCAL6408_Modified.h)
 PCAL6408_OUTPUT_REG = 0x01
@@ -57,10 +73,10 @@ class FaBoGPIO:
         self._i2caddr = addr
         self._output = 0x00
         try:
-            # Wire.begin() equivalent
-            self.bus = smbus.SMBus(i2c_bus)
+            # Wire.begin() equivalent (in-memory bus with CANMUX_SIMULATE)
+            self.bus = SimulatedSMBus(i2c_bus) if SIMULATE else smbus.SMBus(i2c_bus)
         except Exception as e:
-            print(f"Error initializing I2C for address 0x{addr:02X}: {e}")
+            log.error("Error initializing I2C for address 0x%02X: %s", addr, e)
             self.bus = None
     
     def configuration(self):
@@ -84,7 +100,33 @@ class FaBoGPIO:
             self.writeI2c(PCAL6408_CONFIGURATION_REG, conf)
             
         except Exception as e:
-            print(f"Configuration error for device 0x{self._i2caddr:02X}: {e}")
+            log.error("Configuration error for device 0x%02X: %s", self._i2caddr, e)
+    
+    def verifyConfiguration(self):
+        """
+        Read back the registers written by configuration() and setAllClear()
+        (Python addition - the Arduino library has no way to report failures)
+        Returns: None if the device answered with the written values, otherwise the reason
+        """
+        if not self.bus:
+            return f"device 0x{self._i2caddr:02X}: I2C bus not available"
+            
+        try:
+            start = time.perf_counter()
+            conf = self.bus.read_byte_data(self._i2caddr, PCAL6408_CONFIGURATION_REG)
+            output = self.bus.read_byte_data(self._i2caddr, PCAL6408_OUTPUT_REG)
+            _I2C_READ_SECONDS.observe(time.perf_counter() - start)
+            
+        except Exception as e:
+            _I2C_READ_ERRORS.inc()
+            RECORDER.record(EV_I2C_ERROR, self._i2caddr, PCAL6408_CONFIGURATION_REG, 0)
+            return f"device 0x{self._i2caddr:02X}: {e}"
+        
+        # configuration() makes every pin an output (all bits 0)
+        if conf != 0x00 or output != self._output:
+            return (f"device 0x{self._i2caddr:02X}: read back configuration 0x{conf:02X}, "
+                    f"output 0x{output:02X} (expected 0x00, 0x{self._output:02X})")
+        return None
     
     def setDigital(self, port, output):
         """
@@ -103,7 +145,7 @@ class FaBoGPIO:
             self.writeI2c(PCAL6408_OUTPUT_REG, self._output)
             
         except Exception as e:
-            print(f"setDigital error for device 0x{self._i2caddr:02X}: {e}")
+            log.error("setDigital error for device 0x%02X: %s", self._i2caddr, e)
     
     def setAllClear(self):
         """
@@ -118,7 +160,7 @@ class FaBoGPIO:
             self._output = 0x00
             
         except Exception as e:
-            print(f"setAllClear error for device 0x{self._i2caddr:02X}: {e}")
+            log.error("setAllClear error for device 0x%02X: %s", self._i2caddr, e)
     
     def setGPIO(self, output):
         """
@@ -131,7 +173,7 @@ class FaBoGPIO:
             self.writeI2c(PCAL6408_OUTPUT_REG, output)
             
         except Exception as e:
-            print(f"setGPIO error for device 0x{self._i2caddr:02X}: {e}")
+            log.error("setGPIO error for device 0x%02X: %s", self._i2caddr, e)
     
     def scanI2cAll(self):
         """
@@ -146,19 +188,19 @@ class FaBoGPIO:
                 device += 1
                 
             # Debug output (equivalent to Arduino #ifdef debug)
-            # Uncomment for detailed debugging like Arduino version
-            # if error == 0:
-            #     print(f"I2C device found at address 0x{address:02X}")
-            # elif error == 1:
-            #     print(f"Data too long to fit in transmit buffer at address 0x{address:02X}")
-            # elif error == 2:
-            #     print(f"Received NACK on transmit of address 0x{address:02X}")
-            # elif error == 3:
-            #     print(f"Received NACK on transmit of data at address 0x{address:02X}")
-            # elif error == 4:
-            #     print(f"Other error 0x{address:02X}")
-            # elif error == 5:
-            #     print(f"Timeout at 0x{address:02X}")
+            # Enabled with --log-module i2c=DEBUG
+            if error == 0:
+                log.debug("I2C device found at address 0x%02X", address)
+            elif error == 1:
+                log.debug("Data too long to fit in transmit buffer at address 0x%02X", address)
+            elif error == 2:
+                log.debug("Received NACK on transmit of address 0x%02X", address)
+            elif error == 3:
+                log.debug("Received NACK on transmit of data at address 0x%02X", address)
+            elif error == 4:
+                log.debug("Other error 0x%02X", address)
+            elif error == 5:
+                log.debug("Timeout at 0x%02X", address)
         
         return device
     
@@ -194,11 +236,16 @@ class FaBoGPIO:
             
         try:
             # Exact same logic as Arduino code
+            start = time.perf_counter()
             data = self.bus.read_byte_data(self._i2caddr, address)
+            _I2C_READ_SECONDS.observe(time.perf_counter() - start)
+            RECORDER.record(EV_I2C_READ, self._i2caddr, address, data)
             return data
             
         except Exception as e:
-            print(f"readOuputStatus error for device 0x{self._i2caddr:02X}: {e}")
+            _I2C_READ_ERRORS.inc()
+            RECORDER.record(EV_I2C_ERROR, self._i2caddr, address, 0)
+            log.error("readOuputStatus error for device 0x%02X: %s", self._i2caddr, e)
             return 0
     
     def writeI2c(self, address, data):
@@ -210,7 +257,12 @@ class FaBoGPIO:
             
         try:
             # Arduino: Wire.beginTransmission + Wire.write + Wire.endTransmission
+            start = time.perf_counter()
             self.bus.write_byte_data(self._i2caddr, address, data)
+            _I2C_WRITE_SECONDS.observe(time.perf_counter() - start)
+            RECORDER.record(EV_I2C_WRITE, self._i2caddr, address, data)
             
         except Exception as e:
-            print(f"writeI2c error for device 0x{self._i2caddr:02X}, reg 0x{address:02X}: {e}")
\ No newline at end of file
+            _I2C_WRITE_ERRORS.inc()
+            RECORDER.record(EV_I2C_ERROR, self._i2caddr, address, 1)
+            log.error("writeI2c error for device 0x%02X, reg 0x%02X: %s", self._i2caddr, address, e)
\ No newline at end of file
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Bench Suite - repeatable micro and macro benchmarks for the CAN MUX daemon
+Runs on any Linux box with the simulated hardware backend (sim_backend) and
+stores the results as JSON, so a baseline and a change can be compared:
+
+    python3 bench_suite.py run -o baseline.json
+    python3 bench_suite.py run -o change.json
+    python3 bench_suite.py compare baseline.json change.json
+
+Micro benchmarks time one operation in a tight loop (ns/op, median of
+several repeats); macro benchmarks push telegrams through a loopback
+telegram server with telegram_bench
+"""
+
+import os
+
+# The daemon modules choose GPIO/I2C at import time - simulate before importing them
+os.environ.setdefault("CANMUX_SIMULATE", "1")
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import port_extender
+from port_extender import PortExtenderSetPin, MASTER
+from config_manager import ConfigManager
+from ethernet_receive import EthernetReceive, TelegramState
+from telegram_bench import build_telegram, run_benchmark
+
+DEFAULT_REPEATS = 5
+# Relative slowdown reported as a regression by "compare"
+DEFAULT_THRESHOLD = 0.10
+
+class NullSocket:
+    """Client socket stand-in that discards responses"""
+
+    def send(self, data):
+        return len(data)
+
+    sendall = send
+
+    def fileno(self):
+        return -1
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the daemon's status prints while measuring"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+class BenchContext:
+    """Daemon objects shared by the benchmarks, wired to a throwaway config file"""
+
+    def __init__(self, workdir):
+        self.config_manager = ConfigManager(os.path.join(workdir, "can_mux_config.json"))
+        config = dict(self.config_manager.default_config, ip=[127, 0, 0, 1])
+        self.config_manager.save_network_config(config)
+        self.raw_config = config
+
+        port_extender.init_port_extenders()
+        port_extender.InitPortExtender(port_extender.MASTER)
+        port_extender.InitPortExtender(port_extender.SLAVE)
+
+        self.engine = EthernetReceive()
+        self.engine.config = self.config_manager
+        self.null_socket = NullSocket()
+        self.state = TelegramState()
+
+    def feed(self, telegram):
+        """Run one encoded telegram through the byte-level parser"""
+        for byte_val in telegram:
+            self.engine._process_byte(byte_val, self.null_socket, self.state)
+
+    def load_array(self, telegram):
+        """Put a complete telegram into the parse buffer, as the framer leaves it"""
+        state = self.state
+        state.eth_data_array = list(telegram) + [0] * (10 - len(telegram))
+        state.crc_location = len(telegram)
+
+# Micro benchmarks: name -> (description, setup(ctx) -> operation)
+def _frame_firmware(ctx):
+    telegram = build_telegram("firmware")
+    return lambda: ctx.feed(telegram)
+
+def _frame_select(ctx):
+    telegram = build_telegram("select", 0, 3)
+    return lambda: ctx.feed(telegram)
+
+def _frame_status(ctx):
+    telegram = build_telegram("status", 0)
+    return lambda: ctx.feed(telegram)
+
+def _frame_bad_crc(ctx):
+    telegram = build_telegram("select", 0, 3)[:-1] + b"\x00"
+    return lambda: ctx.feed(telegram)
+
+def _crc_check(ctx):
+    ctx.load_array(build_telegram("select", 0, 3))
+    return lambda: ctx.engine.check_sum(ctx.state)
+
+def _response_firmware(ctx):
+    ctx.load_array(build_telegram("firmware"))
+    return lambda: ctx.engine.get_firmware_version(ctx.null_socket, ctx.state)
+
+def _response_error(ctx):
+    return lambda: ctx.engine.eth_error_response(EthernetReceive.ERROR_PAYLOAD_NOK, ctx.null_socket, ctx.state)
+
+def _datagram_firmware(ctx):
+    datagram = build_telegram("firmware")
+    return lambda: ctx.engine._handle_datagram(datagram, ("127.0.0.1", 40000), -1)
+
+def _extender_set_pin(ctx):
+    channels = iter(range(1 << 62))
+    return lambda: PortExtenderSetPin(next(channels) % 9, MASTER)
+
+def _config_read(ctx):
+    return ctx.config_manager.load_network_config
+
+def _config_write(ctx):
+    return lambda: ctx.config_manager.save_network_config(ctx.raw_config)
+
+MICRO_BENCHMARKS = {
+    "frame.firmware": ("Parse + answer GET_FIRMWARE_VERSION byte by byte", _frame_firmware, 20000),
+    "frame.select": ("Parse + switch + answer SELECT_CHANNEL", _frame_select, 5000),
+    "frame.status": ("Parse + read + answer GET_CHANNEL_STATUS", _frame_status, 5000),
+    "frame.bad_crc": ("Parse + reject a telegram with a wrong CRC", _frame_bad_crc, 20000),
+    "crc.check": ("CRC32 over a buffered telegram", _crc_check, 100000),
+    "response.firmware": ("Build + send the firmware version response", _response_firmware, 20000),
+    "response.error": ("Build + send an error response", _response_error, 20000),
+    "datagram.firmware": ("Answer GET_FIRMWARE_VERSION from one UDP datagram", _datagram_firmware, 20000),
+    "extender.set_pin": ("PortExtenderSetPin on the simulated bus", _extender_set_pin, 10000),
+    "config.read": ("ConfigManager.load_network_config", _config_read, 2000),
+    "config.write": ("ConfigManager.save_network_config", _config_write, 500),
+}
+
+# Macro benchmarks: name -> telegram_bench.run_benchmark arguments
+MACRO_BENCHMARKS = {
+    "loopback.closed": dict(connections=1, requests=2000, mix="select=70,status=20,firmware=10"),
+    "loopback.firmware": dict(connections=1, requests=5000, mix="firmware=1"),
+    "loopback.pipelined": dict(connections=1, requests=5000, pipeline=8, mix="select=70,status=20,firmware=10"),
+}
+
+def run_micro(ctx, name, repeats, scale):
+    """Median/min ns per operation over `repeats` timed loops"""
+    description, setup, iterations = MICRO_BENCHMARKS[name]
+    iterations = max(1, int(iterations * scale))
+    operation = setup(ctx)
+    for _ in range(min(iterations, 100)):
+        operation()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            operation()
+        samples.append((time.perf_counter_ns() - start) / iterations)
+    return {
+        "kind": "micro",
+        "description": description,
+        "unit": "ns/op",
+        "value": round(statistics.median(samples), 1),
+        "min": round(min(samples), 1),
+        "stdev": round(statistics.stdev(samples), 1) if len(samples) > 1 else 0.0,
+        "iterations": iterations,
+        "repeats": repeats
+    }
+
+def run_macro(ctx, name, repeats, scale):
+    """Loopback telegrams through the real server thread; median p50 over repeats"""
+    options = dict(MACRO_BENCHMARKS[name])
+    options["requests"] = max(1, int(options["requests"] * scale))
+    engine = ctx.engine
+    if not engine.running:
+        # Ephemeral port - several suites can run side by side
+        engine.ETH_PORT = 0
+        engine.udp_enabled = False
+        if engine.eth_init() != "RETURN_SUCCESS":
+            raise RuntimeError("loopback telegram server could not start")
+        engine.ETH_PORT = engine.server_socket.getsockname()[1]
+
+    runs = [run_benchmark("127.0.0.1", engine.ETH_PORT, duration=60.0, **options) for _ in range(repeats)]
+    failures = [failure for run in runs for failure in run["failures"]]
+    if failures:
+        raise RuntimeError(failures[0])
+    p50 = [run["latency"]["p50_us"] for run in runs]
+    return {
+        "kind": "macro",
+        "description": f"Loopback telegrams ({options['mix']}, pipeline {options.get('pipeline', 1)})",
+        "unit": "us p50",
+        "value": statistics.median(p50),
+        "p99_us": statistics.median(run["latency"]["p99_us"] for run in runs),
+        "throughput_per_s": statistics.median(run["throughput_per_s"] for run in runs),
+        "requests": options["requests"],
+        "repeats": repeats
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_suite(selected=None, repeats=DEFAULT_REPEATS, scale=1.0, report=print):
+    """Run the (selected) benchmarks and return the result document"""
+    names = [name for name in list(MICRO_BENCHMARKS) + list(MACRO_BENCHMARKS)
+             if not selected or any(name.startswith(prefix) for prefix in selected)]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        with quiet():
+            ctx = BenchContext(workdir)
+        try:
+            for name in names:
+                runner = run_micro if name in MICRO_BENCHMARKS else run_macro
+                try:
+                    with quiet():
+                        results[name] = runner(ctx, name, repeats, scale)
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+                    report(f"   ❌ {name:<20} {e}")
+                    continue
+                report(f"   {name:<20} {results[name]['value']:>12} {results[name]['unit']}")
+        finally:
+            with quiet():
+                ctx.engine.running = False
+                if ctx.engine.server_socket:
+                    ctx.engine.server_socket.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+            "simulated": os.environ.get("CANMUX_SIMULATE", "") not in ("", "0"),
+            "sim_i2c_us": float(os.environ.get("CANMUX_SIM_I2C_US", "0")),
+            "repeats": repeats,
+            "scale": scale
+        },
+        "results": results
+    }
+
+def compare(baseline, candidate, threshold=DEFAULT_THRESHOLD):
+    """
+    Per-benchmark relative change (lower values are better for every unit)
+    status "broken": measured in the baseline, errored or absent in the candidate
+    Returns: list of (name, old, new, change, status)
+    """
+    rows = []
+    old_results, new_results = baseline["results"], candidate["results"]
+    for name in list(old_results) + [n for n in new_results if n not in old_results]:
+        old, new = old_results.get(name) or {}, new_results.get(name) or {}
+        if "value" not in old or "value" not in new:
+            if "value" in old:
+                status = "broken"
+            elif "value" in new:
+                status = "new"
+            else:
+                status = "missing"
+            rows.append((name, old.get("value"), new.get("value"), None, status))
+            continue
+        change = (new["value"] - old["value"]) / old["value"] if old["value"] else 0.0
+        status = "slower" if change > threshold else "faster" if change < -threshold else "same"
+        rows.append((name, old["value"], new["value"], change, status))
+    return rows
+
+def print_comparison(rows, baseline, candidate):
+    print(f"📊 {baseline['meta'].get('git_revision')} ({baseline['meta']['timestamp']}) -> "
+          f"{candidate['meta'].get('git_revision')} ({candidate['meta']['timestamp']})")
+    markers = {"slower": "🔴", "faster": "🟢", "same": "  ", "broken": "❌", "new": "🆕", "missing": "⚪"}
+    for name, old, new, change, status in rows:
+        change_text = f"{change * 100:+7.1f} %" if change is not None else "      -"
+        print(f"   {markers[status]} {name:<20} {old if old is not None else '-':>12} -> "
+              f"{new if new is not None else '-':>12}  {change_text}")
+        if status == "broken":
+            error = (candidate["results"].get(name) or {}).get("error", "not in the candidate run")
+            print(f"      {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="CAN MUX micro and macro benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("-o", "--output", help="result file (default bench_<timestamp>.json)")
+    run_parser.add_argument("-k", "--only", action="append",
+                            help="run benchmarks whose name starts with this prefix (repeatable)")
+    run_parser.add_argument("-r", "--repeats", type=int, default=DEFAULT_REPEATS)
+    run_parser.add_argument("--quick", action="store_true", help="10x fewer iterations (smoke test)")
+    run_parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD * 100,
+                                help="percent change reported as slower/faster (default 10)")
+    compare_parser.add_argument("--allow-missing", action="store_true",
+                                help="do not fail when a baseline benchmark errored or is absent in the candidate")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        rows = compare(baseline, candidate, args.threshold / 100)
+        print_comparison(rows, baseline, candidate)
+        failing = {"slower"} if args.allow_missing else {"slower", "broken"}
+        return 1 if any(status in failing for *_, status in rows) else 0
+
+    if args.list:
+        for name, (description, _, _) in MICRO_BENCHMARKS.items():
+            print(f"   {name:<20} {description}")
+        for name, options in MACRO_BENCHMARKS.items():
+            print(f"   {name:<20} loopback {options}")
+        return 0
+
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+    print(f"🚀 Running benchmarks ({args.repeats} repeats{', quick' if args.quick else ''})")
+    document = run_suite(args.only, args.repeats, 0.1 if args.quick else 1.0)
+    output = args.output or f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"💾 Results written to {output}")
+    return 1 if any("error" in result for result in document["results"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
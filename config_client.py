@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+CAN MUX Configuration Client
+Persistent client for the configuration server (port 3364), used by the GUI
+One TCP connection is kept open and reused for every request
+On the mux itself, host may be the path of the Unix config socket instead
+"""
+
+import select
+import socket
+import threading
+import time
+from config_protocol import ENCODING_JSON, available_encodings, get_codec
+from unix_socket import connect
+
+CONFIG_PORT = 3364
+
+class ConfigClientError(Exception):
+    """Transport or protocol failure talking to the configuration server"""
+
+class ConfigClient:
+    """
+    Request/response client for the configuration server
+    Thread-safe: concurrent request() calls are serialized on one connection
+    encoding: preferred wire encoding (e.g. "msgpack"), negotiated with
+    "hello" on every new connection; None keeps plain JSON without hello
+    """
+
+    def __init__(self, host, port=CONFIG_PORT, timeout=5.0, encoding=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.encoding = encoding
+        self.codec = get_codec(ENCODING_JSON)
+        # Called with every pushed event (subscribe/stream) seen while waiting for a response
+        self.on_event = None
+        self._socket = None
+        self._buffer = b""
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self):
+        return self._socket is not None
+
+    def connect(self):
+        """Open the connection (no-op when already connected)"""
+        with self._lock:
+            self._connect()
+
+    def _connect(self):
+        if self._socket is not None:
+            return
+        try:
+            self._socket = connect(self.host, self.port, timeout=self.timeout)
+        except OSError as e:
+            self._socket = None
+            raise ConfigClientError(f"Cannot connect to {self.host}:{self.port}: {e}")
+        self._buffer = b""
+        self._negotiate()
+
+    def _negotiate(self):
+        """Switch the fresh connection to the preferred encoding (stays JSON if not possible)"""
+        if self.encoding is None or self.encoding == ENCODING_JSON:
+            return
+        if self.encoding not in available_encodings():
+            # Not installed on this side - plain JSON
+            return
+        try:
+            self._socket.sendall(self.codec.encode(
+                {"command": "hello", "data": {"encodings": [self.encoding, ENCODING_JSON]}}))
+            response = self._read_response()
+        except (OSError, ConfigClientError):
+            self._close()
+            raise
+        # Older daemons answer hello with an error - the session stays JSON
+        if response.get("status") == "success":
+            encoding = response["data"]["encoding"]
+            if encoding != self.codec.name:
+                self.codec = get_codec(encoding)
+
+    def _drop_stale(self):
+        """Close a kept connection the server has already shut (daemon restart, idle close)"""
+        if self._socket is None:
+            return
+        try:
+            readable, _, _ = select.select([self._socket], [], [], 0)
+            if readable and not self._socket.recv(1, socket.MSG_PEEK):
+                self._close()
+        except (OSError, ValueError):
+            self._close()
+
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._buffer = b""
+        # A new connection starts in JSON until hello switches it again
+        self.codec = get_codec(ENCODING_JSON)
+
+    def request(self, command, data=None):
+        """
+        Send one command and wait for its response
+        A connection that is found closed, or fails before the command is
+        fully sent, is reopened once. Once the command is sent nothing is
+        retried (not even a timeout): the server may already have run it
+        Returns: response dict ({"status": ..., ...})
+        """
+        message = {"command": command}
+        if data is not None:
+            message["data"] = data
+
+        with self._lock:
+            for attempt in range(2):
+                sent = False
+                try:
+                    self._drop_stale()
+                    self._connect()
+                    self._socket.sendall(self.codec.encode(message))
+                    sent = True
+                    return self._read_response()
+                except (OSError, ConfigClientError) as e:
+                    self._close()
+                    if sent or attempt == 1:
+                        raise ConfigClientError(f"Request '{command}' failed: {e}")
+
+    def _read_response(self):
+        """Read frames until a response arrives - pushed events go to on_event"""
+        while True:
+            frame, self._buffer = self.codec.next_frame(self._buffer)
+            if frame is None:
+                chunk = self._socket.recv(65536)
+                if not chunk:
+                    raise ConfigClientError("Connection closed by server")
+                self._buffer += chunk
+                continue
+            if not frame:
+                continue
+            try:
+                message = self.codec.decode(frame)
+            except ValueError as e:
+                raise ConfigClientError(f"Invalid response: {e}")
+            if "event" in message:
+                if self.on_event is not None:
+                    self.on_event(message)
+                continue
+            return message
+
+    def next_event(self, timeout=None):
+        """
+        Wait for the next pushed event (after subscribe / stream_logs)
+        Returns: event dict, or None when nothing arrived within timeout
+        """
+        with self._lock:
+            if self._socket is None:
+                raise ConfigClientError("Not connected")
+            self._socket.settimeout(timeout)
+            try:
+                while True:
+                    frame, self._buffer = self.codec.next_frame(self._buffer)
+                    if frame is None:
+                        chunk = self._socket.recv(65536)
+                        if not chunk:
+                            raise ConfigClientError("Connection closed by server")
+                        self._buffer += chunk
+                        continue
+                    if not frame:
+                        continue
+                    try:
+                        message = self.codec.decode(frame)
+                    except ValueError as e:
+                        raise ConfigClientError(f"Invalid event: {e}")
+                    if "event" in message:
+                        return message
+            except socket.timeout:
+                return None
+            except (OSError, ConfigClientError) as e:
+                self._close()
+                raise ConfigClientError(f"Event stream failed: {e}")
+            finally:
+                if self._socket is not None:
+                    self._socket.settimeout(self.timeout)
+
+    def wait_ready(self, timeout=30.0, interval=0.2, cancel_event=None):
+        """
+        Poll the "health" command until the daemon reports ready
+        Connection errors are retried (the daemon may still be starting)
+        Returns: health data, or None if the daemon has no health command
+        Raises ConfigClientError on startup failure or timeout
+        """
+        deadline = time.monotonic() + timeout
+        last_error = "no response"
+        while True:
+            try:
+                response = self.request("health")
+                if response.get("status") != "success":
+                    # Daemon older than the health command - cannot tell more
+                    return None
+                health = response["data"]
+                if health.get("failed"):
+                    raise ConfigClientError(f"Startup failed: {health['failed']}")
+                if health.get("ready"):
+                    return health
+                pending = [name for name, state in health["components"].items() if not state["ready"]]
+                last_error = f"waiting for {', '.join(pending)}"
+            except ConfigClientError as e:
+                if str(e).startswith("Startup failed"):
+                    raise
+                last_error = str(e)
+
+            if time.monotonic() >= deadline:
+                raise ConfigClientError(f"Not ready after {timeout:.0f} s ({last_error})")
+            if cancel_event is not None:
+                if cancel_event.wait(interval):
+                    raise ConfigClientError("Cancelled")
+            else:
+                time.sleep(interval)
+
+    def get_config(self):
+        """Current network configuration - raises ConfigClientError on failure"""
+        response = self.request("get_config")
+        if response.get("status") != "success":
+            raise ConfigClientError(response.get("message", "get_config failed"))
+        return response["data"]
+
+    def update_config(self, config_data):
+        """Write one or more configuration items (update_all_config)"""
+        response = self.request("update_all_config", config_data)
+        if response.get("status") != "success":
+            raise ConfigClientError(response.get("message", "update_all_config failed"))
+        return response.get("message", "")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Config Protocol - message codecs for the configuration server (port 3364)
+Default encoding is newline-terminated UTF-8 JSON; a session can negotiate
+length-prefixed msgpack with the "hello" command
+"""
+
+import json
+import struct
+
+# Optional faster JSON backend (same wire format)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional compact binary encoding
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+# Upper bound for one length-prefixed frame (protects against garbage length)
+MAX_FRAME_SIZE = 1024 * 1024
+
+_LENGTH_PREFIX = struct.Struct(">I")
+
+class JsonCodec:
+    """Newline-delimited JSON - uses orjson when installed"""
+
+    name = ENCODING_JSON
+    label = "JSON"
+    backend = "orjson" if orjson is not None else "json"
+
+    def encode(self, message):
+        """Encode a message to one framed bytes object"""
+        if orjson is not None:
+            return orjson.dumps(message) + b'\n'
+        return (json.dumps(message) + '\n').encode()
+
+    def decode(self, frame):
+        """Decode one frame - raises ValueError on malformed input"""
+        if orjson is not None:
+            return orjson.loads(frame)
+        return json.loads(frame.decode('utf-8'))
+
+    def next_frame(self, buffer):
+        """
+        Split the next complete frame off the receive buffer
+        Returns: (frame or None, remaining buffer)
+        """
+        end = buffer.find(b'\n')
+        if end < 0:
+            return None, buffer
+        return buffer[:end], buffer[end + 1:]
+
+class MsgpackCodec:
+    """msgpack frames prefixed with a 4-byte big-endian length"""
+
+    name = ENCODING_MSGPACK
+    label = "msgpack"
+    backend = "msgpack"
+
+    def encode(self, message):
+        """Encode a message to one framed bytes object"""
+        payload = msgpack.packb(message, use_bin_type=True)
+        return _LENGTH_PREFIX.pack(len(payload)) + payload
+
+    def decode(self, frame):
+        """Decode one frame - raises ValueError on malformed input"""
+        try:
+            return msgpack.unpackb(frame, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack frame: {e}")
+
+    def next_frame(self, buffer):
+        """
+        Split the next complete frame off the receive buffer
+        Returns: (frame or None, remaining buffer)
+        """
+        if len(buffer) < _LENGTH_PREFIX.size:
+            return None, buffer
+        (length,) = _LENGTH_PREFIX.unpack_from(buffer)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f"Frame of {length} bytes exceeds limit")
+        end = _LENGTH_PREFIX.size + length
+        if len(buffer) < end:
+            return None, buffer
+        return buffer[_LENGTH_PREFIX.size:end], buffer[end:]
+
+def available_encodings():
+    """Encodings this installation can speak, preferred first"""
+    encodings = []
+    if msgpack is not None:
+        encodings.append(ENCODING_MSGPACK)
+    encodings.append(ENCODING_JSON)
+    return encodings
+
+def get_codec(name=ENCODING_JSON):
+    """Codec instance for an encoding name"""
+    if name == ENCODING_JSON:
+        return JsonCodec()
+    if name == ENCODING_MSGPACK and msgpack is not None:
+        return MsgpackCodec()
+    raise ValueError(f"Unsupported encoding: {name}")
@@ -5,11 +5,29 @@ Server care rulează pe Raspberry Pi și permite configurarea remotă
 Portul 3364 pentru configurare (diferit de portul principal 3363)
 """
 
+import os
+import shutil
 import socket
+import subprocess
 import threading
-import json
 import time
 from config_manager import ConfigManager, EEPROM
+from event_bus import EventBus, TOPIC_CONFIG, ALL_TOPICS, DEFAULT_MAX_PENDING
+from config_protocol import ENCODING_JSON, JsonCodec, available_encodings, get_codec
+from log_ring import LEVELS, LogRing, install_capture
+from readiness import Readiness, COMPONENT_CONFIG_LISTENER
+from metrics import ACTIVE_CONNECTIONS, CONNECTIONS, CONFIG_REQUESTS, CONFIG_REQUEST_ERRORS
+from flight_recorder import RECORDER, EV_CONFIG
+from logger import get_logger, setup_logging
+from unix_socket import DEFAULT_MODE, create_unix_listener, close_unix_listener
+from profiler import Profiler, ProfilerError, MODE_SAMPLE, DEFAULT_DURATION, DEFAULT_INTERVAL, DEFAULT_TOP
+
+# psutil e opțional - fără el informațiile vin din /proc
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 from config_manager import (
     EEPROM_IP_ADDRESS_OFFSET, EEPROM_MAC_ADDRESS_OFFSET,
     EEPROM_SUBNET_MASK_ADDRESS_OFFSET, EEPROM_DNS_ADDRESS_OFFSET,
@@ -17,11 +35,83 @@ from config_manager import (
     SUBNET_MAX_BYTES, GATEWAY_MAX_BYTES, DNS_MAX_BYTES
 )
 
+log = get_logger("config")
+
+class ConfigSession:
+    """Starea unei conexiuni client (socket, lock de trimitere, stream-uri active)"""
+
+    def __init__(self, client_socket, client_address):
+        self.socket = client_socket
+        self.address = client_address
+        self.send_lock = threading.Lock()
+        self.codec = get_codec(ENCODING_JSON)
+        self.subscription = None
+        # Setat pentru a opri stream-ul de log activ (stream_logs)
+        self.log_stop = None
+        self._next_codec = None
+        self._pending_streams = []
+
+    def send(self, message):
+        """Trimite un mesaj încadrat cu codec-ul sesiunii (thread-safe)"""
+        with self.send_lock:
+            self.socket.sendall(self.codec.encode(message))
+
+    def switch_codec(self, codec):
+        """Programează schimbarea codec-ului - aplicată imediat după răspunsul curent"""
+        self._next_codec = codec
+
+    def send_response(self, response):
+        """Trimite răspunsul la o comandă, apoi aplică codec-ul nou și pornește stream-urile"""
+        with self.send_lock:
+            self.socket.sendall(self.codec.encode(response))
+            if self._next_codec is not None:
+                self.codec, self._next_codec = self._next_codec, None
+        self.start_streams()
+
+    def add_stream(self, thread):
+        """Înregistrează un thread de streaming, pornit după trimiterea răspunsului"""
+        self._pending_streams.append(thread)
+
+    def start_streams(self):
+        """Pornește stream-urile înregistrate - răspunsul la comandă ajunge primul"""
+        while self._pending_streams:
+            self._pending_streams.pop(0).start()
+
 class ConfigurationServer:
-    def __init__(self, port=3364):
+    # Numele extenderelor -> nibble-ul folosit în telegrame (0 = master, 1 = slave)
+    EXTENDERS = {"master": 0, "slave": 1}
+    
+    # Comenzile cunoscute (etichetele metricilor de request)
+    COMMANDS = frozenset((
+        "get_config", "update_config", "update_all_config", "get_firmware",
+        "select_channel", "get_channel_status", "get_all_status", "system_info",
+        "health", "telegram_stats", "hello", "subscribe", "unsubscribe",
+        "stream_logs", "stop_logs", "start_profile", "stop_profile"
+    ))
+    
+    # Limita pentru înregistrările de log trimise la o cerere (backlog)
+    MAX_LOG_BACKLOG = 1000
+    
+    def __init__(self, port=3364, event_bus=None, telegram_engine=None, log_ring=None, readiness=None,
+                 unix_path=None, unix_mode=DEFAULT_MODE, unix_group=None):
         self.port = port
+        # Socket Unix opțional pentru controlere locale - același protocol ca portul TCP
+        self.unix_path = unix_path
+        self.unix_mode = unix_mode
+        self.unix_group = unix_group
+        self.unix_socket = None
         self.config_manager = ConfigManager()
+        self.event_bus = event_bus if event_bus is not None else EventBus()
+        # LogRing cu output-ul daemon-ului (stream_logs) - None dacă nu e capturat
+        self.log_ring = log_ring
+        # Starea de pornire a daemon-ului (comanda health) - implicit doar listener-ul propriu
+        self.readiness = readiness if readiness is not None else Readiness((COMPONENT_CONFIG_LISTENER,), optional=())
+        # EthernetReceive - același motor de comutare ca telegramele de pe portul 3363
+        self.telegram_engine = telegram_engine
+        # Profiler pe toate thread-urile daemon-ului (start_profile / stop_profile)
+        self.profiler = Profiler()
         self.server_socket = None
+        self.bound_ip = None
         self.running = False
         
         # Firmware version
@@ -35,21 +125,23 @@ class ConfigurationServer:
             config = self.config_manager.load_network_config()
             
             # Creează socket-ul server
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((config['ip'], self.port))
-            self.server_socket.listen(5)
+            self.server_socket = self._create_listener(config['ip'])
+            self.bound_ip = config['ip']
             
             self.running = True
+            if self.unix_path:
+                self.start_unix()
+            self.readiness.mark_ready(COMPONENT_CONFIG_LISTENER, f"{config['ip']}:{self.port}")
             
-            print(f"🔧 Configuration server started on {config['ip']}:{self.port}")
-            print(f"📡 Ready for GUI connections...")
+            log.info("🔧 Configuration server started on %s:%s", config['ip'], self.port)
+            log.info("📡 Ready for GUI connections...")
             
             # Loop principal pentru acceptarea conexiunilor
             while self.running:
+                listener = self.server_socket
                 try:
-                    client_socket, client_address = self.server_socket.accept()
-                    print(f"🖥️  GUI client connected from {client_address}")
+                    client_socket, client_address = listener.accept()
+                    log.info("🖥️  GUI client connected from %s", client_address)
                     
                     # Procesează clientul într-un thread separat
                     client_thread = threading.Thread(
@@ -60,17 +152,95 @@ class ConfigurationServer:
                     client_thread.start()
                     
                 except Exception as e:
-                    if self.running:
-                        print(f"❌ Server error: {e}")
+                    # Socket-ul înlocuit de rebind() nu este o eroare
+                    if self.running and listener is self.server_socket:
+                        log.error("❌ Server error: %s", e)
                         
         except Exception as e:
-            print(f"❌ Failed to start configuration server: {e}")
+            log.error("❌ Failed to start configuration server: %s", e)
+            self.readiness.mark_failed(COMPONENT_CONFIG_LISTENER, str(e))
+            return False
+            
+        return True
+        
+    def start_unix(self):
+        """Pornește socket-ul Unix - opțional, serverul TCP rulează și dacă eșuează"""
+        try:
+            self.unix_socket = create_unix_listener(self.unix_path, self.unix_mode, self.unix_group)
+        except (OSError, ValueError) as e:
+            self.unix_socket = None
+            log.warning("⚠️  Unix config socket %s not started: %s", self.unix_path, e)
+            return
+        threading.Thread(target=self._unix_loop, daemon=True, name="UnixConfigServer").start()
+        log.info("🔧 Configuration server listening on %s", self.unix_path)
+        
+    def _unix_loop(self):
+        """Acceptă clienții de pe socket-ul Unix - tratați la fel ca cei TCP"""
+        listener = self.unix_socket
+        while self.running:
+            try:
+                client_socket, _ = listener.accept()
+                client_address = f"unix:{self.unix_path}"
+                log.info("🖥️  Local client connected on %s", self.unix_path)
+                threading.Thread(
+                    target=self.handle_client,
+                    args=(client_socket, client_address),
+                    daemon=True
+                ).start()
+            except Exception as e:
+                if self.running:
+                    log.error("❌ Unix server error: %s", e)
+                    time.sleep(1)
+        
+    def _create_listener(self, ip):
+        """Creează socket-ul de ascultare pe ip:port"""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((ip, self.port))
+            listener.listen(5)
+        except Exception:
+            listener.close()
+            raise
+        return listener
+        
+    @staticmethod
+    def _close_listener(listener):
+        """Închide socket-ul de ascultare, trezind thread-ul blocat în accept()"""
+        try:
+            listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        listener.close()
+        
+    def rebind(self, ip):
+        """
+        Mută serverul pe un IP nou fără restart
+        Sesiunile deja conectate rămân deschise până le închide clientul
+        Returns: True dacă noul socket ascultă, False (vechiul rămâne activ)
+        """
+        if ip == self.bound_ip:
+            return True
+            
+        try:
+            new_listener = self._create_listener(ip)
+        except Exception as e:
+            log.error("❌ Configuration server rebind to %s:%s failed: %s", ip, self.port, e)
             return False
             
+        old_listener, self.server_socket = self.server_socket, new_listener
+        self.bound_ip = ip
+        if old_listener is not None:
+            self._close_listener(old_listener)
+        
+        log.info("🔧 Configuration server rebound to %s:%s", ip, self.port)
         return True
         
     def handle_client(self, client_socket, client_address):
         """Procesează un client conectat"""
+        session = ConfigSession(client_socket, client_address)
+        CONNECTIONS.labels("config").inc()
+        ACTIVE_CONNECTIONS.labels("config").inc()
         try:
             buffer = b""
             
@@ -82,27 +252,32 @@ class ConfigurationServer:
                     
                 buffer += data
                 
-                # Procesează mesajele complete (terminate cu \n)
-                while b'\n' in buffer:
-                    line, buffer = buffer.split(b'\n', 1)
-                    if line:
-                        self.process_message(line.decode('utf-8'), client_socket)
+                # Procesează mesajele complete (câte unul - codec-ul se poate schimba după hello)
+                while True:
+                    frame, buffer = session.codec.next_frame(buffer)
+                    if frame is None:
+                        break
+                    if frame:
+                        self.process_message(frame, session)
                         
         except Exception as e:
-            print(f"❌ Client handling error for {client_address}: {e}")
+            log.error("❌ Client handling error for %s: %s", client_address, e)
         finally:
-            print(f"🔌 GUI client {client_address} disconnected")
+            log.info("🔌 GUI client %s disconnected", client_address)
+            self.unsubscribe(session)
+            self.stop_logs(session)
+            ACTIVE_CONNECTIONS.labels("config").dec()
             client_socket.close()
             
-    def process_message(self, message, client_socket):
+    def process_message(self, message, session):
         """Procesează un mesaj primit de la client"""
         try:
-            # Parse JSON message
-            request = json.loads(message)
+            # Decodează mesajul (JSON implicit sau encoding-ul negociat)
+            request = session.codec.decode(message)
             command = request.get('command')
             data = request.get('data', {})
             
-            print(f"📨 Received command: {command}")
+            log.debug("📨 Received command: %s", command)
             
             # Procesează comanda
             if command == "get_config":
@@ -113,32 +288,64 @@ class ConfigurationServer:
                 response = self.update_all_config(data)
             elif command == "get_firmware":
                 response = self.get_firmware_info()
+            elif command == "select_channel":
+                response = self.select_channel(data)
+            elif command == "get_channel_status":
+                response = self.get_channel_status(data)
+            elif command == "get_all_status":
+                response = self.get_all_status()
+            elif command == "system_info":
+                response = self.get_system_info()
+            elif command == "health":
+                response = self.get_health()
+            elif command == "telegram_stats":
+                response = self.get_telegram_stats(data)
+            elif command == "hello":
+                response = self.negotiate_encoding(session, data)
+            elif command == "subscribe":
+                response = self.subscribe(session, data)
+            elif command == "unsubscribe":
+                response = self.unsubscribe(session)
+            elif command == "stream_logs":
+                response = self.stream_logs(session, data)
+            elif command == "stop_logs":
+                response = self.stop_logs(session)
+            elif command == "start_profile":
+                response = self.start_profile(data)
+            elif command == "stop_profile":
+                response = self.stop_profile(data)
             else:
                 response = {
                     "status": "error",
                     "message": f"Unknown command: {command}"
                 }
                 
+            # Contoare pentru /metrics - comenzile necunoscute sub o singură etichetă
+            label = command if command in self.COMMANDS else "unknown"
+            CONFIG_REQUESTS.labels(label).inc()
+            if response.get('status') != "success":
+                CONFIG_REQUEST_ERRORS.labels(label).inc()
+            
             # Trimite răspunsul
-            response_json = json.dumps(response) + '\n'
-            client_socket.send(response_json.encode())
+            session.send_response(response)
             
-            print(f"📤 Sent response: {response['status']}")
+            log.debug("📤 Sent response: %s", response['status'])
             
-        except json.JSONDecodeError:
+        except ValueError:
+            # Decodare eșuată (JSON/msgpack invalid)
             error_response = {
                 "status": "error",
-                "message": "Invalid JSON message"
+                "message": f"Invalid {session.codec.label} message"
             }
-            client_socket.send((json.dumps(error_response) + '\n').encode())
+            session.send(error_response)
             
         except Exception as e:
             error_response = {
                 "status": "error",
                 "message": str(e)
             }
-            client_socket.send((json.dumps(error_response) + '\n').encode())
-            print(f"❌ Error processing message: {e}")
+            session.send(error_response)
+            log.error("❌ Error processing message: %s", e)
             
     def get_current_config(self):
         """Obține configurația curentă"""
@@ -171,6 +378,428 @@ class ConfigurationServer:
             }
         }
         
+    def _channel_status(self, extender):
+        """Statusul unui extender: registrul de ieșire și canalul decodat"""
+        output = self.telegram_engine.read_output_status(self.EXTENDERS[extender])
+        return {
+            "extender": extender,
+            "output": output,
+            "channel": self.telegram_engine.decode_channel(output)
+        }
+        
+    def _channel_control_unavailable(self):
+        """Răspuns când serverul rulează fără motorul de telegrame (standalone)"""
+        return {
+            "status": "error",
+            "message": "Channel control not available - server runs without telegram engine"
+        }
+        
+    def select_channel(self, data):
+        """Selectează canalul unui extender (echivalent SELECT_CHANNEL)"""
+        if self.telegram_engine is None:
+            return self._channel_control_unavailable()
+            
+        extender = data.get('extender')
+        channel = data.get('channel')
+        if extender not in self.EXTENDERS:
+            return {
+                "status": "error",
+                "message": "extender must be 'master' or 'slave'"
+            }
+        # bool e subclasă de int - JSON true nu e canalul 1
+        if isinstance(channel, bool) or not isinstance(channel, int) or not 0 <= channel <= 8:
+            return {
+                "status": "error",
+                "message": "channel must be an integer between 0 and 8"
+            }
+            
+        try:
+            switch_ms = self.telegram_engine.select_channel(self.EXTENDERS[extender], channel, "config")
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to select channel: {str(e)}"
+            }
+            
+        return {
+            "status": "success",
+            "data": {
+                "extender": extender,
+                "channel": channel,
+                "switch_ms": round(switch_ms, 3)
+            }
+        }
+        
+    def get_channel_status(self, data):
+        """Citește canalul selectat pe un extender (echivalent GET_CHANNEL_STATUS)"""
+        if self.telegram_engine is None:
+            return self._channel_control_unavailable()
+            
+        extender = data.get('extender')
+        if extender not in self.EXTENDERS:
+            return {
+                "status": "error",
+                "message": "extender must be 'master' or 'slave'"
+            }
+            
+        try:
+            return {
+                "status": "success",
+                "data": self._channel_status(extender)
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to read channel status: {str(e)}"
+            }
+            
+    def get_all_status(self):
+        """Statusul ambelor extendere, citit consistent sub același lock"""
+        if self.telegram_engine is None:
+            return self._channel_control_unavailable()
+            
+        try:
+            with self.telegram_engine.extender_lock:
+                extenders = {name: self._channel_status(name) for name in self.EXTENDERS}
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to read channel status: {str(e)}"
+            }
+            
+        return {
+            "status": "success",
+            "data": {
+                "extenders": extenders,
+                "firmware": f"{self.FW_VERSION_MAJOR}.{self.FW_VERSION_MINOR}"
+            }
+        }
+        
+    def get_telegram_stats(self, data):
+        """Histogramele de latență și contoarele telegramelor (port 3363)"""
+        if self.telegram_engine is None:
+            return self._channel_control_unavailable()
+            
+        stats = self.telegram_engine.stats
+        snapshot = stats.snapshot()
+        # reset: True pornește o nouă fereastră de măsurare după citire
+        if data.get('reset'):
+            stats.reset()
+        return {
+            "status": "success",
+            "data": snapshot
+        }
+        
+    def start_profile(self, data):
+        """Pornește profiler-ul pe toate thread-urile pentru o fereastră limitată"""
+        try:
+            status = self.profiler.start(
+                mode=data.get('mode', MODE_SAMPLE),
+                duration=data.get('duration', DEFAULT_DURATION),
+                interval=data.get('interval', DEFAULT_INTERVAL)
+            )
+        except (ProfilerError, TypeError, ValueError) as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+        log.info("🔬 Profiling started: %s for %s s", status['mode'], status['duration_s'])
+        return {
+            "status": "success",
+            "data": status
+        }
+        
+    def stop_profile(self, data):
+        """Oprește profiler-ul (dacă mai rulează) și întoarce rezumatul / scrie fișierul"""
+        try:
+            result = self.profiler.stop(top=data.get('top', DEFAULT_TOP), output=data.get('output'))
+        except (ProfilerError, OSError, TypeError, ValueError) as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+        log.info("🔬 Profiling stopped after %s s", result['duration_s'])
+        return {
+            "status": "success",
+            "data": result
+        }
+        
+    def get_health(self):
+        """Starea de pornire: listener-e legate, extendere inițializate"""
+        return {
+            "status": "success",
+            "data": self.readiness.snapshot()
+        }
+        
+    def get_system_info(self):
+        """Informații de sistem într-un singur răspuns structurat (fără procese externe)"""
+        try:
+            return {
+                "status": "success",
+                "data": {
+                    "hostname": socket.gethostname(),
+                    "uptime_s": self._system_uptime(),
+                    "load_avg": list(os.getloadavg()),
+                    "memory": self._memory_info(),
+                    "disk": dict(zip(("total", "used", "free"), shutil.disk_usage('/'))),
+                    "cpu_temp_c": self._cpu_temperature(),
+                    "interfaces": self._network_interfaces(),
+                    "service": {
+                        "pid": os.getpid(),
+                        "threads": threading.active_count(),
+                        "firmware": f"{self.FW_VERSION_MAJOR}.{self.FW_VERSION_MINOR}"
+                    },
+                    "listeners": self._listeners(),
+                    "timestamp": time.time()
+                }
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to collect system info: {str(e)}"
+            }
+            
+    @staticmethod
+    def _system_uptime():
+        with open('/proc/uptime') as f:
+            return float(f.read().split()[0])
+            
+    @staticmethod
+    def _memory_info():
+        """Memorie în bytes: total, available, used"""
+        if psutil is not None:
+            mem = psutil.virtual_memory()
+            return {"total": mem.total, "available": mem.available, "used": mem.total - mem.available}
+        meminfo = {}
+        with open('/proc/meminfo') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0]) * 1024
+        available = meminfo.get('MemAvailable', meminfo.get('MemFree', 0))
+        return {"total": meminfo['MemTotal'], "available": available, "used": meminfo['MemTotal'] - available}
+        
+    @staticmethod
+    def _cpu_temperature():
+        """Temperatura CPU în °C (thermal zone, echivalent vcgencmd measure_temp)"""
+        try:
+            with open('/sys/class/thermal/thermal_zone0/temp') as f:
+                return int(f.read().strip()) / 1000.0
+        except (OSError, ValueError):
+            return None
+            
+    @staticmethod
+    def _network_interfaces():
+        """Adresele IPv4/IPv6 per interfață"""
+        if psutil is not None:
+            return {
+                name: [addr.address for addr in addrs if addr.family in (socket.AF_INET, socket.AF_INET6)]
+                for name, addrs in psutil.net_if_addrs().items()
+            }
+        try:
+            output = subprocess.run(["ip", "-brief", "addr", "show"], capture_output=True,
+                                    text=True, timeout=2).stdout
+        except (OSError, subprocess.SubprocessError):
+            return {}
+        interfaces = {}
+        for line in output.splitlines():
+            parts = line.split()
+            if parts:
+                interfaces[parts[0]] = [addr.split('/')[0] for addr in parts[2:]]
+        return interfaces
+        
+    def _listeners(self):
+        """Porturile pe care ascultă daemon-ul"""
+        listeners = {"config": f"{self.bound_ip}:{self.port}" if self.bound_ip else None}
+        if self.telegram_engine is not None and self.telegram_engine.bound_ip:
+            listeners["telegram"] = f"{self.telegram_engine.bound_ip}:{self.telegram_engine.ETH_PORT}"
+        return listeners
+        
+    def negotiate_encoding(self, session, data):
+        """
+        Negociază encoding-ul sesiunii (comanda hello)
+        Răspunsul pleacă în encoding-ul curent, mesajele următoare în cel ales
+        """
+        requested = data.get('encodings', [ENCODING_JSON])
+        available = available_encodings()
+        
+        for name in requested:
+            if name in available:
+                if name != session.codec.name:
+                    session.switch_codec(get_codec(name))
+                return {
+                    "status": "success",
+                    "data": {
+                        "encoding": name,
+                        "available": available,
+                        "json_backend": JsonCodec.backend
+                    }
+                }
+                
+        return {
+            "status": "error",
+            "message": f"No common encoding - server supports: {', '.join(available)}"
+        }
+        
+    def subscribe(self, session, data):
+        """Abonează sesiunea la evenimente (config commit, schimbare canal)"""
+        topics = data.get('topics', list(ALL_TOPICS))
+        unknown = [t for t in topics if t not in ALL_TOPICS]
+        if unknown or not topics:
+            return {
+                "status": "error",
+                "message": f"Unknown topics: {', '.join(unknown) or 'none given'}"
+            }
+            
+        max_pending = data.get('max_pending', DEFAULT_MAX_PENDING)
+        if not isinstance(max_pending, int) or not 1 <= max_pending <= 1024:
+            return {
+                "status": "error",
+                "message": "max_pending must be an integer between 1 and 1024"
+            }
+            
+        # O singură abonare per sesiune - o nouă comandă o înlocuiește
+        self.unsubscribe(session)
+        session.subscription = self.event_bus.subscribe(topics, max_pending)
+        session.add_stream(threading.Thread(
+            target=self._event_pump,
+            args=(session, session.subscription),
+            daemon=True,
+            name="ConfigEvents"
+        ))
+        
+        log.info("🔔 %s subscribed to: %s", session.address, ', '.join(topics))
+        
+        return {
+            "status": "success",
+            "data": {
+                "topics": list(topics),
+                "max_pending": max_pending
+            }
+        }
+        
+    def unsubscribe(self, session):
+        """Anulează abonarea sesiunii (dacă există)"""
+        if session.subscription is not None:
+            self.event_bus.unsubscribe(session.subscription)
+            session.subscription = None
+            
+        return {
+            "status": "success",
+            "message": "Unsubscribed"
+        }
+        
+    def _event_pump(self, session, subscription):
+        """Thread care trimite evenimentele unei abonări către client"""
+        while self.running and not subscription.closed:
+            event = subscription.get(timeout=1.0)
+            if event is None:
+                continue
+            try:
+                session.send(event)
+            except OSError:
+                # Clientul s-a deconectat - handle_client face curățenia
+                break
+                
+    def stream_logs(self, session, data):
+        """
+        Trimite log-ul daemon-ului din LogRing
+        data: level (nivel minim, implicit INFO), backlog (câte înregistrări
+        recente se retrimit, implicit 100), follow (continuă cu cele noi, implicit True)
+        Fără follow, înregistrările vin direct în răspuns
+        """
+        if self.log_ring is None:
+            return {
+                "status": "error",
+                "message": "Log streaming not available"
+            }
+            
+        level = str(data.get('level', 'INFO')).upper()
+        if level not in LEVELS:
+            return {
+                "status": "error",
+                "message": f"Unknown level: {level} (expected {', '.join(LEVELS)})"
+            }
+            
+        backlog = data.get('backlog', 100)
+        if not isinstance(backlog, int) or not 0 <= backlog <= self.MAX_LOG_BACKLOG:
+            return {
+                "status": "error",
+                "message": f"backlog must be an integer between 0 and {self.MAX_LOG_BACKLOG}"
+            }
+            
+        records, _ = self.log_ring.records_after(0, level, limit=backlog)
+        if not data.get('follow', True):
+            return {
+                "status": "success",
+                "data": {"level": level, "records": records}
+            }
+            
+        # Un singur stream de log per sesiune - o nouă comandă îl înlocuiește
+        self.stop_logs(session)
+        session.log_stop = threading.Event()
+        session.add_stream(threading.Thread(
+            target=self._log_pump,
+            args=(session, level, records, self.log_ring.last_seq, session.log_stop),
+            daemon=True,
+            name="ConfigLogs"
+        ))
+        
+        return {
+            "status": "success",
+            "data": {"level": level, "backlog": len(records)}
+        }
+        
+    def stop_logs(self, session):
+        """Oprește stream-ul de log al sesiunii (dacă există)"""
+        if session.log_stop is not None:
+            session.log_stop.set()
+            session.log_stop = None
+            
+        return {
+            "status": "success",
+            "message": "Log stream stopped"
+        }
+        
+    def _log_pump(self, session, level, backlog, seq, stop):
+        """Thread care trimite backlog-ul, apoi înregistrările noi, ca evenimente "log" """
+        # Fără print sau log aici - ar ajunge în LogRing și ar genera alte înregistrări
+        try:
+            for record in backlog:
+                session.send({"event": "log", "data": record})
+                
+            while self.running and not stop.is_set():
+                if not self.log_ring.wait(seq, timeout=1.0):
+                    continue
+                latest = self.log_ring.last_seq
+                records, missed = self.log_ring.records_after(seq, level)
+                # Cele apărute între timp rămân pentru iterația următoare
+                records = [r for r in records if r["seq"] <= latest]
+                seq = latest
+                if missed:
+                    # Clientul a rămas în urmă mai mult decât capacitatea inelului
+                    session.send({
+                        "event": "overflow",
+                        "timestamp": time.time(),
+                        "data": {"dropped": missed}
+                    })
+                for record in records:
+                    if stop.is_set():
+                        return
+                    session.send({"event": "log", "data": record})
+        except OSError:
+            # Clientul s-a deconectat - handle_client face curățenia
+            pass
+            
+    def publish_config_change(self, updated_items):
+        """Publică un eveniment de config commit către abonați"""
+        config = self.config_manager.load_network_config()
+        ip = [int(part) for part in config['ip'].split('.')]
+        RECORDER.record(EV_CONFIG, ip[0] << 24 | ip[1] << 16 | ip[2] << 8 | ip[3])
+        self.event_bus.publish(TOPIC_CONFIG, "network", {
+            "updated": updated_items,
+            "config": config
+        })
+            
     def update_single_config(self, data):
         """Update o singură configurație"""
         try:
@@ -219,7 +848,8 @@ class ConfigurationServer:
                     "message": f"Unknown configuration type: {config_type}"
                 }
                 
-            print(f"✅ Updated {config_type}: {value}")
+            log.info("✅ Updated %s: %s", config_type, value)
+            self.publish_config_change([config_type])
             
             return {
                 "status": "success",
@@ -271,14 +901,17 @@ class ConfigurationServer:
                             EEPROM.update(EEPROM_DNS_ADDRESS_OFFSET + i, dns_bytes[i])
                             
                     else:
-                        print(f"⚠️  Unknown configuration type: {config_type}")
+                        log.warning("⚠️  Unknown configuration type: %s", config_type)
                         continue
                         
                     updated_items.append(config_type)
-                    print(f"✅ Updated {config_type}: {value}")
+                    log.info("✅ Updated %s: %s", config_type, value)
                     
                 except Exception as e:
-                    print(f"❌ Failed to update {config_type}: {e}")
+                    log.error("❌ Failed to update %s: %s", config_type, e)
+                    if updated_items:
+                        # Items before the failure are already written
+                        self.publish_config_change(updated_items)
                     return {
                         "status": "error",
                         "message": f"Failed to update {config_type}: {str(e)}"
@@ -290,6 +923,8 @@ class ConfigurationServer:
                     "message": "No valid configuration items provided"
                 }
                 
+            self.publish_config_change(updated_items)
+            
             return {
                 "status": "success",
                 "message": f"Updated {len(updated_items)} configuration items: {', '.join(updated_items)}"
@@ -358,20 +993,27 @@ class ConfigurationServer:
     def stop_server(self):
         """Oprește serverul"""
         self.running = False
+        if self.unix_socket:
+            close_unix_listener(self.unix_socket, self.unix_path)
         if self.server_socket:
             self.server_socket.close()
-            print("🔧 Configuration server stopped")
+            log.info("🔧 Configuration server stopped")
 
 def main():
     """Funcția principală pentru rularea serverului"""
-    print("🚀 Starting CAN MUX Configuration Server...")
+    # Output-ul serverului e disponibil și prin stream_logs
+    log_ring = LogRing()
+    install_capture(log_ring)
+    setup_logging(log_ring=log_ring)
+    
+    log.info("🚀 Starting CAN MUX Configuration Server...")
     
-    server = ConfigurationServer()
+    server = ConfigurationServer(log_ring=log_ring)
     
     try:
         server.start_server()
     except KeyboardInterrupt:
-        print("\n🛑 Stopping configuration server...")
+        log.info("🛑 Stopping configuration server...")
     finally:
         server.stop_server()
 
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+CAN MUX Deployer
+Incremental upload of the project to the Raspberry Pi, used by the GUI
+Local files are hashed and compared with a manifest stored on the Pi,
+only changed files are transferred, several at a time over one SSH transport
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import shlex
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+REMOTE_PATH = "/home/pi/can_mux"
+MANIFEST_NAME = ".deploy_manifest.json"
+DEPLOY_EXTENSIONS = ('.py', '.txt', '.json', '.md')
+
+# Device-owned files - never overwritten from the project folder
+EXCLUDED_FILES = {"can_mux_config.json"}
+
+# Dependency install state
+REQUIREMENTS_FILE = "requirements.txt"
+REQUIREMENTS_STAMP = ".requirements.sha256"
+WHEELHOUSE_DIR = "wheelhouse"           # on the Pi, inside remote_path
+LOCAL_WHEELHOUSE_DIR = ".wheelhouse"    # in the project folder, one subfolder per requirements hash
+# Build backend for source distributions (RPi.GPIO has no wheels) - pure Python wheels
+BUILD_REQUIREMENTS = ("setuptools", "wheel")
+
+def hash_file(path):
+    """SHA-256 of a local file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_local_manifest(project_folder):
+    """
+    Hash every deployable file of the project
+    Returns: {file name: {"sha256": ..., "size": ...}}
+    """
+    manifest = {}
+    for file in sorted(os.listdir(project_folder)):
+        if file.startswith('.') or file in EXCLUDED_FILES:
+            continue
+        if not file.endswith(DEPLOY_EXTENSIONS):
+            continue
+        local_file = os.path.join(project_folder, file)
+        if not os.path.isfile(local_file):
+            continue
+        manifest[file] = {
+            "sha256": hash_file(local_file),
+            "size": os.path.getsize(local_file)
+        }
+    return manifest
+
+def _requirement_lines(requirements_path):
+    """Requirement specifiers from a requirements file (comments stripped)"""
+    lines = []
+    with open(requirements_path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                lines.append(line)
+    return lines
+
+def prepare_wheelhouse(project_folder, python_tag, machine, log=None):
+    """
+    Download the project requirements for the Pi into a local wheelhouse
+    Binary wheels for the Pi platform are preferred, packages without one
+    fall back to their source distribution (built on the Pi, no index needed -
+    the build backend is downloaded into the wheelhouse as well)
+    python_tag: e.g. "311", machine: e.g. "aarch64" (as reported by the Pi)
+    Returns: wheelhouse folder, or None when pip is not available (frozen GUI)
+    """
+    if getattr(sys, 'frozen', False):
+        return None
+
+    requirements = os.path.join(project_folder, REQUIREMENTS_FILE)
+    req_hash = hash_file(requirements)
+    wheelhouse = os.path.join(project_folder, LOCAL_WHEELHOUSE_DIR, f"{req_hash[:16]}-cp{python_tag}-{machine}")
+    complete_marker = os.path.join(wheelhouse, ".complete")
+    if os.path.exists(complete_marker):
+        return wheelhouse
+
+    os.makedirs(wheelhouse, exist_ok=True)
+    platforms = []
+    for tag in (f"manylinux2014_{machine}", f"manylinux_2_28_{machine}",
+                f"manylinux_2_31_{machine}", f"linux_{machine}"):
+        platforms += ["--platform", tag]
+
+    needs_build = False
+    for requirement in _requirement_lines(requirements):
+        binary = [sys.executable, "-m", "pip", "download", "--quiet", "--dest", wheelhouse,
+                  "--only-binary=:all:", "--python-version", python_tag,
+                  "--implementation", "cp"] + platforms + [requirement]
+        if subprocess.run(binary, capture_output=True).returncode == 0:
+            continue
+        source = [sys.executable, "-m", "pip", "download", "--quiet", "--dest", wheelhouse,
+                  "--no-binary=:all:", "--no-deps", requirement]
+        if subprocess.run(source, capture_output=True).returncode != 0:
+            if log:
+                log(f"Could not download {requirement} - the Pi will resolve it")
+            return None
+        needs_build = True
+
+    if needs_build:
+        # pip builds source distributions in an isolated environment, which
+        # with --no-index can only be populated from the wheelhouse
+        backend = [sys.executable, "-m", "pip", "download", "--quiet", "--dest", wheelhouse,
+                   "--only-binary=:all:", "--python-version", python_tag,
+                   "--implementation", "py", "--platform", "any"] + list(BUILD_REQUIREMENTS)
+        if subprocess.run(backend, capture_output=True).returncode != 0:
+            if log:
+                log("Could not download the build backend - the Pi will resolve it")
+            return None
+
+    with open(complete_marker, 'w') as f:
+        f.write(req_hash)
+    return wheelhouse
+
+class Deployer:
+    """Delta sync of a project folder to the CAN MUX install directory"""
+
+    def __init__(self, ssh_client, remote_path=REMOTE_PATH, max_workers=4):
+        self.ssh_client = ssh_client
+        self.remote_path = remote_path
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self._sftp_clients = []
+        self._sftp_lock = threading.Lock()
+
+    def _sftp(self):
+        """One SFTP channel per worker thread, all on the same SSH transport"""
+        sftp = getattr(self._local, 'sftp', None)
+        if sftp is None:
+            sftp = self.ssh_client.open_sftp()
+            self._local.sftp = sftp
+            with self._sftp_lock:
+                self._sftp_clients.append(sftp)
+        return sftp
+
+    def _close_sftp(self):
+        with self._sftp_lock:
+            for sftp in self._sftp_clients:
+                try:
+                    sftp.close()
+                except Exception:
+                    pass
+            self._sftp_clients = []
+        self._local = threading.local()
+
+    def _remote(self, name):
+        return posixpath.join(self.remote_path, name)
+
+    def _ensure_remote_dir(self):
+        sftp = self._sftp()
+        try:
+            sftp.stat(self.remote_path)
+        except IOError:
+            sftp.mkdir(self.remote_path)
+
+    def read_remote_manifest(self):
+        """Manifest of the last deployment ({} if missing or unreadable)"""
+        try:
+            with self._sftp().open(self._remote(MANIFEST_NAME), 'r') as f:
+                return json.loads(f.read().decode())
+        except (IOError, ValueError):
+            return {}
+
+    def _remote_sizes(self):
+        """Sizes of the files currently on the Pi (one directory listing)"""
+        try:
+            return {attr.filename: attr.st_size for attr in self._sftp().listdir_attr(self.remote_path)}
+        except IOError:
+            return {}
+
+    def plan(self, local_manifest, remote_manifest, remote_sizes):
+        """Files that differ from the last deployment or were changed/removed on the Pi"""
+        changed = []
+        for file, entry in local_manifest.items():
+            previous = remote_manifest.get(file)
+            if (previous is None or previous.get("sha256") != entry["sha256"]
+                    or remote_sizes.get(file) != entry["size"]):
+                changed.append(file)
+        return changed
+
+    def _upload(self, project_folder, file):
+        """Upload one file atomically (temporary name + rename)"""
+        sftp = self._sftp()
+        remote_file = self._remote(file)
+        temp_file = remote_file + ".part"
+        sftp.put(os.path.join(project_folder, file), temp_file)
+        sftp.posix_rename(temp_file, remote_file)
+        return file
+
+    def run(self, command):
+        """
+        Run a command on the Pi and wait for it to finish
+        Returns: (exit status, stdout text, stderr text)
+        """
+        stdin, stdout, stderr = self.ssh_client.exec_command(command)
+        out = stdout.read().decode(errors='replace')
+        err = stderr.read().decode(errors='replace')
+        return stdout.channel.recv_exit_status(), out, err
+
+    def remote_python(self):
+        """Python tag and machine of the Pi, e.g. ("311", "aarch64")"""
+        status, out, err = self.run(
+            "python3 -c \"import sys, platform; "
+            "print('%d%d %s' % (sys.version_info[0], sys.version_info[1], platform.machine()))\"")
+        if status != 0:
+            raise Exception(f"Cannot query remote Python: {err.strip()}")
+        python_tag, machine = out.split()
+        return python_tag, machine
+
+    def _upload_wheelhouse(self, wheelhouse):
+        """Copy wheelhouse files that are not on the Pi yet"""
+        sftp = self._sftp()
+        remote_dir = self._remote(WHEELHOUSE_DIR)
+        try:
+            existing = {attr.filename: attr.st_size for attr in sftp.listdir_attr(remote_dir)}
+        except IOError:
+            sftp.mkdir(remote_dir)
+            existing = {}
+        for file in os.listdir(wheelhouse):
+            local_file = os.path.join(wheelhouse, file)
+            if file.startswith('.') or existing.get(file) == os.path.getsize(local_file):
+                continue
+            sftp.put(local_file, posixpath.join(remote_dir, file))
+
+    def install_requirements(self, project_folder, log=None):
+        """
+        Install requirements.txt on the Pi unless it is unchanged since the
+        last successful install (hash stamp stored next to the project)
+        Returns: "unchanged", "wheelhouse" or "index" (how it was installed)
+        """
+        req_hash = hash_file(os.path.join(project_folder, REQUIREMENTS_FILE))
+        remote = shlex.quote(self.remote_path)
+        stamp = shlex.quote(self._remote(REQUIREMENTS_STAMP))
+
+        status, out, err = self.run(f"cat {stamp} 2>/dev/null")
+        if status == 0 and out.strip() == req_hash:
+            return "unchanged"
+
+        try:
+            method = "index"
+            python_tag, machine = self.remote_python()
+            wheelhouse = prepare_wheelhouse(project_folder, python_tag, machine, log)
+            if wheelhouse:
+                self._upload_wheelhouse(wheelhouse)
+                # Source distributions are built once into the Pi's wheelhouse,
+                # later deploys install the cached wheels
+                status, out, err = self.run(
+                    f"cd {remote} && python3 -m pip wheel --no-index --find-links {WHEELHOUSE_DIR} "
+                    f"--wheel-dir {WHEELHOUSE_DIR} -r {REQUIREMENTS_FILE} && "
+                    f"python3 -m pip install --user --no-index "
+                    f"--find-links {WHEELHOUSE_DIR} -r {REQUIREMENTS_FILE}")
+                if status == 0:
+                    method = "wheelhouse"
+                elif log:
+                    log("Wheelhouse install failed - falling back to package index")
+        finally:
+            self._close_sftp()
+
+        if method == "index":
+            status, out, err = self.run(f"cd {remote} && python3 -m pip install --user -r {REQUIREMENTS_FILE}")
+            if status != 0:
+                raise Exception(f"pip install failed: {(err or out).strip()[-500:]}")
+
+        # Stamp only after success - a failed install is retried next deploy
+        self.run(f"echo {req_hash} > {stamp}")
+        return method
+
+    def install_service(self, username):
+        """Write and enable the canmux systemd service"""
+        service_content = f"""[Unit]
+Description=CAN MUX Service
+After=network.target
+Wants=network.target
+
+[Service]
+Type=notify
+NotifyAccess=main
+TimeoutStartSec=60
+WatchdogSec=30
+RuntimeDirectory=canmux
+User={username}
+WorkingDirectory={self.remote_path}
+ExecStart=/usr/bin/python3 {self.remote_path}/main.py
+Restart=always
+RestartSec=5
+Environment=PYTHONPATH={self.remote_path}
+
+[Install]
+WantedBy=multi-user.target
+"""
+        self.run(f"echo '{service_content}' | sudo tee /etc/systemd/system/canmux.service")
+        status, out, err = self.run("sudo systemctl daemon-reload && sudo systemctl enable canmux.service")
+        if status != 0:
+            raise Exception(f"Service install failed: {err.strip()}")
+
+    def sync(self, project_folder, progress=None):
+        """
+        Upload the files that changed since the last deployment
+        progress: optional callback(done, total, file name)
+        Returns: (uploaded file names, number of unchanged files)
+        """
+        try:
+            self._ensure_remote_dir()
+            local_manifest = build_local_manifest(project_folder)
+            changed = self.plan(local_manifest, self.read_remote_manifest(), self._remote_sizes())
+            total = len(changed)
+
+            uploaded = []
+            if changed:
+                with ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="Deploy") as executor:
+                    futures = [executor.submit(self._upload, project_folder, file) for file in changed]
+                    for file, future in zip(changed, futures):
+                        try:
+                            uploaded.append(future.result())
+                        except Exception as e:
+                            raise Exception(f"Failed to upload {file}: {e}")
+                        if progress:
+                            progress(len(uploaded), total, file)
+
+            # Manifest written last - an interrupted sync is simply redone next time
+            with self._sftp().open(self._remote(MANIFEST_NAME), 'w') as f:
+                f.write(json.dumps(local_manifest, indent=1).encode())
+
+            return uploaded, len(local_manifest) - total
+        finally:
+            self._close_sftp()
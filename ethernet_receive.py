@@ -8,11 +8,53 @@ import socket
 import threading
 import struct
 import time
+import logging
+from collections import OrderedDict
 from zlib import crc32
 from led_control import LEDControl
+import port_extender
 from port_extender import InitPortExtender, PortExtenderSetPin, PortExtenderMaster, PortExtenderSlave, MASTER, SLAVE
 from FaBoGPIO_PCAL6408_Modified import PCAL6408_OUTPUT_REG
 from config_manager import ConfigManager
+from event_bus import EventBus, TOPIC_CHANNEL
+from telegram_stats import TelegramStats, TelegramTrace
+from metrics import ACTIVE_CONNECTIONS, CONNECTIONS, UDP_DATAGRAMS
+from flight_recorder import (RECORDER, EV_TELEGRAM, EV_TELEGRAM_ERROR, EV_CHANNEL,
+                             EV_CONNECT, EV_DISCONNECT)
+from logger import get_logger, fields
+from unix_socket import DEFAULT_MODE, create_unix_listener, close_unix_listener
+
+log = get_logger("ethernet")
+
+class TelegramState:
+    """Parse state of one TCP connection or one UDP datagram (the Arduino globals)"""
+    __slots__ = ("eth_input_byte", "eth_data_array", "crc_location", "index", "checksum", "trace")
+    
+    def __init__(self):
+        self.eth_input_byte = 0
+        self.eth_data_array = [0] * 10
+        self.crc_location = 0
+        self.index = 0
+        self.checksum = 0
+        # Stage timer of the telegram being processed
+        self.trace = None
+
+class DatagramReply:
+    """Socket stand-in that collects the response to one UDP telegram"""
+    
+    def __init__(self, connection):
+        self.data = bytearray()
+        self.connection = connection
+    
+    def send(self, data):
+        self.data += data
+        return len(data)
+    
+    def sendall(self, data):
+        self.data += data
+    
+    def fileno(self):
+        return self.connection
 
 class EthernetReceive:
     # Constants (same as Arduino)
@@ -28,27 +70,61 @@ class EthernetReceive:
     RETURN_SUCCESS = 0
     RETURN_ERROR = 1
     
+    # UDP transport: optional header = marker + 16-bit sequence number (big endian),
+    # echoed in the reply; repeated (sender, sequence) pairs get the cached reply
+    UDP_SEQUENCE_MARKER = 0xA5
+    UDP_HEADER_LENGTH = 3
+    UDP_MAX_DATAGRAM = 64
+    UDP_REPLY_CACHE = 256
+    
+    # Seconds heartbeat() waits for the extender lock before reporting a hang
+    HEARTBEAT_LOCK_TIMEOUT = 1.0
+    
     # Firmware version constants
     FW_VERSION_MAJOR = 1
     FW_VERSION_MINOR = 4
     
-    def __init__(self):
+    # Telegram ID -> name used in the latency statistics
+    TELEGRAM_TYPES = {
+        SELECT_CHANNEL: "select_channel",
+        GET_CHANNEL_STATUS: "get_channel_status",
+        GET_FIRMWARE_VERSION: "get_firmware_version"
+    }
+    
+    def __init__(self, event_bus=None):
         self.led = LEDControl()
         self.config = ConfigManager()
+        self.event_bus = event_bus if event_bus is not None else EventBus()
         
-        # Variables equivalent to Arduino globals
-        self.eth_input_byte = 0
-        self.eth_data_array = [0] * 10
-        self.crc_location = 0
-        self.index = 0
-        self.checksum = 0
+        # Serializes port extender access between telegram clients and the config server
+        self.extender_lock = threading.RLock()
+        
+        # Per-stage latency histograms and error counters (telegram_stats on port 3364)
+        self.stats = TelegramStats()
         
         # Socket server
         self.server_socket = None
+        self.bound_ip = None
         self.client_socket = None
         self.server_thread = None
         self.running = False
         
+        # UDP listener on the same port (udp_enabled = False turns it off)
+        self.udp_enabled = True
+        self.udp_socket = None
+        self.udp_thread = None
+        # (sender, sequence) -> reply, only touched by the UDP thread
+        self._udp_replies = OrderedDict()
+        
+        # Optional Unix socket listener for local controllers (unix_path = None -> off)
+        self.unix_path = None
+        self.unix_mode = DEFAULT_MODE
+        self.unix_group = None
+        self.unix_socket = None
+        
+        # Optional traffic recorder (telegram_capture.CaptureWriter) - None = off
+        self.capture = None
+        
     def eth_init(self):
         """
         Initialize Ethernet module - equivalent to EthInit()
@@ -59,47 +135,179 @@ class EthernetReceive:
             config = self.config.load_network_config()
             
             # Create server socket
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((config['ip'], self.ETH_PORT))
-            self.server_socket.listen(1)
+            self.server_socket = self._create_listener(config['ip'])
+            self.bound_ip = config['ip']
             
-            print(f"Ethernet server started on {config['ip']}:{self.ETH_PORT}")
+            log.info("Ethernet server started on %s:%s", config['ip'], self.ETH_PORT)
             
             # Start server in separate thread
             self.running = True
             self.server_thread = threading.Thread(target=self._server_loop, daemon=True)
             self.server_thread.start()
             
+            if self.udp_enabled:
+                self.start_udp(config['ip'])
+            if self.unix_path:
+                self.start_unix()
+            
             return "RETURN_SUCCESS"
             
         except Exception as e:
-            print(f"Ethernet initialization error: {e}")
+            log.error("Ethernet initialization error: %s", e)
             return "RETURN_ERROR"
     
+    def _create_listener(self, ip):
+        """Create, bind and listen the telegram server socket"""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((ip, self.ETH_PORT))
+            listener.listen(1)
+        except Exception:
+            listener.close()
+            raise
+        return listener
+    
+    def _create_datagram_socket(self, ip):
+        """Create and bind the UDP telegram socket"""
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            udp.bind((ip, self.ETH_PORT))
+        except Exception:
+            udp.close()
+            raise
+        return udp
+    
+    def start_udp(self, ip):
+        """Start the UDP listener - optional, the TCP server keeps running if it fails"""
+        try:
+            self.udp_socket = self._create_datagram_socket(ip)
+        except Exception as e:
+            self.udp_socket = None
+            log.warning("⚠️  UDP listener on %s:%s not started: %s", ip, self.ETH_PORT, e)
+            return
+        self.udp_thread = threading.Thread(target=self._udp_loop, daemon=True, name="UdpTelegrams")
+        self.udp_thread.start()
+        log.info("UDP telegram listener started on %s:%s", ip, self.ETH_PORT)
+    
+    def start_unix(self):
+        """Start the Unix socket listener - optional, the TCP server keeps running if it fails"""
+        try:
+            self.unix_socket = create_unix_listener(self.unix_path, self.unix_mode, self.unix_group)
+        except (OSError, ValueError) as e:
+            self.unix_socket = None
+            log.warning("⚠️  Unix telegram socket %s not started: %s", self.unix_path, e)
+            return
+        threading.Thread(target=self._unix_loop, daemon=True, name="UnixTelegrams").start()
+        log.info("Unix telegram socket listening on %s", self.unix_path)
+    
+    def heartbeat(self):
+        """
+        Check that telegrams can still be served - feeds the watchdog
+        Returns: None when healthy, otherwise the reason
+        """
+        if not self.extender_lock.acquire(timeout=self.HEARTBEAT_LOCK_TIMEOUT):
+            return f"extender lock held for more than {self.HEARTBEAT_LOCK_TIMEOUT} s"
+        self.extender_lock.release()
+        if self.server_thread is None or not self.server_thread.is_alive():
+            return "telegram server thread is not running"
+        if self.udp_thread is not None and not self.udp_thread.is_alive():
+            return "UDP listener thread is not running"
+        return None
+    
+    def rebind(self, ip):
+        """
+        Move the telegram listener to a new IP without restarting
+        Connected clients keep their sockets and finish normally
+        Returns: RETURN_SUCCESS or RETURN_ERROR (old listener is kept on error)
+        """
+        if ip == self.bound_ip:
+            return "RETURN_SUCCESS"
+        
+        new_udp = None
+        try:
+            new_listener = self._create_listener(ip)
+            if self.udp_socket is not None:
+                try:
+                    new_udp = self._create_datagram_socket(ip)
+                except Exception:
+                    new_listener.close()
+                    raise
+        except Exception as e:
+            log.error("Ethernet rebind to %s:%s failed: %s", ip, self.ETH_PORT, e)
+            return "RETURN_ERROR"
+        
+        old_listener, self.server_socket = self.server_socket, new_listener
+        self.bound_ip = ip
+        if old_listener is not None:
+            self._close_listener(old_listener)
+        if new_udp is not None:
+            old_udp, self.udp_socket = self.udp_socket, new_udp
+            self._close_listener(old_udp)
+        
+        log.info("Ethernet server rebound to %s:%s", ip, self.ETH_PORT)
+        return "RETURN_SUCCESS"
+    
+    @staticmethod
+    def _close_listener(listener):
+        """Close a listening socket, waking up a thread blocked in accept() / recvfrom()"""
+        try:
+            listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        listener.close()
+    
     def _server_loop(self):
         """Server loop running in separate thread"""
         while self.running:
+            listener = self.server_socket
             try:
-                print("Waiting for client connection...")
-                self.client_socket, client_address = self.server_socket.accept()
-                print(f"Client connected from {client_address}")
-                
-                # Handle client in separate thread
-                client_thread = threading.Thread(
-                    target=self._handle_client, 
-                    args=(self.client_socket,), 
-                    daemon=True
-                )
-                client_thread.start()
+                log.debug("Waiting for client connection...")
+                self.client_socket, client_address = listener.accept()
+                log.info("Client connected from %s", client_address)
+                self._start_client(self.client_socket, client_address)
                 
+            except Exception as e:
+                # A listener swapped out by rebind() is not an error
+                if self.running and listener is self.server_socket:
+                    log.error("Server loop error: %s", e)
+                    time.sleep(1)
+    
+    def _unix_loop(self):
+        """Unix socket server loop - clients are handled exactly like TCP clients"""
+        listener = self.unix_socket
+        while self.running:
+            try:
+                client_socket, _ = listener.accept()
+                log.info("Client connected on %s", self.unix_path)
+                self._start_client(client_socket, None)
             except Exception as e:
                 if self.running:
-                    print(f"Server loop error: {e}")
+                    log.error("Unix server loop error: %s", e)
                     time.sleep(1)
     
+    def _start_client(self, client_socket, client_address):
+        """Start the handler thread of an accepted client (client_address None = Unix socket)"""
+        RECORDER.record(EV_CONNECT, self.ETH_PORT, client_address[1] if client_address else 0,
+                        client_socket.fileno())
+        if self.capture is not None:
+            client_socket = self.capture.wrap(client_socket, client_address)
+        
+        # Handle client in separate thread
+        client_thread = threading.Thread(
+            target=self._handle_client, 
+            args=(client_socket,), 
+            daemon=True
+        )
+        client_thread.start()
+    
     def _handle_client(self, client_socket):
         """Handle individual client connection"""
+        CONNECTIONS.labels("telegram").inc()
+        ACTIVE_CONNECTIONS.labels("telegram").inc()
+        connection = client_socket.fileno()
+        state = TelegramState()
         try:
             while self.running:
                 data = client_socket.recv(1024)
@@ -108,81 +316,167 @@ class EthernetReceive:
                     
                 # Process received data byte by byte (Arduino style)
                 for byte_val in data:
-                    self._process_byte(byte_val, client_socket)
+                    self._process_byte(byte_val, client_socket, state)
                     
         except Exception as e:
-            print(f"Client handling error: {e}")
+            log.error("Client handling error: %s", e)
         finally:
+            ACTIVE_CONNECTIONS.labels("telegram").dec()
+            RECORDER.record(EV_DISCONNECT, self.ETH_PORT, 0, connection)
             client_socket.close()
     
-    def _process_byte(self, byte_val, client_socket):
+    def _udp_loop(self):
+        """UDP listener running in separate thread - one telegram per datagram"""
+        while self.running:
+            udp = self.udp_socket
+            try:
+                datagram, peer = udp.recvfrom(self.UDP_MAX_DATAGRAM)
+            except Exception as e:
+                # A socket swapped out by rebind() is not an error
+                if self.running and udp is self.udp_socket:
+                    log.error("UDP loop error: %s", e)
+                    time.sleep(1)
+                continue
+            if not self.running or udp is not self.udp_socket:
+                continue
+            
+            try:
+                reply = self._handle_datagram(datagram, peer, udp.fileno())
+                if reply:
+                    udp.sendto(reply, peer)
+            except Exception as e:
+                log.error("UDP telegram from %s failed: %s", peer, e)
+    
+    def _handle_datagram(self, datagram, peer, connection):
+        """
+        Run one datagram through the telegram engine
+        Returns: reply bytes (None = drop the datagram)
+        """
+        header = b""
+        key = None
+        if datagram[:1] == bytes([self.UDP_SEQUENCE_MARKER]):
+            header = datagram[:self.UDP_HEADER_LENGTH]
+            datagram = datagram[self.UDP_HEADER_LENGTH:]
+            if len(header) < self.UDP_HEADER_LENGTH:
+                UDP_DATAGRAMS.labels("invalid").inc()
+                return None
+            key = (peer, header)
+            cached = self._udp_replies.get(key)
+            if cached is not None:
+                # Retransmission of a telegram already executed - answer, don't switch again
+                self._udp_replies.move_to_end(key)
+                UDP_DATAGRAMS.labels("duplicate").inc()
+                return cached
+        if not datagram:
+            UDP_DATAGRAMS.labels("invalid").inc()
+            return None
+        
+        reply = DatagramReply(connection)
+        state = TelegramState()
+        state.eth_input_byte = datagram[0]
+        if self.check_length(state) == len(datagram):
+            for byte_val in datagram:
+                self._process_byte(byte_val, reply, state)
+            UDP_DATAGRAMS.labels("telegram").inc()
+        else:
+            # Unknown telegram ID, or not exactly one telegram in the datagram
+            state.eth_data_array[0] = datagram[0]
+            error = self.ERROR_PAYLOAD_NOK if state.crc_location else self.ERROR_TELEGRAM_ID_NOK
+            self.eth_error_response(error, reply, state)
+            UDP_DATAGRAMS.labels("invalid").inc()
+        
+        response = header + bytes(reply.data)
+        if key is not None:
+            self._udp_replies[key] = response
+            if len(self._udp_replies) > self.UDP_REPLY_CACHE:
+                self._udp_replies.popitem(last=False)
+        return response
+    
+    def _process_byte(self, byte_val, client_socket, state):
         """Process single byte - equivalent to Arduino byte processing logic"""
-        self.eth_input_byte = byte_val
+        state.eth_input_byte = byte_val
         
         # If this is the first byte, determine telegram length
-        if self.index == 0:
-            expected_length = self.check_length()
+        if state.index == 0:
+            state.trace = TelegramTrace()
+            expected_length = self.check_length(state)
             # Note: In real implementation, you might want to validate expected length
             
         # Put the byte into the data array
-        self.eth_data_array[self.index] = self.eth_input_byte
-        self.index += 1
+        state.eth_data_array[state.index] = state.eth_input_byte
+        state.index += 1
         
         # If all bytes have been received - end of telegram
-        if self.index == self.crc_location:
-            self._process_complete_telegram(client_socket)
+        if state.index == state.crc_location:
+            telegram_type = self.TELEGRAM_TYPES.get(state.eth_data_array[0], "unknown")
+            self._lap(state, "parse")
+            RECORDER.record(EV_TELEGRAM, state.eth_data_array[0], state.eth_data_array[1], client_socket.fileno())
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Telegram received", extra=fields(
+                    type=telegram_type, data=bytes(state.eth_data_array[:state.crc_location]).hex()))
+            self._process_complete_telegram(client_socket, state)
+            if state.trace is not None:
+                self.stats.record(telegram_type, state.trace)
+                state.trace = None
             # Reset for next telegram
-            self.index = 0
-            self.crc_location = 0
-            self.init_array()
+            state.index = 0
+            state.crc_location = 0
+            self.init_array(state)
     
-    def _process_complete_telegram(self, client_socket):
+    def _process_complete_telegram(self, client_socket, state):
         """Process complete telegram - equivalent to Arduino telegram processing"""
         # Load checksum data (last 4 bytes)
         received_checksum = (
-            self.eth_data_array[self.crc_location - 1] |
-            (self.eth_data_array[self.crc_location - 2] << 8) |
-            (self.eth_data_array[self.crc_location - 3] << 16) |
-            (self.eth_data_array[self.crc_location - 4] << 24)
+            state.eth_data_array[state.crc_location - 1] |
+            (state.eth_data_array[state.crc_location - 2] << 8) |
+            (state.eth_data_array[state.crc_location - 3] << 16) |
+            (state.eth_data_array[state.crc_location - 4] << 24)
         )
         
         # Calculate checksum
-        self.check_sum()
+        self.check_sum(state)
+        self._lap(state, "crc")
         
         # Check if checksum is OK
-        if self.checksum == received_checksum:
-            if self.eth_data_array[0] == self.SELECT_CHANNEL:
-                self.select_channel_telegram(client_socket)
-            elif self.eth_data_array[0] == self.GET_CHANNEL_STATUS:
-                self.get_channel_status(client_socket)
-            elif self.eth_data_array[0] == self.GET_FIRMWARE_VERSION:
-                self.get_firmware_version(client_socket)
+        if state.checksum == received_checksum:
+            if state.eth_data_array[0] == self.SELECT_CHANNEL:
+                self.select_channel_telegram(client_socket, state)
+            elif state.eth_data_array[0] == self.GET_CHANNEL_STATUS:
+                self.get_channel_status(client_socket, state)
+            elif state.eth_data_array[0] == self.GET_FIRMWARE_VERSION:
+                self.get_firmware_version(client_socket, state)
             else:
-                self.eth_error_response(self.ERROR_TELEGRAM_ID_NOK, client_socket)
+                self.eth_error_response(self.ERROR_TELEGRAM_ID_NOK, client_socket, state)
         else:
-            self.eth_error_response(self.ERROR_CHECKSUM_NOK, client_socket)
+            self.eth_error_response(self.ERROR_CHECKSUM_NOK, client_socket, state)
     
-    def check_length(self):
+    @staticmethod
+    def _lap(state, stage):
+        """End a stage of the current telegram (no-op outside telegram processing)"""
+        if state.trace is not None:
+            state.trace.lap(stage)
+    
+    def check_length(self, state):
         """Set telegram length based on telegram ID - equivalent to CheckLength()"""
-        if self.eth_input_byte == self.SELECT_CHANNEL:
-            self.crc_location = 6
-        elif self.eth_input_byte == self.GET_CHANNEL_STATUS:
-            self.crc_location = 6
-        elif self.eth_input_byte == self.GET_FIRMWARE_VERSION:
-            self.crc_location = 5
+        if state.eth_input_byte == self.SELECT_CHANNEL:
+            state.crc_location = 6
+        elif state.eth_input_byte == self.GET_CHANNEL_STATUS:
+            state.crc_location = 6
+        elif state.eth_input_byte == self.GET_FIRMWARE_VERSION:
+            state.crc_location = 5
         
-        return self.crc_location
+        return state.crc_location
     
-    def check_sum(self):
+    def check_sum(self, state):
         """Calculate CRC32 checksum - equivalent to CheckSum()"""
-        data_for_crc = bytes(self.eth_data_array[:self.crc_location - 4])
-        self.checksum = crc32(data_for_crc) & 0xFFFFFFFF
+        data_for_crc = bytes(state.eth_data_array[:state.crc_location - 4])
+        state.checksum = crc32(data_for_crc) & 0xFFFFFFFF
     
-    def init_array(self):
+    def init_array(self, state):
         """Reset data array - equivalent to InitArray()"""
-        self.eth_data_array = [0] * 10
+        state.eth_data_array = [0] * 10
     
-    def eth_error_response(self, error_message, client_socket):
+    def eth_error_response(self, error_message, client_socket, state):
         """Send error response - equivalent to EthErrorResponse()"""
         response = [0xFF, error_message]
         
@@ -198,75 +492,131 @@ class EthernetReceive:
             checksum & 0xFF
         ])
         
+        RECORDER.record(EV_TELEGRAM_ERROR, error_message, state.eth_data_array[0], client_socket.fileno())
+        
         # Send error message
         client_socket.send(bytes(response))
+        self._lap(state, "send")
+        
+        if error_message == self.ERROR_CHECKSUM_NOK:
+            self.stats.count_error("crc")
+        elif error_message == self.ERROR_PAYLOAD_NOK:
+            self.stats.count_error("payload")
+        elif error_message == self.ERROR_TELEGRAM_ID_NOK:
+            self.stats.count_error("telegram_id")
         
         # Turn color yellow (red + green)
         self.led.digital_write(self.led.GREEN_LED_PIN, True)
         self.led.digital_write(self.led.RED_LED_PIN, True)
+        self._lap(state, "led")
     
-    def select_channel_telegram(self, client_socket):
+    def select_channel_telegram(self, client_socket, state):
         """Handle select channel telegram - equivalent to SelectChannelTelegram()"""
         # Check if master or slave nibble is correct (exact Arduino logic)
-        if ((self.eth_data_array[1] >> 4) == 1) or ((self.eth_data_array[1] >> 4) == 0):
+        if ((state.eth_data_array[1] >> 4) == 1) or ((state.eth_data_array[1] >> 4) == 0):
             # Check if port is in range (exact Arduino logic)
-            if (self.eth_data_array[1] & 0x0F) <= 8:
-                # if telegram is for the master (exact Arduino logic)
-                if (self.eth_data_array[1] >> 4) == 0:
-                    PortExtenderSetPin(self.eth_data_array[1] & 0x0F, MASTER)
-                else:  # if telegram is for the slave
-                    PortExtenderSetPin(self.eth_data_array[1] & 0x0F, SLAVE)
+            if (state.eth_data_array[1] & 0x0F) <= 8:
+                # master (nibble 0) or slave (nibble 1) - same engine as the config server
+                self.select_channel(state.eth_data_array[1] >> 4, state.eth_data_array[1] & 0x0F, "telegram")
+                self._lap(state, "i2c")
                 
                 # Send response - same as received telegram (Arduino comment: don't need to recalculate CRC32)
-                response = self.eth_data_array[:6]
+                response = state.eth_data_array[:6]
                 client_socket.send(bytes(response))
+                self._lap(state, "send")
                 
                 # Turn switch color green (exact Arduino logic)
                 self.led.digital_write(self.led.RED_LED_PIN, False)
                 self.led.digital_write(self.led.GREEN_LED_PIN, True)
+                self._lap(state, "led")
             else:
-                self.eth_error_response(self.ERROR_PAYLOAD_NOK, client_socket)
+                self.eth_error_response(self.ERROR_PAYLOAD_NOK, client_socket, state)
         else:
-            self.eth_error_response(self.ERROR_PAYLOAD_NOK, client_socket)
+            self.eth_error_response(self.ERROR_PAYLOAD_NOK, client_socket, state)
+    
+    def select_channel(self, extender_nibble, channel, source):
+        """
+        Switch one extender to a channel (0 = all off) and publish the change
+        extender_nibble: 0 = master, 1 = slave (telegram encoding)
+        Returns: switch duration in ms
+        """
+        with self.extender_lock:
+            switch_start = time.perf_counter()
+            if extender_nibble == 0:
+                PortExtenderSetPin(channel, MASTER)
+            else:
+                PortExtenderSetPin(channel, SLAVE)
+            switch_ms = (time.perf_counter() - switch_start) * 1000.0
+        RECORDER.record(EV_CHANNEL, extender_nibble, channel, int(switch_ms * 1000))
+        
+        self.publish_channel_change(extender_nibble, channel, switch_ms, source)
+        return switch_ms
+    
+    def read_output_status(self, extender_nibble):
+        """Read the output register of one extender (0 = master, 1 = slave)"""
+        with self.extender_lock:
+            if extender_nibble == 0:
+                return port_extender.PortExtenderMaster.readOuputStatus(PCAL6408_OUTPUT_REG)
+            return port_extender.PortExtenderSlave.readOuputStatus(PCAL6408_OUTPUT_REG)
+    
+    @staticmethod
+    def decode_channel(output_status):
+        """Output register -> selected channel (0 = none, None = several pins set)"""
+        if output_status == 0:
+            return 0
+        if output_status & (output_status - 1):
+            return None
+        return output_status.bit_length()
+    
+    def publish_channel_change(self, extender_nibble, channel, switch_ms, source):
+        """Publish a channel switch to event bus subscribers (nibble 0 = master, 1 = slave)"""
+        extender = "master" if extender_nibble == 0 else "slave"
+        self.event_bus.publish(TOPIC_CHANNEL, extender, {
+            "extender": extender,
+            "channel": channel,
+            "switch_ms": round(switch_ms, 3),
+            "source": source
+        })
     
-    def get_channel_status(self, client_socket):
+    def get_channel_status(self, client_socket, state):
         """Get current channel status - equivalent to GetChannelStatus()"""
         # Check if payload (master/slave) is correct (exact Arduino logic and comment)
-        if (self.eth_data_array[1] == 1) or (self.eth_data_array[1] == 0):
-            # if telegram is for the master (exact Arduino logic)
-            if (self.eth_data_array[1] >> 4) == 0:
-                self.eth_data_array[1] = PortExtenderMaster.readOuputStatus(PCAL6408_OUTPUT_REG)
-            else:  # if telegram is for the slave
-                self.eth_data_array[1] = PortExtenderSlave.readOuputStatus(PCAL6408_OUTPUT_REG)
+        if (state.eth_data_array[1] == 1) or (state.eth_data_array[1] == 0):
+            # master or slave selected by the high nibble (exact Arduino logic)
+            state.eth_data_array[1] = self.read_output_status(state.eth_data_array[1] >> 4)
+            self._lap(state, "i2c")
             
             # Send response (exact Arduino logic)
-            client_socket.send(bytes([self.eth_data_array[0]]))  # Telegram ID
-            client_socket.send(bytes([self.eth_data_array[1]]))  # Payload - Port Status
+            client_socket.send(bytes([state.eth_data_array[0]]))  # Telegram ID
+            client_socket.send(bytes([state.eth_data_array[1]]))  # Payload - Port Status
             
             # CRC32 has to be calculated every time because of the variable value of the port (Arduino comment)
-            data_for_crc = bytes([self.eth_data_array[0], self.eth_data_array[1]])
+            data_for_crc = bytes([state.eth_data_array[0], state.eth_data_array[1]])
             checksum = crc32(data_for_crc) & 0xFFFFFFFF
             
-            self.eth_data_array[2] = (checksum >> 24) & 0xFF
-            self.eth_data_array[3] = (checksum >> 16) & 0xFF
-            self.eth_data_array[4] = (checksum >> 8) & 0xFF
-            self.eth_data_array[5] = checksum & 0xFF
+            state.eth_data_array[2] = (checksum >> 24) & 0xFF
+            state.eth_data_array[3] = (checksum >> 16) & 0xFF
+            state.eth_data_array[4] = (checksum >> 8) & 0xFF
+            state.eth_data_array[5] = checksum & 0xFF
             
-            client_socket.send(bytes([self.eth_data_array[2]]))  # CRC byte 1
-            client_socket.send(bytes([self.eth_data_array[3]]))  # CRC byte 2
-            client_socket.send(bytes([self.eth_data_array[4]]))  # CRC byte 3
-            client_socket.send(bytes([self.eth_data_array[5]]))  # CRC byte 4
+            client_socket.send(bytes([state.eth_data_array[2]]))  # CRC byte 1
+            client_socket.send(bytes([state.eth_data_array[3]]))  # CRC byte 2
+            client_socket.send(bytes([state.eth_data_array[4]]))  # CRC byte 3
+            client_socket.send(bytes([state.eth_data_array[5]]))  # CRC byte 4
+            # Response CRC is computed between the sends - counted as send time
+            self._lap(state, "send")
             
             # Turn switch color green (exact Arduino logic)
             self.led.digital_write(self.led.RED_LED_PIN, False)
             self.led.digital_write(self.led.GREEN_LED_PIN, True)
+            self._lap(state, "led")
         else:
-            self.eth_error_response(self.ERROR_PAYLOAD_NOK, client_socket)
+            self.eth_error_response(self.ERROR_PAYLOAD_NOK, client_socket, state)
     
-    def get_firmware_version(self, client_socket):
+    def get_firmware_version(self, client_socket, state):
         """Get firmware version - equivalent to GetFirmwareVersion()"""
         response = [
-            self.eth_data_array[0],
+            state.eth_data_array[0],
             self.FW_VERSION_MAJOR,
             self.FW_VERSION_MINOR
         ]
@@ -284,10 +634,12 @@ class EthernetReceive:
         ])
         
         client_socket.send(bytes(response))
+        self._lap(state, "send")
         
         # Turn switch color green
         self.led.digital_write(self.led.RED_LED_PIN, False)
         self.led.digital_write(self.led.GREEN_LED_PIN, True)
+        self._lap(state, "led")
     
     def eth_receive_telegram(self):
         """Main receive function - equivalent to EthReceiveTelegram()"""
@@ -300,5 +652,9 @@ class EthernetReceive:
         self.running = False
         if self.server_socket:
             self.server_socket.close()
+        if self.udp_socket:
+            self._close_listener(self.udp_socket)
+        if self.unix_socket:
+            close_unix_listener(self.unix_socket, self.unix_path)
         if self.client_socket:
             self.client_socket.close()
\ No newline at end of file
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Event Bus - in-process publish/subscribe for CAN MUX state changes
+Config commits and channel switches are published here and streamed
+to subscribed clients of the configuration server (port 3364)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Event topics
+TOPIC_CONFIG = "config"
+TOPIC_CHANNEL = "channel"
+ALL_TOPICS = (TOPIC_CONFIG, TOPIC_CHANNEL)
+
+# Default bound for the pending events of one subscriber
+DEFAULT_MAX_PENDING = 64
+
+class Subscription:
+    """
+    Bounded, coalescing event queue for one subscriber
+    An event with the same key as a pending one replaces it in place, so a
+    slow consumer only receives the latest state for each key
+    """
+
+    def __init__(self, topics, max_pending=DEFAULT_MAX_PENDING):
+        self.topics = frozenset(topics)
+        self.max_pending = max_pending
+        self.coalesced = 0
+        self.dropped = 0
+        self.closed = False
+        self._pending = OrderedDict()
+        self._overflow = False
+        self._cond = threading.Condition()
+
+    def offer(self, key, event):
+        """Queue an event - never blocks the publisher"""
+        with self._cond:
+            if self.closed:
+                return
+            if key in self._pending:
+                # Coalesce: keep queue position, replace with the newest state
+                self._pending[key] = event
+                self.coalesced += 1
+            else:
+                if len(self._pending) >= self.max_pending:
+                    # Queue full - drop the oldest key and ask the client to resync
+                    self._pending.popitem(last=False)
+                    self.dropped += 1
+                    self._overflow = True
+                self._pending[key] = event
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event
+        Returns: event dict, or None on timeout / after close()
+        """
+        with self._cond:
+            if not self._pending and not self._overflow and not self.closed:
+                self._cond.wait(timeout)
+            if self.closed:
+                return None
+            if self._overflow:
+                # Reported before the remaining events so the client knows some were lost
+                self._overflow = False
+                return {
+                    "event": "overflow",
+                    "timestamp": time.time(),
+                    "data": {"dropped": self.dropped}
+                }
+            if not self._pending:
+                return None
+            return self._pending.popitem(last=False)[1]
+
+    def close(self):
+        """Close the subscription and wake any waiting consumer"""
+        with self._cond:
+            self.closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+
+class EventBus:
+    """
+    Fan-out of state change events to all subscriptions
+    Publishing with no subscribers costs a single attribute check, so the
+    telegram path can publish unconditionally
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Copy-on-write list - publishers iterate it without taking the lock
+        self._subscriptions = ()
+        self._seq = 0
+
+    def subscribe(self, topics=ALL_TOPICS, max_pending=DEFAULT_MAX_PENDING):
+        """Create and register a new subscription"""
+        subscription = Subscription(topics, max_pending)
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove and close a subscription"""
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+        subscription.close()
+
+    def publish(self, topic, key, data):
+        """
+        Publish an event
+        topic: TOPIC_CONFIG or TOPIC_CHANNEL
+        key: coalescing key inside the topic (e.g. extender name)
+        data: JSON-serializable payload
+        """
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+
+        event = {
+            "event": topic,
+            "seq": seq,
+            "timestamp": time.time(),
+            "data": data
+        }
+
+        for subscription in subscriptions:
+            if topic in subscription.topics:
+                subscription.offer((topic, key), event)
+
+    def subscriber_count(self):
+        """Number of active subscriptions"""
+        return len(self._subscriptions)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+CAN MUX Fleet
+Concurrent operations on many CAN MUX devices, used by the GUI fleet view
+Every device keeps its own SSH and config server connections; operations
+are fanned out over a bounded worker pool and report per-device progress
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config_client import ConfigClient
+from config_protocol import ENCODING_MSGPACK
+from deployer import Deployer, REMOTE_PATH
+from ssh_connection import SSHConnection
+
+# Devices worked on at the same time
+FLEET_WORKERS = 8
+
+# Config server encoding asked for by the fleet view (JSON if either side lacks msgpack)
+FLEET_ENCODING = ENCODING_MSGPACK
+
+# Network settings shared by the whole fleet (IP and MAC stay per device)
+SHARED_CONFIG_KEYS = ("subnet_mask", "gateway", "dns")
+
+class FleetDevice:
+    """One CAN MUX of the fleet and its connections"""
+
+    def __init__(self, host):
+        self.host = host
+        self.ssh_client = None
+        self.config_client = None
+        self.state = "idle"
+        self.detail = ""
+
+    @property
+    def connected(self):
+        return self.ssh_client is not None
+
+    def connect(self, username, password, timeout=10):
+        """Open the SSH connection (config server connection opens on first request)"""
+        self.close()
+        self.ssh_client = SSHConnection(self.host, username, password, timeout).connect()
+        self.config_client = ConfigClient(self.host, encoding=FLEET_ENCODING)
+        return "Connected"
+
+    def close(self):
+        """Close both connections"""
+        if self.config_client is not None:
+            self.config_client.close()
+            self.config_client = None
+        if self.ssh_client is not None:
+            self.ssh_client.close()
+            self.ssh_client = None
+
+    def _require_ssh(self):
+        if self.ssh_client is None:
+            raise Exception("Not connected")
+
+    def status(self):
+        """Service state and firmware version, e.g. "active, FW 1.4" """
+        self._require_ssh()
+        stdin, stdout, stderr = self.ssh_client.exec_command("systemctl is-active canmux.service")
+        service = stdout.read().decode().strip() or "unknown"
+        try:
+            firmware = self.config_client.request("get_firmware")
+            version = firmware["data"]["version"] if firmware.get("status") == "success" else "?"
+        except Exception:
+            version = "n/a"
+        return f"{service}, FW {version}"
+
+    def push_config(self, config_data):
+        """Write network settings through the config server"""
+        if self.config_client is None:
+            self.config_client = ConfigClient(self.host, encoding=FLEET_ENCODING)
+        return self.config_client.update_config(config_data) or "Configuration saved"
+
+    def deploy(self, project_folder, username, report):
+        """Delta upload, dependencies, service file and restart"""
+        self._require_ssh()
+        deployer = Deployer(self.ssh_client, REMOTE_PATH)
+
+        def on_progress(done, total, file):
+            report(f"Uploading {done}/{total}")
+
+        uploaded, unchanged = deployer.sync(project_folder, on_progress)
+        report("Checking dependencies")
+        method = deployer.install_requirements(project_folder)
+        report("Installing service")
+        deployer.install_service(username)
+        status, out, err = deployer.run("sudo systemctl restart canmux.service")
+        if status != 0:
+            raise Exception(f"Restart failed: {err.strip()}")
+        report("Waiting for ready")
+        self.config_client.wait_ready()
+        return f"{len(uploaded)} files uploaded, {unchanged} unchanged, dependencies {method}"
+
+class Fleet:
+    """Device list plus concurrent fan-out of operations"""
+
+    def __init__(self, max_workers=FLEET_WORKERS):
+        self.max_workers = max_workers
+        self.devices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, host):
+        """Add a device (no-op if already in the list)"""
+        with self._lock:
+            if host not in self.devices:
+                self.devices[host] = FleetDevice(host)
+            return self.devices[host]
+
+    def remove(self, host):
+        """Remove a device and close its connections"""
+        with self._lock:
+            device = self.devices.pop(host, None)
+        if device is not None:
+            device.close()
+
+    def close_all(self):
+        for device in list(self.devices.values()):
+            device.close()
+
+    def run(self, operation, hosts=None, cancel_event=None, on_update=None):
+        """
+        Run operation(device, report) on many devices in parallel
+        report(message) updates the device detail while it runs
+        on_update(host, state, detail) is called from the worker threads
+        state: "running", "ok", "failed" or "cancelled"
+        Returns: {host: (ok, result or error message)}
+        """
+        devices = [self.devices[h] for h in (hosts or list(self.devices)) if h in self.devices]
+
+        def update(device, state, detail):
+            device.state, device.detail = state, detail
+            if on_update:
+                on_update(device.host, state, detail)
+
+        def work(device):
+            if cancel_event is not None and cancel_event.is_set():
+                update(device, "cancelled", "Cancelled")
+                return device.host, (False, "Cancelled")
+            update(device, "running", "Started")
+            try:
+                result = operation(device, lambda message: update(device, "running", message))
+            except Exception as e:
+                update(device, "failed", str(e))
+                return device.host, (False, str(e))
+            update(device, "ok", str(result))
+            return device.host, (True, result)
+
+        if not devices:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(devices)),
+                                thread_name_prefix="Fleet") as executor:
+            return dict(executor.map(work, devices))
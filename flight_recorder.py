@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Flight Recorder - the last few thousand events of the daemon, for post-mortems
+Telegrams, I2C transactions and state changes are written into a fixed ring
+of preallocated integer arrays (no objects are built per event, nothing is
+formatted), so recording stays on in production. The ring is decoded and
+written to a JSON file only when something goes wrong:
+
+    - unhandled exception (main loop or any thread)
+    - SIGUSR1 (kill -USR1 <pid> - live snapshot, the daemon keeps running)
+    - watchdog timeout (heartbeat check failing, e.g. extender lock stuck)
+"""
+
+import itertools
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from array import array
+from datetime import datetime
+from glob import glob
+
+from readiness import sd_notify
+from logger import get_logger
+
+log = get_logger("flight")
+
+# Slots in the ring (power of two)
+DEFAULT_CAPACITY = 4096
+# Dumps kept in the dump directory, older ones are removed
+MAX_DUMPS = 10
+# Seconds without a successful heartbeat before the watchdog fires
+WATCHDOG_TIMEOUT = 10.0
+
+# Event kinds and the meaning of their a/b/c values
+EV_TELEGRAM = 1         # telegram ID, first payload byte, connection
+EV_TELEGRAM_ERROR = 2   # error code, telegram ID, connection
+EV_I2C_WRITE = 3        # device address, register, value
+EV_I2C_READ = 4         # device address, register, value
+EV_I2C_ERROR = 5        # device address, register, 0 = read / 1 = write
+EV_CHANNEL = 6          # extender (0 = master, 1 = slave), channel, switch time in us
+EV_CONNECT = 7          # server port, peer port, connection
+EV_DISCONNECT = 8       # server port, 0, connection
+EV_CONFIG = 9           # IP address as 32-bit integer
+EV_MARK = 10            # free-form marker (a/b/c caller defined)
+
+EVENT_NAMES = {
+    EV_TELEGRAM: "telegram", EV_TELEGRAM_ERROR: "telegram_error", EV_I2C_WRITE: "i2c_write",
+    EV_I2C_READ: "i2c_read", EV_I2C_ERROR: "i2c_error", EV_CHANNEL: "channel",
+    EV_CONNECT: "connect", EV_DISCONNECT: "disconnect", EV_CONFIG: "config", EV_MARK: "mark",
+}
+
+def _describe(kind, a, b, c):
+    """Human readable event text (only built when dumping)"""
+    if kind == EV_TELEGRAM:
+        return f"telegram 0x{a:02X} payload 0x{b:02X} conn {c}"
+    if kind == EV_TELEGRAM_ERROR:
+        return f"error response 0x{a:02X} to telegram 0x{b:02X} conn {c}"
+    if kind in (EV_I2C_WRITE, EV_I2C_READ):
+        return f"{'write' if kind == EV_I2C_WRITE else 'read'} 0x{a:02X} reg 0x{b:02X} = 0x{c:02X}"
+    if kind == EV_I2C_ERROR:
+        return f"{'write' if c else 'read'} 0x{a:02X} reg 0x{b:02X} failed"
+    if kind == EV_CHANNEL:
+        return f"{'master' if a == 0 else 'slave'} -> channel {b} ({c} us)"
+    if kind == EV_CONNECT:
+        return f"port {a}: client port {b} connected (conn {c})"
+    if kind == EV_DISCONNECT:
+        return f"port {a}: conn {c} closed"
+    if kind == EV_CONFIG:
+        return f"network config committed, ip {a >> 24 & 255}.{a >> 16 & 255}.{a >> 8 & 255}.{a & 255}"
+    return f"{a} {b} {c}"
+
+class FlightRecorder:
+    """
+    Ring of the most recent events in preallocated arrays
+    record() is lock-free: each call claims a slot from an atomic counter.
+    Events carry a per-thread serial rather than the thread ident, which the
+    OS reuses, so events of finished threads are never shown under the name
+    of a newer thread
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._seq = array('q', [-1]) * capacity
+        self._times = array('q', [0]) * capacity
+        self._threads = array('Q', [0]) * capacity
+        self._kinds = array('B', [0]) * capacity
+        self._a = array('q', [0]) * capacity
+        self._b = array('q', [0]) * capacity
+        self._c = array('q', [0]) * capacity
+        self._counter = itertools.count()
+        # Thread serial -> thread, serials are never reused
+        self._local = threading.local()
+        self._serials = itertools.count(1)
+        self._thread_by_serial = {}
+        self.dump_dir = "."
+        self._dump_lock = threading.Lock()
+
+    def record(self, kind, a=0, b=0, c=0):
+        """Store one event, overwriting the oldest"""
+        seq = next(self._counter)
+        slot = seq & self._mask
+        self._seq[slot] = -1  # slot being rewritten
+        self._times[slot] = time.time_ns()
+        try:
+            self._threads[slot] = self._local.serial
+        except AttributeError:
+            self._threads[slot] = self._register_thread()
+        self._kinds[slot] = kind
+        self._a[slot] = a
+        self._b[slot] = b
+        self._c[slot] = c
+        self._seq[slot] = seq
+
+    def _register_thread(self):
+        """Give the calling thread its serial (first event of the thread)"""
+        serial = next(self._serials)
+        if len(self._thread_by_serial) >= self.capacity:
+            # Forget finished threads that no longer have events in the ring
+            in_ring = set(self._threads)
+            for old, thread in list(self._thread_by_serial.items()):
+                if old not in in_ring and not thread.is_alive():
+                    self._thread_by_serial.pop(old, None)
+        self._thread_by_serial[serial] = threading.current_thread()
+        self._local.serial = serial
+        return serial
+
+    def _thread_name(self, serial):
+        thread = self._thread_by_serial.get(serial)
+        if thread is None:
+            return str(serial)
+        return thread.name if thread.is_alive() else f"{thread.name} (exited)"
+
+    def events(self):
+        """Decoded events, oldest first"""
+        events = []
+        for slot in range(self.capacity):
+            seq = self._seq[slot]
+            if seq < 0:
+                continue
+            kind, a, b, c = self._kinds[slot], self._a[slot], self._b[slot], self._c[slot]
+            thread = self._threads[slot]
+            events.append({
+                "seq": seq,
+                "time": self._times[slot] / 1e9,
+                "thread": self._thread_name(thread),
+                "event": EVENT_NAMES.get(kind, str(kind)),
+                "text": _describe(kind, a, b, c),
+                "values": [a, b, c]
+            })
+        events.sort(key=lambda event: event["seq"])
+        return events
+
+    def dump(self, reason, exc_info=None, directory=None):
+        """
+        Write the ring, the exception (if any) and all thread stacks to a file
+        Returns: path of the dump, None if it could not be written
+        """
+        directory = directory or self.dump_dir
+        frames = sys._current_frames()
+        threads = {thread.name: "".join(traceback.format_stack(frames[thread.ident]))
+                   for thread in threading.enumerate() if thread.ident in frames}
+        document = {
+            "reason": reason,
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "pid": os.getpid(),
+            "exception": "".join(traceback.format_exception(*exc_info)) if exc_info else None,
+            "threads": threads,
+            "events": self.events()
+        }
+        with self._dump_lock:
+            path = os.path.join(directory, f"flight_{datetime.now():%Y%m%d_%H%M%S_%f}_{reason}.json")
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with open(path, "w") as f:
+                    json.dump(document, f, indent=1)
+                self._prune(directory)
+            except OSError as e:
+                sys.__stderr__.write(f"Flight recorder dump to {path} failed: {e}\n")
+                return None
+        log.warning("🛩️  Flight recorder dump (%s): %s", reason, path)
+        return path
+
+    @staticmethod
+    def _prune(directory):
+        dumps = sorted(glob(os.path.join(directory, "flight_*.json")))
+        for old in dumps[:-MAX_DUMPS]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def install(self, directory="."):
+        """Dump on unhandled exceptions (all threads) and on SIGUSR1"""
+        self.dump_dir = directory
+        previous_excepthook = sys.excepthook
+        previous_thread_excepthook = threading.excepthook
+
+        def excepthook(exc_type, exc_value, exc_traceback):
+            if not issubclass(exc_type, KeyboardInterrupt):
+                self.dump("exception", (exc_type, exc_value, exc_traceback))
+            previous_excepthook(exc_type, exc_value, exc_traceback)
+
+        def thread_excepthook(args):
+            if args.exc_type is not SystemExit:
+                self.dump("thread_exception", (args.exc_type, args.exc_value, args.exc_traceback))
+            previous_thread_excepthook(args)
+
+        sys.excepthook = excepthook
+        threading.excepthook = thread_excepthook
+        try:
+            # Dump from a thread - the handler may interrupt a log write or the ring writer
+            signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(
+                target=self.dump, args=("sigusr1",), daemon=True, name="FlightDump").start())
+        except ValueError:
+            # Not in the main thread - signals are not available
+            pass
+
+class Watchdog:
+    """
+    Detects a hung daemon
+    The monitor thread runs check() (None = healthy, otherwise the reason)
+    every period and feeds itself when it passes; feed() can also be called
+    directly. After timeout seconds without a feed the flight recorder is
+    dumped once per stall and, under systemd with WatchdogSec, WATCHDOG=1 is
+    no longer pinged (systemd then restarts the hung daemon)
+    """
+
+    def __init__(self, recorder, timeout=WATCHDOG_TIMEOUT, check=None):
+        self.recorder = recorder
+        self.timeout = timeout
+        self.check = check
+        self.last_feed = time.monotonic()
+        self.last_problem = None
+        self.timeouts = 0
+        self._stop = threading.Event()
+        watchdog_usec = os.environ.get("WATCHDOG_USEC")
+        # Ping systemd at half its watchdog period
+        self._ping_interval = int(watchdog_usec) / 2e6 if watchdog_usec and watchdog_usec.isdigit() else None
+
+    def feed(self):
+        self.last_feed = time.monotonic()
+
+    def start(self):
+        self.feed()
+        threading.Thread(target=self._monitor, daemon=True, name="Watchdog").start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _monitor(self):
+        interval = min(self.timeout / 4, self._ping_interval or self.timeout / 4)
+        stalled = False
+        while not self._stop.wait(interval):
+            if self.check is not None:
+                try:
+                    self.last_problem = self.check()
+                except Exception as e:
+                    self.last_problem = f"heartbeat failed: {e}"
+                if self.last_problem is None:
+                    self.feed()
+            idle = time.monotonic() - self.last_feed
+            if idle < self.timeout:
+                stalled = False
+                if self._ping_interval:
+                    sd_notify("WATCHDOG=1")
+            elif not stalled:
+                stalled = True
+                self.timeouts += 1
+                log.error("❌ Watchdog: no heartbeat for %.0f s (%s)", idle, self.last_problem or "not fed")
+                self.recorder.dump("watchdog")
+
+# Recorder shared by the whole daemon
+RECORDER = FlightRecorder()
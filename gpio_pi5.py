@@ -6,6 +6,7 @@ Provides compatibility layer between lgpio (Pi 5) and RPi.GPIO (older Pi)
 
 import sys
 import platform
+from sim_backend import SIMULATE, SimulatedGPIO
 
 # Try to detect Raspberry Pi 5
 def is_raspberry_pi_5():
@@ -19,7 +20,11 @@ def is_raspberry_pi_5():
 # Initialize GPIO library based on Pi version
 PI5_DETECTED = is_raspberry_pi_5()
 
-if PI5_DETECTED:
+if SIMULATE:
+    print("CANMUX_SIMULATE set - using simulated GPIO")
+    GPIO = SimulatedGPIO
+    GPIO_LIB = 'sim'
+elif PI5_DETECTED:
     print("Raspberry Pi 5 detected - using lgpio library")
     try:
         import lgpio
@@ -35,6 +40,10 @@ else:
     import RPi.GPIO as GPIO
     GPIO_LIB = 'RPi.GPIO'
 
+# Backend module for the RPi.GPIO / simulated paths - GPIO itself is re-exported
+# as the GPIO_Pi5 wrapper below, so the wrapper must not call through it
+_backend = GPIO if GPIO_LIB != 'lgpio' else None
+
 class GPIO_Pi5:
     """
     GPIO wrapper class that works on both Pi 5 (lgpio) and older Pi (RPi.GPIO)
@@ -55,13 +64,13 @@ class GPIO_Pi5:
     def setmode(mode):
         """Set GPIO numbering mode"""
         if GPIO_LIB == 'RPi.GPIO':
-            GPIO.setmode(GPIO.BCM if mode == GPIO_Pi5.BCM else GPIO.BOARD)
+            _backend.setmode(_backend.BCM if mode == GPIO_Pi5.BCM else _backend.BOARD)
     
     @staticmethod
     def setwarnings(state):
         """Enable/disable warnings"""
         if GPIO_LIB == 'RPi.GPIO':
-            GPIO.setwarnings(state)
+            _backend.setwarnings(state)
     
     @staticmethod
     def setup(pin, mode, pull_up_down=PUD_OFF):
@@ -78,12 +87,12 @@ class GPIO_Pi5:
                     lgpio.gpio_claim_input(gpio_chip, pin)
         else:  # RPi.GPIO
             pud_map = {
-                GPIO_Pi5.PUD_OFF: GPIO.PUD_OFF,
-                GPIO_Pi5.PUD_UP: GPIO.PUD_UP,
-                GPIO_Pi5.PUD_DOWN: GPIO.PUD_DOWN
+                GPIO_Pi5.PUD_OFF: _backend.PUD_OFF,
+                GPIO_Pi5.PUD_UP: _backend.PUD_UP,
+                GPIO_Pi5.PUD_DOWN: _backend.PUD_DOWN
             }
-            mode_map = {GPIO_Pi5.OUT: GPIO.OUT, GPIO_Pi5.IN: GPIO.IN}
-            GPIO.setup(pin, mode_map[mode], pull_up_down=pud_map[pull_up_down])
+            mode_map = {GPIO_Pi5.OUT: _backend.OUT, GPIO_Pi5.IN: _backend.IN}
+            _backend.setup(pin, mode_map[mode], pull_up_down=pud_map[pull_up_down])
     
     @staticmethod
     def output(pin, value):
@@ -91,7 +100,7 @@ class GPIO_Pi5:
         if GPIO_LIB == 'lgpio':
             lgpio.gpio_write(gpio_chip, pin, value)
         else:
-            GPIO.output(pin, value)
+            _backend.output(pin, value)
     
     @staticmethod
     def input(pin):
@@ -99,7 +108,7 @@ class GPIO_Pi5:
         if GPIO_LIB == 'lgpio':
             return lgpio.gpio_read(gpio_chip, pin)
         else:
-            return GPIO.input(pin)
+            return _backend.input(pin)
     
     @staticmethod
     def cleanup():
@@ -107,7 +116,7 @@ class GPIO_Pi5:
         if GPIO_LIB == 'lgpio':
             lgpio.gpiochip_close(gpio_chip)
         else:
-            GPIO.cleanup()
+            _backend.cleanup()
 
 # Arduino-like helper functions using the wrapper
 def digitalWrite(pin, value):
@@ -11,12 +11,54 @@ import json
 import threading
 import re
 import os
-import paramiko
 import time
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from config_client import ConfigClient, ConfigClientError
+from deployer import Deployer, REMOTE_PATH
+from fleet import Fleet, SHARED_CONFIG_KEYS
+from ssh_connection import SSHConnection
+
+# Live log: nivelurile filtrului, în ordinea severității
+LOG_LEVELS = ("ALL", "DEBUG", "INFO", "WARNING", "ERROR")
+
+def log_level_rank(level):
+    """Poziția nivelului în LOG_LEVELS (CRITICAL contează ca ERROR, un nivel necunoscut ca INFO)"""
+    if level == "CRITICAL":
+        level = "ERROR"
+    return LOG_LEVELS.index(level) if level in LOG_LEVELS else LOG_LEVELS.index("INFO")
+
+def log_line_level(line):
+    """
+    Nivelul unei linii de journalctl, dedus din marcajele folosite de daemon
+    Doar pentru textul fără nivel - înregistrările din stream_logs își au nivelul lor
+    """
+    if "❌" in line or "ERROR" in line or "Error" in line or "error:" in line:
+        return "ERROR"
+    if "⚠️" in line or "WARNING" in line or "Warning" in line:
+        return "WARNING"
+    if "DEBUG" in line:
+        return "DEBUG"
+    return "INFO"
+
+class OperationCancelled(Exception):
+    """Operația a fost anulată de utilizator"""
 
 class CanMuxProgrammer:
+    # Worker-i pentru operațiile pe device (SSH / config server), în afara thread-ului Tk
+    DEVICE_IO_WORKERS = 4
+    
+    # Live log: liniile se adună într-un buffer și se desenează în loturi la ~30 fps
+    LOG_FLUSH_MS = 33
+    LOG_MAX_LINES = 5000        # inelul de linii păstrate (și afișate)
+    LOG_MAX_PENDING = 20000     # linii încă nedesenate - cele mai vechi se pierd
+    
+    # Dashboard canale: interval de polling când daemon-ul nu suportă subscribe
+    CHANNEL_POLL_INTERVAL = 1.0
+    EXTENDER_NAMES = ("master", "slave")
+    
     def __init__(self, root):
         self.root = root
         self.root.title("CAN MUX Programmer & Configurator v1.0")
@@ -31,9 +73,42 @@ class CanMuxProgrammer:
         self.connection_status = tk.StringVar(value="Disconnected")
         self.program_status = tk.StringVar(value="Unknown")
         
-        # SSH connection
+        # SSH connection (deployment, service control)
         self.ssh_client = None
         
+        # Persistent connection to the config server (port 3364)
+        self.config_client = None
+        
+        # Background pool for device I/O - one operation of each kind in flight
+        self.executor = ThreadPoolExecutor(max_workers=self.DEVICE_IO_WORKERS,
+                                           thread_name_prefix="DeviceIO")
+        self.operations = {}
+        
+        # Live log
+        # Intrările sunt perechi (nivel, linie) - filtrul de nivel nu mai ghicește din text
+        self.log_pending = deque(maxlen=self.LOG_MAX_PENDING)   # scris de thread-ul cititor
+        self.log_lines = deque(maxlen=self.LOG_MAX_LINES)       # inelul de linii (thread Tk)
+        self.log_level = tk.StringVar(value="ALL")
+        self.log_filter = tk.StringVar()
+        self.log_flush_job = None
+        self.log_channel = None
+        
+        # Dashboard canale - Event-ul de oprire al thread-ului activ (None = oprit)
+        self.dashboard_stop = None
+        self.channel_mode = tk.StringVar(value="Stopped")
+        self.channel_vars = {}
+        for name in self.EXTENDER_NAMES:
+            self.channel_vars[name] = {
+                'channel': tk.StringVar(value="-"),
+                'switch': tk.StringVar(value="-"),
+                'updated': tk.StringVar(value="-"),
+                'select': tk.StringVar(value="0")
+            }
+        
+        # Fleet mode - mai multe CAN MUX-uri, operații în paralel
+        self.fleet = Fleet()
+        self.fleet_hosts = tk.StringVar()
+        
         # Variabile pentru configurație
         self.config_vars = {
             'mac': tk.StringVar(value="60.6D.3C.F1.7E.A0"),
@@ -74,6 +149,16 @@ class CanMuxProgrammer:
         notebook.add(self.monitor_frame, text="📊 Monitor")
         self.create_monitor_tab()
         
+        # Tab 4: Channel dashboard
+        self.channels_frame = ttk.Frame(notebook)
+        notebook.add(self.channels_frame, text="📡 Channels")
+        self.create_channels_tab()
+        
+        # Tab 5: Fleet
+        self.fleet_frame = ttk.Frame(notebook)
+        notebook.add(self.fleet_frame, text="🛰️ Fleet")
+        self.create_fleet_tab()
+        
         # Status bar
         self.create_status_bar()
         
@@ -255,19 +340,304 @@ class CanMuxProgrammer:
                                        command=self.clear_program_log, state=tk.DISABLED)
         self.clear_log_btn.pack(side=tk.LEFT)
         
+        # Filtre (nivel minim + text)
+        ttk.Label(log_control_frame, text="Level:").pack(side=tk.LEFT, padx=(20, 5))
+        level_box = ttk.Combobox(log_control_frame, textvariable=self.log_level, values=LOG_LEVELS,
+                                 width=9, state="readonly")
+        level_box.pack(side=tk.LEFT)
+        level_box.bind("<<ComboboxSelected>>", lambda event: self._render_log())
+        
+        ttk.Label(log_control_frame, text="Filter:").pack(side=tk.LEFT, padx=(10, 5))
+        filter_entry = ttk.Entry(log_control_frame, textvariable=self.log_filter, width=20)
+        filter_entry.pack(side=tk.LEFT)
+        filter_entry.bind("<KeyRelease>", lambda event: self._render_log())
+        
+    def create_channels_tab(self):
+        """Tab cu starea live a canalelor (master / slave)"""
+        control_frame = ttk.Frame(self.channels_frame)
+        control_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+        
+        self.start_dashboard_btn = ttk.Button(control_frame, text="▶️ Start Live View",
+                                             command=self.start_dashboard, state=tk.DISABLED)
+        self.start_dashboard_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.stop_dashboard_btn = ttk.Button(control_frame, text="⏹️ Stop Live View",
+                                            command=self.stop_dashboard, state=tk.DISABLED)
+        self.stop_dashboard_btn.pack(side=tk.LEFT)
+        
+        ttk.Label(control_frame, text="Mode:").pack(side=tk.LEFT, padx=(20, 5))
+        ttk.Label(control_frame, textvariable=self.channel_mode).pack(side=tk.LEFT)
+        
+        self.channel_select_btns = []
+        for name in self.EXTENDER_NAMES:
+            variables = self.channel_vars[name]
+            frame = ttk.LabelFrame(self.channels_frame, text=f"{name.title()} Extender", padding="10")
+            frame.pack(fill=tk.X, padx=10, pady=5)
+            
+            ttk.Label(frame, text="Channel:").grid(row=0, column=0, sticky=tk.W)
+            ttk.Label(frame, textvariable=variables['channel'], font=("TkDefaultFont", 20, "bold")).grid(
+                row=0, column=1, sticky=tk.W, padx=(10, 30))
+            
+            ttk.Label(frame, text="Last switch:").grid(row=1, column=0, sticky=tk.W)
+            ttk.Label(frame, textvariable=variables['switch']).grid(row=1, column=1, sticky=tk.W, padx=(10, 30))
+            
+            ttk.Label(frame, text="Updated:").grid(row=2, column=0, sticky=tk.W)
+            ttk.Label(frame, textvariable=variables['updated']).grid(row=2, column=1, sticky=tk.W, padx=(10, 30))
+            
+            ttk.Label(frame, text="Select:").grid(row=0, column=2, sticky=tk.E)
+            ttk.Combobox(frame, textvariable=variables['select'], values=[str(i) for i in range(9)],
+                         width=4, state="readonly").grid(row=0, column=3, padx=(5, 10))
+            btn = ttk.Button(frame, text="🔀 Switch", state=tk.DISABLED,
+                             command=lambda n=name: self.select_channel(n))
+            btn.grid(row=0, column=4)
+            self.channel_select_btns.append(btn)
+            
+    def create_fleet_tab(self):
+        """Tab pentru operații pe mai multe device-uri"""
+        # Lista de device-uri
+        devices_frame = ttk.LabelFrame(self.fleet_frame, text="Devices", padding="10")
+        devices_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        hosts_frame = ttk.Frame(devices_frame)
+        hosts_frame.pack(fill=tk.X)
+        
+        ttk.Label(hosts_frame, text="IP(s):").pack(side=tk.LEFT)
+        hosts_entry = ttk.Entry(hosts_frame, textvariable=self.fleet_hosts, width=40)
+        hosts_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 10))
+        hosts_entry.bind("<Return>", lambda event: self.fleet_add_hosts())
+        ttk.Button(hosts_frame, text="➕ Add", command=self.fleet_add_hosts).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(hosts_frame, text="📂 Load List...", command=self.fleet_load_list).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(hosts_frame, text="➖ Remove", command=self.fleet_remove_selected).pack(side=tk.LEFT)
+        
+        tree_frame = ttk.Frame(devices_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        self.fleet_tree = ttk.Treeview(tree_frame, columns=("host", "state", "detail"), show="headings", height=12)
+        self.fleet_tree.heading("host", text="Device")
+        self.fleet_tree.heading("state", text="State")
+        self.fleet_tree.heading("detail", text="Result")
+        self.fleet_tree.column("host", width=130, stretch=False)
+        self.fleet_tree.column("state", width=90, stretch=False)
+        self.fleet_tree.column("detail", width=500)
+        for state, color in (("running", "orange"), ("ok", "green"), ("failed", "red"), ("cancelled", "gray")):
+            self.fleet_tree.tag_configure(state, foreground=color)
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.fleet_tree.yview)
+        self.fleet_tree.configure(yscrollcommand=scrollbar.set)
+        self.fleet_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Operații
+        actions_frame = ttk.LabelFrame(self.fleet_frame, text="Fleet Operations", padding="10")
+        actions_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(actions_frame, text="Applied to the selected devices (all when none is selected). "
+                                      "SSH user/password from the Program Upload tab.").pack(anchor=tk.W)
+        
+        buttons_frame = ttk.Frame(actions_frame)
+        buttons_frame.pack(pady=(10, 0))
+        
+        ttk.Button(buttons_frame, text="🔌 Connect", command=self.fleet_connect).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(buttons_frame, text="📊 Status", command=self.fleet_status).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(buttons_frame, text="🔧 Push Network Config", command=self.fleet_push_config).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(buttons_frame, text="📤 Deploy Project", command=self.fleet_deploy).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(buttons_frame, text="⏏️ Disconnect", command=self.fleet_disconnect).pack(side=tk.LEFT)
+        
+        self.fleet_summary = ttk.Label(actions_frame, text="No fleet operation run yet")
+        self.fleet_summary.pack(anchor=tk.W, pady=(10, 0))
+        
     def create_status_bar(self):
         """Creează bara de status"""
         status_frame = ttk.Frame(self.root)
         status_frame.pack(fill=tk.X, side=tk.BOTTOM)
         
+        self.cancel_btn = ttk.Button(status_frame, text="✖ Cancel", 
+                                    command=self.cancel_all_operations, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5, pady=2)
+        
         self.status_label = ttk.Label(status_frame, text="Ready - Select project and connect to Raspberry Pi", 
                                      relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(fill=tk.X, padx=5, pady=2)
         
     def set_status(self, message, color="black"):
-        """Setează mesajul din bara de status"""
+        """Setează mesajul din bara de status (doar din thread-ul Tk)"""
         self.status_label.config(text=message, foreground=color)
-        self.root.update()
+        
+    def run_device_operation(self, kind, work, on_success=None, on_error=None):
+        """
+        Rulează o operație pe device în pool-ul de worker-i
+        work(cancel_event) rulează în worker; on_success(result) / on_error(exception)
+        sunt apelate pe thread-ul Tk prin root.after
+        Returns: Future, sau None dacă o operație de același tip e deja în curs
+        """
+        current = self.operations.get(kind)
+        if current and not current[0].done():
+            self.set_status(f"Operation '{kind}' already in progress...", "orange")
+            return None
+            
+        cancel_event = threading.Event()
+        future = self.executor.submit(work, cancel_event)
+        self.operations[kind] = (future, cancel_event)
+        self.cancel_btn.config(state=tk.NORMAL)
+        
+        def done(f):
+            self.root.after(0, lambda: self._operation_done(kind, f, cancel_event, on_success, on_error))
+        future.add_done_callback(done)
+        return future
+        
+    def _operation_done(self, kind, future, cancel_event, on_success, on_error):
+        """Livrează rezultatul unei operații pe thread-ul Tk"""
+        if self.operations.get(kind, (None,))[0] is future:
+            del self.operations[kind]
+        if not any(not f.done() for f, _ in self.operations.values()):
+            self.cancel_btn.config(state=tk.DISABLED)
+            
+        if future.cancelled() or cancel_event.is_set():
+            # Rezultatul unei operații anulate e ignorat - conexiunile deschise se închid
+            if not future.cancelled() and future.exception() is None:
+                close = getattr(future.result(), 'close', None)
+                if close:
+                    close()
+            self.set_status(f"Operation '{kind}' cancelled", "gray")
+            return
+
+        error = future.exception()
+        if error is not None:
+            if isinstance(error, OperationCancelled):
+                self.set_status(f"Operation '{kind}' cancelled", "gray")
+            elif on_error:
+                on_error(error)
+            else:
+                self.set_status(f"Operation '{kind}' failed: {error}", "red")
+        elif on_success:
+            on_success(future.result())
+            
+    def cancel_operation(self, kind):
+        """Anulează o operație: în coadă nu mai pornește, în curs își oprește așteptările"""
+        current = self.operations.get(kind)
+        if current:
+            future, cancel_event = current
+            cancel_event.set()
+            future.cancel()
+            
+    def cancel_all_operations(self):
+        """Anulează toate operațiile în curs"""
+        for kind in list(self.operations):
+            self.cancel_operation(kind)
+        
+    def fleet_add_hosts(self, hosts=None):
+        """Adaugă device-uri în fleet (IP-uri separate prin spațiu, virgulă sau ;)"""
+        if hosts is None:
+            hosts = re.split(r"[\s,;]+", self.fleet_hosts.get())
+        added = 0
+        for host in hosts:
+            host = host.strip()
+            if not host or self.fleet_tree.exists(host):
+                continue
+            self.fleet.add(host)
+            self.fleet_tree.insert("", tk.END, iid=host, values=(host, "idle", ""))
+            added += 1
+        self.fleet_hosts.set("")
+        self.set_status(f"Fleet: {added} device(s) added, {len(self.fleet.devices)} total", "black")
+        
+    def fleet_load_list(self):
+        """Încarcă lista de device-uri dintr-un fișier text (un IP pe linie, # comentarii)"""
+        path = filedialog.askopenfilename(title="Select Device List",
+                                          filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                hosts = [line.split('#', 1)[0].strip() for line in f]
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot read device list:\n{e}")
+            return
+        self.fleet_add_hosts(hosts)
+        
+    def fleet_remove_selected(self):
+        """Scoate device-urile selectate din fleet"""
+        for host in self.fleet_tree.selection():
+            self.fleet.remove(host)
+            self.fleet_tree.delete(host)
+            
+    def _fleet_targets(self):
+        """Device-urile selectate, sau toate dacă nu e nimic selectat"""
+        return list(self.fleet_tree.selection()) or list(self.fleet.devices)
+        
+    def _fleet_update(self, host, state, detail):
+        """Actualizează rândul unui device (thread Tk)"""
+        if self.fleet_tree.exists(host):
+            self.fleet_tree.item(host, values=(host, state, detail), tags=(state,))
+            
+    def _fleet_run(self, name, operation):
+        """Rulează operation(device, report) pe device-urile țintă, în paralel"""
+        hosts = self._fleet_targets()
+        if not hosts:
+            messagebox.showerror("Error", "Add devices to the fleet first")
+            return
+            
+        def on_update(host, state, detail):
+            self.root.after(0, lambda: self._fleet_update(host, state, detail))
+            
+        def finished(results):
+            ok = sum(1 for success, _ in results.values() if success)
+            failed = len(results) - ok
+            summary = f"{name}: {ok}/{len(results)} succeeded" + (f", {failed} failed" if failed else "")
+            self.fleet_summary.config(text=summary)
+            self.set_status(summary, "green" if not failed else "red")
+            
+        self.fleet_summary.config(text=f"{name}: running on {len(hosts)} device(s)...")
+        self.set_status(f"{name} on {len(hosts)} device(s)...", "orange")
+        self.run_device_operation(
+            "fleet",
+            lambda cancel: self.fleet.run(operation, hosts, cancel, on_update),
+            finished
+        )
+        
+    def fleet_connect(self):
+        """Conectare SSH la device-urile din fleet"""
+        if not self.ssh_password.get():
+            messagebox.showerror("Error", "Please enter SSH password (Program Upload tab)")
+            return
+        username = self.ssh_username.get()
+        password = self.ssh_password.get()
+        self._fleet_run("Connect", lambda device, report: device.connect(username, password))
+        
+    def fleet_status(self):
+        """Starea serviciului și versiunea firmware pe fiecare device"""
+        self._fleet_run("Status", lambda device, report: device.status())
+        
+    def fleet_push_config(self):
+        """Scrie setările de rețea comune (fără IP și MAC) pe toate device-urile"""
+        config_data = {key: self.config_vars[key].get() for key in SHARED_CONFIG_KEYS}
+        hosts = self._fleet_targets()
+        details = "\n".join(f"{key}: {value}" for key, value in config_data.items())
+        if not messagebox.askyesno("Confirm Fleet Configuration",
+                                  f"Write these settings to {len(hosts)} device(s)?\n\n{details}\n\n" +
+                                  "IP and MAC addresses are not changed."):
+            return
+        self._fleet_run("Push config", lambda device, report: device.push_config(config_data))
+        
+    def fleet_deploy(self):
+        """Upload proiect + restart serviciu pe toate device-urile"""
+        if not self.project_path.get():
+            messagebox.showerror("Error", "Please select project folder first")
+            return
+        project_folder = self.project_path.get()
+        username = self.ssh_username.get()
+        if not messagebox.askyesno("Confirm Fleet Deploy",
+                                  f"Upload the project to {len(self._fleet_targets())} device(s) " +
+                                  "and restart the CAN MUX service?"):
+            return
+        self._fleet_run("Deploy", lambda device, report: device.deploy(project_folder, username, report))
+        
+    def fleet_disconnect(self):
+        """Închide conexiunile device-urilor din fleet"""
+        self.cancel_operation("fleet")
+        self.fleet.close_all()
+        for host in self.fleet.devices:
+            self._fleet_update(host, "idle", "Disconnected")
+        self.set_status("Fleet disconnected", "gray")
         
     def browse_project(self):
         """Browse pentru folderul proiectului"""
@@ -364,32 +734,35 @@ class CanMuxProgrammer:
             messagebox.showerror("Error", "Please enter SSH password")
             return
             
-        # Start connection în thread
-        threading.Thread(target=self._connect_thread, daemon=True).start()
-        
-    def _connect_thread(self):
-        """Thread pentru conectarea SSH"""
-        try:
-            self.set_status("Connecting to Raspberry Pi...", "orange")
-            
-            self.ssh_client = paramiko.SSHClient()
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            self.ssh_client.connect(
-                hostname=self.raspberry_ip.get(),
-                username=self.ssh_username.get(),
-                password=self.ssh_password.get(),
-                timeout=10
-            )
-            
-            # Update UI în main thread
-            self.root.after(0, self._connection_success)
-            
-        except Exception as e:
-            self.root.after(0, lambda: self._connection_failed(str(e)))
-            
-    def _connection_success(self):
+        self.set_status("Connecting to Raspberry Pi...", "orange")
+        hostname = self.raspberry_ip.get()
+        username = self.ssh_username.get()
+        password = self.ssh_password.get()
+        
+        # Conectarea rulează în pool-ul de worker-i
+        self.run_device_operation(
+            "connect",
+            lambda cancel: self._connect_worker(cancel, hostname, username, password),
+            self._connection_success,
+            lambda e: self._connection_failed(str(e))
+        )
+        
+    def _connect_worker(self, cancel_event, hostname, username, password):
+        """Worker pentru conectarea SSH (transport cu keepalive și reconectare automată)"""
+        client = SSHConnection(hostname, username, password).connect()
+        
+        if cancel_event.is_set():
+            client.close()
+            raise OperationCancelled()
+        return client
+            
+    def _connection_success(self, ssh_client):
         """Callback pentru conexiune reușită"""
+        self.ssh_client = ssh_client
+        
+        # Config server client - conexiunea se deschide la prima cerere
+        self.config_client = ConfigClient(self.raspberry_ip.get())
+        
         self.connection_status.set("Connected")
         self.conn_status_label.config(foreground="green")
         self.connect_btn.config(text="Disconnect")
@@ -399,8 +772,8 @@ class CanMuxProgrammer:
             self.verify_btn, self.upload_btn, self.start_btn, self.stop_btn,
             self.refresh_btn, self.save_all_btn, self.apply_restart_btn,
             self.refresh_info_btn, self.reboot_btn, self.start_log_btn,
-            self.stop_log_btn, self.clear_log_btn
-        ]
+            self.stop_log_btn, self.clear_log_btn, self.start_dashboard_btn
+        ] + self.channel_select_btns
         
         for btn in buttons_to_enable:
             btn.config(state=tk.NORMAL)
@@ -424,10 +797,17 @@ class CanMuxProgrammer:
         
     def disconnect_raspberry(self):
         """Deconectare de la Raspberry Pi"""
+        self.cancel_all_operations()
+        self.stop_dashboard()
+        
         if self.ssh_client:
             self.ssh_client.close()
             self.ssh_client = None
             
+        if self.config_client:
+            self.config_client.close()
+            self.config_client = None
+            
         self.connection_status.set("Disconnected")
         self.conn_status_label.config(foreground="red")
         self.connect_btn.config(text="Connect")
@@ -437,8 +817,9 @@ class CanMuxProgrammer:
             self.verify_btn, self.upload_btn, self.start_btn, self.stop_btn,
             self.refresh_btn, self.save_all_btn, self.apply_restart_btn,
             self.refresh_info_btn, self.reboot_btn, self.start_log_btn,
-            self.stop_log_btn, self.clear_log_btn
-        ]
+            self.stop_log_btn, self.clear_log_btn, self.start_dashboard_btn,
+            self.stop_dashboard_btn
+        ] + self.channel_select_btns
         
         for btn in buttons_to_disable:
             btn.config(state=tk.DISABLED)
@@ -466,94 +847,61 @@ class CanMuxProgrammer:
                                   "Continue?"):
             return
             
-        # Start upload în thread
-        threading.Thread(target=self._upload_thread, daemon=True).start()
-        
-    def _upload_thread(self):
-        """Thread pentru upload program"""
-        try:
-            self.root.after(0, lambda: self.set_status("Uploading program...", "orange"))
-            self.root.after(0, lambda: self.upload_progress.config(value=0))
-            
-            # Create project directory
-            remote_path = "/home/pi/can_mux"
-            self.ssh_client.exec_command(f"mkdir -p {remote_path}")
-            self.root.after(0, lambda: self.upload_progress.config(value=10))
-            
-            # Upload files
-            sftp = self.ssh_client.open_sftp()
-            
-            files_to_upload = []
-            project_folder = self.project_path.get()
-            for file in os.listdir(project_folder):
-                if file.endswith(('.py', '.txt', '.json', '.md')) and not file.startswith('.'):
-                    files_to_upload.append(file)
-            
-            total_files = len(files_to_upload)
-            uploaded = 0
-            
-            for file in files_to_upload:
-                try:
-                    local_file = os.path.join(self.project_path.get(), file)
-                    remote_file = f"{remote_path}/{file}"
-                    
-                    # Debug: log each file being uploaded
-                    self.root.after(0, lambda f=file: self.set_status(f"Uploading: {f}", "orange"))
-                    
-                    if not os.path.exists(local_file):
-                        raise Exception(f"Local file not found: {local_file}")
-                    
-                    sftp.put(local_file, remote_file)
-                    uploaded += 1
-                    progress = 10 + (uploaded / total_files) * 60
-                    self.root.after(0, lambda p=progress: self.upload_progress.config(value=p))
-                    
-                except Exception as e:
-                    raise Exception(f"Failed to upload {file}: {str(e)}")
+        self.set_status("Uploading program...", "orange")
+        self.upload_progress.config(value=0)
+        project_folder = self.project_path.get()
+        username = self.ssh_username.get()
+        
+        # Upload în pool-ul de worker-i
+        self.run_device_operation(
+            "upload",
+            lambda cancel: self._upload_worker(cancel, project_folder, username),
+            lambda result: self._upload_success(),
+            lambda e: self._upload_failed(str(e))
+        )
+        
+    def _upload_worker(self, cancel_event, project_folder, username):
+        """Worker pentru upload program"""
+        def ui(callback):
+            self.root.after(0, callback)
+            
+        def check_cancel():
+            if cancel_event.is_set():
+                raise OperationCancelled()
                 
-            sftp.close()
-            self.root.after(0, lambda: self.upload_progress.config(value=70))
-            
-            # Install dependencies
-            self.root.after(0, lambda: self.set_status("Installing dependencies...", "orange"))
-            stdin, stdout, stderr = self.ssh_client.exec_command(f"cd {remote_path} && python3 -m pip install --user -r requirements.txt")
-            stdout.read()  # Wait for completion
-            self.root.after(0, lambda: self.upload_progress.config(value=85))
-            
-            # Create systemd service
-            username = self.ssh_username.get()
-            service_content = f"""[Unit]
-Description=CAN MUX Service
-After=network.target
-Wants=network.target
-
-[Service]
-Type=simple
-User={username}
-WorkingDirectory={remote_path}
-ExecStart=/usr/bin/python3 {remote_path}/main.py
-Restart=always
-RestartSec=5
-Environment=PYTHONPATH={remote_path}
-
-[Install]
-WantedBy=multi-user.target
-"""
-            
-            # Write service file
-            stdin, stdout, stderr = self.ssh_client.exec_command(f"echo '{service_content}' | sudo tee /etc/systemd/system/canmux.service")
-            stdout.read()
-            
-            # Enable service
-            self.ssh_client.exec_command("sudo systemctl daemon-reload")
-            self.ssh_client.exec_command("sudo systemctl enable canmux.service")
-            self.root.after(0, lambda: self.upload_progress.config(value=100))
-            
-            # Success
-            self.root.after(0, self._upload_success)
-            
-        except Exception as e:
-            self.root.after(0, lambda: self._upload_failed(str(e)))
+        remote_path = REMOTE_PATH
+        ui(lambda: self.upload_progress.config(value=10))
+        
+        # Upload only the files that changed since the last deployment
+        def on_progress(done, total, file):
+            check_cancel()
+            progress = 10 + (done / total) * 60
+            ui(lambda: self.set_status(f"Uploaded: {file} ({done}/{total})", "orange"))
+            ui(lambda: self.upload_progress.config(value=progress))
+            
+        deployer = Deployer(self.ssh_client, remote_path)
+        uploaded, unchanged = deployer.sync(project_folder, on_progress)
+        ui(lambda: self.set_status(
+            f"Uploaded {len(uploaded)} changed files ({unchanged} unchanged)", "orange"))
+        ui(lambda: self.upload_progress.config(value=70))
+        check_cancel()
+        
+        # Install dependencies - skipped when requirements.txt is unchanged
+        ui(lambda: self.set_status("Checking dependencies...", "orange"))
+        install_log = lambda msg: ui(lambda: self.set_status(msg, "orange"))
+        method = deployer.install_requirements(project_folder, install_log)
+        install_messages = {
+            "unchanged": "Dependencies unchanged - pip install skipped",
+            "wheelhouse": "Dependencies installed from uploaded wheelhouse",
+            "index": "Dependencies installed from package index"
+        }
+        ui(lambda: self.set_status(install_messages[method], "orange"))
+        ui(lambda: self.upload_progress.config(value=85))
+        check_cancel()
+        
+        # Create and enable systemd service
+        deployer.install_service(username)
+        ui(lambda: self.upload_progress.config(value=100))
             
     def _upload_success(self):
         """Callback pentru upload reușit"""
@@ -572,93 +920,96 @@ WantedBy=multi-user.target
         
     def start_program(self):
         """Pornește programul pe Raspberry Pi"""
-        if not self.ssh_client:
-            return
-            
-        try:
-            self.set_status("Starting program...", "orange")
-            self.ssh_client.exec_command("sudo systemctl start canmux.service")
-            time.sleep(2)  # Wait a bit
-            self.check_program_status()
-            
-        except Exception as e:
-            self.set_status(f"Failed to start program: {e}", "red")
+        self._service_action("start", "Starting program...")
             
     def stop_program(self):
         """Oprește programul pe Raspberry Pi"""
+        self._service_action("stop", "Stopping program...")
+        
+    def _service_action(self, action, message):
+        """systemctl start/stop în worker, apoi afișează statusul"""
         if not self.ssh_client:
             return
             
-        try:
-            self.set_status("Stopping program...", "orange")
-            self.ssh_client.exec_command("sudo systemctl stop canmux.service")
-            time.sleep(2)  # Wait a bit
-            self.check_program_status()
+        def work(cancel_event):
+            self.ssh_client.exec_command(f"sudo systemctl {action} canmux.service")
+            cancel_event.wait(2)  # Wait a bit (anulabil)
+            return self._read_program_status()
             
-        except Exception as e:
-            self.set_status(f"Failed to stop program: {e}", "red")
+        self.set_status(message, "orange")
+        self.run_device_operation(
+            "service", work, self._show_program_status,
+            lambda e: self.set_status(f"Failed to {action} program: {e}", "red")
+        )
             
+    def _read_program_status(self):
+        """Rulează în worker: starea serviciului systemd"""
+        stdin, stdout, stderr = self.ssh_client.exec_command("sudo systemctl is-active canmux.service")
+        return stdout.read().decode().strip()
+        
     def check_program_status(self):
         """Verifică statusul programului"""
         if not self.ssh_client:
             return
             
-        try:
-            stdin, stdout, stderr = self.ssh_client.exec_command("sudo systemctl is-active canmux.service")
-            status = stdout.read().decode().strip()
-            
-            if status == "active":
-                self.program_status.set("Running")
-                self.prog_status_label.config(foreground="green")
-                self.set_status("Program is running", "green")
-            elif status == "inactive":
-                self.program_status.set("Stopped")
-                self.prog_status_label.config(foreground="red")
-                self.set_status("Program is stopped", "red")
-            else:
-                self.program_status.set(f"Status: {status}")
-                self.prog_status_label.config(foreground="orange")
-                
-        except Exception as e:
+        self.run_device_operation(
+            "status", lambda cancel: self._read_program_status(), self._show_program_status,
+            lambda e: self._show_program_status(None)
+        )
+        
+    def _show_program_status(self, status):
+        """Afișează statusul programului (thread Tk)"""
+        if status == "active":
+            self.program_status.set("Running")
+            self.prog_status_label.config(foreground="green")
+            self.set_status("Program is running", "green")
+        elif status == "inactive":
+            self.program_status.set("Stopped")
+            self.prog_status_label.config(foreground="red")
+            self.set_status("Program is stopped", "red")
+        elif status:
+            self.program_status.set(f"Status: {status}")
+            self.prog_status_label.config(foreground="orange")
+        else:
             self.program_status.set("Unknown")
             self.prog_status_label.config(foreground="gray")
             
     def refresh_config(self):
-        """Refresh configurația curentă"""
-        if not self.ssh_client:
+        """Refresh configurația curentă (prin config server, port 3364)"""
+        if not self.config_client:
             return
             
-        try:
-            # Read config through Python command
-            cmd = """python3 -c "
-from config_manager import ConfigManager
-cm = ConfigManager()
-config = cm.load_network_config()
-print('MAC:', config['mac'])
-print('IP:', config['ip'])
-print('Subnet:', config['subnet_mask'])
-print('Gateway:', config['gateway'])
-print('DNS:', config['dns'])
-" """
-            
-            stdin, stdout, stderr = self.ssh_client.exec_command(f"cd /home/pi/can_mux && {cmd}")
-            output = stdout.read().decode()
-            
-            self.current_config_text.config(state=tk.NORMAL)
-            self.current_config_text.delete(1.0, tk.END)
-            
-            config_text = "📋 Current Network Configuration:\n"
-            config_text += "=" * 40 + "\n"
-            config_text += output
-            config_text += "\n🕒 Last updated: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            self.current_config_text.insert(1.0, config_text)
-            self.current_config_text.config(state=tk.DISABLED)
-            
-            self.set_status("Configuration refreshed", "green")
-            
-        except Exception as e:
-            self.set_status(f"Failed to refresh config: {e}", "red")
+        client = self.config_client
+        self.run_device_operation(
+            "config_read", lambda cancel: client.get_config(), self._show_config,
+            self._config_refresh_failed
+        )
+        
+    def _show_config(self, config):
+        """Afișează configurația citită (thread Tk)"""
+        self.current_config_text.config(state=tk.NORMAL)
+        self.current_config_text.delete(1.0, tk.END)
+        
+        config_text = "📋 Current Network Configuration:\n"
+        config_text += "=" * 40 + "\n"
+        config_text += f"MAC: {config['mac']}\n"
+        config_text += f"IP: {config['ip']}\n"
+        config_text += f"Subnet: {config['subnet_mask']}\n"
+        config_text += f"Gateway: {config['gateway']}\n"
+        config_text += f"DNS: {config['dns']}\n"
+        config_text += f"Firmware: {config.get('firmware', '?')}\n"
+        config_text += "\n🕒 Last updated: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        self.current_config_text.insert(1.0, config_text)
+        self.current_config_text.config(state=tk.DISABLED)
+        
+        self.set_status("Configuration refreshed", "green")
+        
+    def _config_refresh_failed(self, error):
+        if isinstance(error, ConfigClientError):
+            self.set_status(f"Failed to refresh config: {error} (is the program running?)", "red")
+        else:
+            self.set_status(f"Failed to refresh config: {error}", "red")
             
     def save_single_config(self, config_type):
         """Salvează o singură configurație"""
@@ -684,109 +1035,28 @@ print('DNS:', config['dns'])
         self._save_config(config_data)
         
     def _save_config(self, config_data):
-        """Salvează configurația pe Raspberry Pi"""
-        if not self.ssh_client:
+        """Salvează configurația pe Raspberry Pi (prin config server, port 3364)"""
+        if not self.config_client:
             messagebox.showerror("Error", "Not connected to Raspberry Pi")
             return
             
-        try:
-            self.set_status("Saving configuration...", "orange")
-            
-            # Create Python script to update config
-            update_script = """
-import sys
-sys.path.append('/home/pi/can_mux')
-from config_manager import EEPROM
-from config_manager import (
-    EEPROM_IP_ADDRESS_OFFSET, EEPROM_MAC_ADDRESS_OFFSET,
-    EEPROM_SUBNET_MASK_ADDRESS_OFFSET, EEPROM_DNS_ADDRESS_OFFSET,
-    EEPROM_GATEWAY_ADDRESS_OFFSET, IP_MAX_BYTES, MAC_MAX_BYTES,
-    SUBNET_MAX_BYTES, GATEWAY_MAX_BYTES, DNS_MAX_BYTES
-)
-
-def parse_mac(mac_str):
-    mac_str = mac_str.replace(' ', '').upper()
-    if '.' in mac_str:
-        parts = mac_str.split('.')
-    elif ':' in mac_str:
-        parts = mac_str.split(':')
-    elif '-' in mac_str:
-        parts = mac_str.split('-')
-    else:
-        if len(mac_str) == 12:
-            parts = [mac_str[i:i+2] for i in range(0, 12, 2)]
-        else:
-            raise ValueError("Invalid MAC format")
-    
-    if len(parts) != 6:
-        raise ValueError("MAC must have 6 parts")
-    
-    return [int(part, 16) for part in parts]
-
-def parse_ip(ip_str):
-    parts = ip_str.split('.')
-    if len(parts) != 4:
-        raise ValueError("IP must have 4 parts")
-    
-    ip_bytes = []
-    for part in parts:
-        byte_val = int(part)
-        if not 0 <= byte_val <= 255:
-            raise ValueError(f"IP octet {part} out of range")
-        ip_bytes.append(byte_val)
-    return ip_bytes
-
-# Update configuration
-config_data = """ + str(config_data) + """
-
-for config_type, value in config_data.items():
-    try:
-        if config_type == "mac":
-            mac_bytes = parse_mac(value)
-            for i in range(MAC_MAX_BYTES):
-                EEPROM.update(EEPROM_MAC_ADDRESS_OFFSET + i, mac_bytes[i])
-        elif config_type == "ip":
-            ip_bytes = parse_ip(value)
-            for i in range(IP_MAX_BYTES):
-                EEPROM.update(EEPROM_IP_ADDRESS_OFFSET + i, ip_bytes[i])
-        elif config_type == "subnet_mask":
-            subnet_bytes = parse_ip(value)
-            for i in range(SUBNET_MAX_BYTES):
-                EEPROM.update(EEPROM_SUBNET_MASK_ADDRESS_OFFSET + i, subnet_bytes[i])
-        elif config_type == "gateway":
-            gateway_bytes = parse_ip(value)
-            for i in range(GATEWAY_MAX_BYTES):
-                EEPROM.update(EEPROM_GATEWAY_ADDRESS_OFFSET + i, gateway_bytes[i])
-        elif config_type == "dns":
-            dns_bytes = parse_ip(value)
-            for i in range(DNS_MAX_BYTES):
-                EEPROM.update(EEPROM_DNS_ADDRESS_OFFSET + i, dns_bytes[i])
-        
-        print(f"Updated {config_type}: {value}")
-    except Exception as e:
-        print(f"Error updating {config_type}: {e}")
-        
-print("Configuration update completed")
-"""
-            
-            # Execute the update script
-            cmd = f"cd /home/pi/can_mux && python3 -c '{update_script}'"
-            stdin, stdout, stderr = self.ssh_client.exec_command(cmd)
-            output = stdout.read().decode()
-            error = stderr.read().decode()
-            
-            if error:
-                raise Exception(f"Update error: {error}")
-                
-            self.set_status("Configuration saved successfully", "green")
-            messagebox.showinfo("Success", "Configuration saved to Raspberry Pi!\n\n" + output)
-            
-            # Refresh to show changes
-            self.refresh_config()
-            
-        except Exception as e:
-            self.set_status(f"Failed to save config: {e}", "red")
-            messagebox.showerror("Save Error", f"Failed to save configuration:\n{str(e)}")
+        self.set_status("Saving configuration...", "orange")
+        client = self.config_client
+        self.run_device_operation(
+            "config_write", lambda cancel: client.update_config(config_data),
+            self._config_saved, self._config_save_failed
+        )
+        
+    def _config_saved(self, output):
+        self.set_status("Configuration saved successfully", "green")
+        messagebox.showinfo("Success", "Configuration saved to Raspberry Pi!\n\n" + output)
+        
+        # Refresh to show changes
+        self.refresh_config()
+        
+    def _config_save_failed(self, error):
+        self.set_status(f"Failed to save config: {error}", "red")
+        messagebox.showerror("Save Error", f"Failed to save configuration:\n{str(error)}")
             
     def apply_and_restart(self):
         """Aplică configurația și restart programul"""
@@ -796,60 +1066,128 @@ print("Configuration update completed")
                                   "Continue?"):
             return
             
-        try:
-            self.set_status("Restarting program with new configuration...", "orange")
-            self.ssh_client.exec_command("sudo systemctl restart canmux.service")
-            time.sleep(3)  # Wait for restart
-            self.check_program_status()
+        def work(cancel_event):
+            # Cu Type=notify, systemctl restart se întoarce abia după READY=1 (sau eșec)
+            stdin, stdout, stderr = self.ssh_client.exec_command("sudo systemctl restart canmux.service")
+            if stdout.channel.recv_exit_status() != 0:
+                error = stderr.read().decode(errors='replace').strip()
+                raise Exception(f"Service failed to start: {error or 'see program log'}")
+            # Confirmă prin health: listener-e legate, extendere inițializate
+            try:
+                self.config_client.wait_ready(timeout=30, cancel_event=cancel_event)
+            except ConfigClientError as e:
+                if cancel_event.is_set():
+                    raise OperationCancelled()
+                raise Exception(str(e))
+            return self._read_program_status()
+            
+        def restarted(status):
+            self._show_program_status(status)
             self.refresh_config()
             
-        except Exception as e:
-            self.set_status(f"Failed to restart: {e}", "red")
+        self.set_status("Restarting program with new configuration...", "orange")
+        self.run_device_operation(
+            "service", work, restarted,
+            lambda e: self.set_status(f"Failed to restart: {e}", "red")
+        )
             
     def refresh_system_info(self):
-        """Refresh informații sistem"""
+        """Refresh informații sistem - un singur round trip (config server sau SSH batch)"""
         if not self.ssh_client:
             return
             
+        self.set_status("Refreshing system information...", "orange")
+        self.run_device_operation(
+            "system_info", lambda cancel: self._collect_system_info(), self._show_system_info,
+            lambda e: self.set_status(f"Failed to refresh system info: {e}", "red")
+        )
+        
+    def _collect_system_info(self):
+        """Rulează în worker: (secțiuni, sursă)"""
         try:
-            self.set_status("Refreshing system information...", "orange")
-            
-            # Get system info
-            commands = {
-                "Hostname": "hostname",
-                "Uptime": "uptime",
-                "Memory": "free -h",
-                "Disk Space": "df -h /",
-                "CPU Temperature": "vcgencmd measure_temp",
-                "Network Interfaces": "ip addr show",
-                "CAN MUX Service": "sudo systemctl status canmux.service --no-pager -l",
-                "Active Ports": "sudo netstat -tlnp | grep -E ':(3363|3364)'"
-            }
-            
-            info_text = "🖥️  Raspberry Pi System Information\n"
-            info_text += "=" * 50 + "\n\n"
-            
-            for label, cmd in commands.items():
-                try:
-                    stdin, stdout, stderr = self.ssh_client.exec_command(cmd)
-                    output = stdout.read().decode().strip()
-                    if output:
-                        info_text += f"📊 {label}:\n{output}\n\n"
-                except:
-                    info_text += f"❌ {label}: Could not retrieve\n\n"
-            
-            info_text += f"🕒 Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            
-            self.system_info.config(state=tk.NORMAL)
-            self.system_info.delete(1.0, tk.END)
-            self.system_info.insert(1.0, info_text)
-            self.system_info.config(state=tk.DISABLED)
-            
-            self.set_status("System information refreshed", "green")
-            
-        except Exception as e:
-            self.set_status(f"Failed to refresh system info: {e}", "red")
-            
+            response = self.config_client.request("system_info")
+            if response.get("status") != "success":
+                raise ConfigClientError(response.get("message", "system_info failed"))
+            return self._format_system_info(response["data"]), "config server"
+        except ConfigClientError:
+            # Programul nu rulează - o singură invocare shell prin SSH
+            return self._fetch_system_info_ssh(), "SSH"
+            
+    def _show_system_info(self, result):
+        """Afișează informațiile de sistem (thread Tk)"""
+        sections, source = result
+        
+        info_text = "🖥️  Raspberry Pi System Information\n"
+        info_text += "=" * 50 + "\n\n"
+        
+        for label, output in sections.items():
+            if output:
+                info_text += f"📊 {label}:\n{output}\n\n"
+            else:
+                info_text += f"❌ {label}: Could not retrieve\n\n"
+        
+        info_text += f"🕒 Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (via {source})"
+        
+        self.system_info.config(state=tk.NORMAL)
+        self.system_info.delete(1.0, tk.END)
+        self.system_info.insert(1.0, info_text)
+        self.system_info.config(state=tk.DISABLED)
+        
+        self.set_status("System information refreshed", "green")
+            
+    @staticmethod
+    def _format_system_info(info):
+        """Datele structurate de la comanda system_info -> secțiuni text"""
+        def size(value):
+            return f"{value / (1024 ** 3):.2f} GB" if value >= 1024 ** 3 else f"{value / (1024 ** 2):.0f} MB"
+            
+        uptime = int(info['uptime_s'])
+        memory = info['memory']
+        disk = info['disk']
+        temperature = info.get('cpu_temp_c')
+        
+        return {
+            "Hostname": info['hostname'],
+            "Uptime": f"{uptime // 86400}d {uptime % 86400 // 3600}h {uptime % 3600 // 60}m, "
+                      f"load {' '.join(f'{x:.2f}' for x in info['load_avg'])}",
+            "Memory": f"{size(memory['used'])} used / {size(memory['total'])} total "
+                      f"({size(memory['available'])} available)",
+            "Disk Space": f"{size(disk['used'])} used / {size(disk['total'])} total ({size(disk['free'])} free)",
+            "CPU Temperature": f"{temperature:.1f}'C" if temperature is not None else "",
+            "Network Interfaces": "\n".join(f"{name}: {', '.join(addrs) or '-'}"
+                                            for name, addrs in info['interfaces'].items()),
+            "CAN MUX Service": f"running - pid {info['service']['pid']}, {info['service']['threads']} threads, "
+                               f"firmware {info['service']['firmware']}",
+            "Active Ports": "\n".join(f"{name}: {addr}" for name, addr in info['listeners'].items() if addr)
+        }
+        
+    def _fetch_system_info_ssh(self):
+        """Toate comenzile într-o singură invocare shell, separate prin marcaje"""
+        commands = {
+            "Hostname": "hostname",
+            "Uptime": "uptime",
+            "Memory": "free -h",
+            "Disk Space": "df -h /",
+            "CPU Temperature": "vcgencmd measure_temp",
+            "Network Interfaces": "ip addr show",
+            "CAN MUX Service": "sudo systemctl status canmux.service --no-pager -l",
+            "Active Ports": "sudo netstat -tlnp | grep -E ':(3363|3364)'"
+        }
+        marker = "@@CANMUX@@"
+        script = "; ".join(f"echo '{marker}{label}'; {cmd} 2>&1" for label, cmd in commands.items())
+        
+        stdin, stdout, stderr = self.ssh_client.exec_command(script)
+        output = stdout.read().decode(errors='replace')
+        
+        sections = {label: "" for label in commands}
+        current = None
+        for line in output.splitlines():
+            if line.startswith(marker):
+                current = line[len(marker):]
+            elif current in sections:
+                sections[current] += line + "\n"
+        return {label: text.strip() for label, text in sections.items()}
+        
     def reboot_raspberry(self):
         """Reboot Raspberry Pi"""
         if not messagebox.askyesno("Confirm Reboot", 
@@ -858,18 +1196,18 @@ print("Configuration update completed")
                                   "Continue?"):
             return
             
-        try:
-            self.set_status("Rebooting Raspberry Pi...", "orange")
-            self.ssh_client.exec_command("sudo reboot")
-            
+        def rebooting(result):
             # Disconnect since Pi is rebooting
             self.disconnect_raspberry()
             
             messagebox.showinfo("Reboot", "Raspberry Pi is rebooting.\n" +
                                "Wait about 30 seconds, then reconnect.")
             
-        except Exception as e:
-            self.set_status(f"Reboot failed: {e}", "red")
+        self.set_status("Rebooting Raspberry Pi...", "orange")
+        self.run_device_operation(
+            "reboot", lambda cancel: self.ssh_client.exec_command("sudo reboot"), rebooting,
+            lambda e: self.set_status(f"Reboot failed: {e}", "red")
+        )
             
     def start_live_log(self):
         """Start live log monitoring"""
@@ -880,6 +1218,10 @@ print("Configuration update completed")
         self.log_thread = threading.Thread(target=self._live_log_thread, daemon=True)
         self.log_thread.start()
         
+        # Desenarea în loturi pe thread-ul Tk
+        if self.log_flush_job is None:
+            self.log_flush_job = self.root.after(self.LOG_FLUSH_MS, self._flush_log)
+        
         self.start_log_btn.config(state=tk.DISABLED)
         self.stop_log_btn.config(state=tk.NORMAL)
         self.set_status("Live log started", "green")
@@ -887,50 +1229,279 @@ print("Configuration update completed")
     def stop_live_log(self):
         """Stop live log monitoring"""
         self.log_running = False
+        # Închide canalul ca thread-ul cititor să nu rămână blocat în readline()
+        if self.log_channel is not None:
+            self.log_channel.close()
+            self.log_channel = None
         self.start_log_btn.config(state=tk.NORMAL)
         self.stop_log_btn.config(state=tk.DISABLED)
         self.set_status("Live log stopped", "orange")
         
     def _live_log_thread(self):
-        """Thread pentru live log"""
+        """Thread pentru live log - doar adaugă în buffer, fără apeluri Tk per linie"""
+        # Preferat: stream-ul de log al daemon-ului (port 3364, fără sudo/journald)
+        if self._stream_daemon_log():
+            return
+        self.log_pending.append(("WARNING", "⚠️ Log stream not available on port 3364 - following journalctl\n"))
+        
         try:
             # Start following the journal
             stdin, stdout, stderr = self.ssh_client.exec_command("sudo journalctl -u canmux.service -f --no-pager")
+            self.log_channel = stdout.channel
             
             while self.log_running:
                 line = stdout.readline()
                 if line:
-                    # Add to log în main thread
-                    self.root.after(0, lambda l=line: self._add_log_line(l))
+                    self.log_pending.append((log_line_level(line), line))
                 else:
                     time.sleep(0.1)
                     
         except Exception as e:
-            self.root.after(0, lambda: self.set_status(f"Live log error: {e}", "red"))
+            if self.log_running:
+                # e nu mai există după except - mesajul se leagă acum
+                msg = str(e)
+                self.root.after(0, lambda m=msg: self.set_status(f"Live log error: {m}", "red"))
+                
+    def _stream_daemon_log(self):
+        """
+        Urmărește log-ul prin comanda stream_logs (conexiune separată de config_client)
+        Returns: False dacă daemon-ul nu suportă stream_logs
+        """
+        client = ConfigClient(self.raspberry_ip.get())
+        try:
+            # Toate nivelurile - filtrarea se face local, fără o nouă cerere
+            response = client.request("stream_logs", {"level": "DEBUG", "backlog": 200})
+        except ConfigClientError:
+            client.close()
+            return False
+        if response.get("status") != "success":
+            client.close()
+            return False
+            
+        try:
+            while self.log_running:
+                event = client.next_event(timeout=1.0)
+                if event is None:
+                    continue
+                if event["event"] == "log":
+                    record = event["data"]
+                    stamp = datetime.fromtimestamp(record["timestamp"]).strftime("%H:%M:%S.%f")[:-3]
+                    self.log_pending.append(
+                        (record["level"], f"{stamp} {record['level']:<7} [{record['source']}] {record['message']}\n"))
+                elif event["event"] == "overflow":
+                    self.log_pending.append(
+                        ("WARNING", f"⚠️ {event['data']['dropped']} log records lost (reader too slow)\n"))
+            return True
+        except ConfigClientError as e:
+            if self.log_running:
+                msg = str(e)
+                self.root.after(0, lambda m=msg: self.set_status(f"Live log error: {m}", "red"))
+            return True
+        finally:
+            client.close()
+            
+    def _log_visible(self, line_level, line):
+        """Aplică filtrele de nivel și text"""
+        level = self.log_level.get()
+        if level != "ALL" and log_level_rank(line_level) < log_level_rank(level):
+            return False
+        text = self.log_filter.get()
+        return not text or text.lower() in line.lower()
+        
+    def _flush_log(self):
+        """Desenează liniile noi într-un singur insert, apoi se re-programează"""
+        self.log_flush_job = None
+        
+        lines = []
+        while self.log_pending:
+            lines.append(self.log_pending.popleft())
+        
+        if lines:
+            self.log_lines.extend(lines)
+            visible = [line if line.endswith('\n') else line + '\n'
+                       for level, line in lines[-self.LOG_MAX_LINES:] if self._log_visible(level, line)]
+            if visible:
+                self._append_log_text(''.join(visible))
+                
+        if self.log_running or self.log_pending:
+            self.log_flush_job = self.root.after(self.LOG_FLUSH_MS, self._flush_log)
             
-    def _add_log_line(self, line):
-        """Adaugă o linie în log"""
+    def _append_log_text(self, text):
+        """Adaugă text în widget, păstrând cel mult LOG_MAX_LINES linii"""
+        follow = self.program_log.yview()[1] >= 0.999
+        
         self.program_log.config(state=tk.NORMAL)
-        self.program_log.insert(tk.END, line)
-        self.program_log.see(tk.END)
+        self.program_log.insert(tk.END, text)
+        line_count = int(self.program_log.index('end-1c').split('.')[0])
+        if line_count > self.LOG_MAX_LINES:
+            self.program_log.delete('1.0', f'{line_count - self.LOG_MAX_LINES + 1}.0')
+        self.program_log.config(state=tk.DISABLED)
+        
+        # Scroll automat doar dacă utilizatorul era deja la final
+        if follow:
+            self.program_log.see(tk.END)
+            
+    def _render_log(self):
+        """Redesenează tot inelul după schimbarea filtrelor"""
+        self.program_log.config(state=tk.NORMAL)
+        self.program_log.delete(1.0, tk.END)
         self.program_log.config(state=tk.DISABLED)
         
+        visible = [line if line.endswith('\n') else line + '\n'
+                   for level, line in self.log_lines if self._log_visible(level, line)]
+        if visible:
+            self._append_log_text(''.join(visible))
+        self.program_log.see(tk.END)
+        
     def clear_program_log(self):
         """Șterge log-ul programului"""
+        self.log_lines.clear()
         self.program_log.config(state=tk.NORMAL)
         self.program_log.delete(1.0, tk.END)
         self.program_log.config(state=tk.DISABLED)
         
+    def start_dashboard(self):
+        """Pornește vizualizarea live a canalelor"""
+        if self.dashboard_stop is not None:
+            return
+        # Fiecare thread are Event-ul lui - un Stop+Start rapid nu lasă două thread-uri active
+        stop = threading.Event()
+        self.dashboard_stop = stop
+        threading.Thread(target=self._dashboard_thread, args=(self.raspberry_ip.get(), stop),
+                         daemon=True, name="ChannelDashboard").start()
+        self.start_dashboard_btn.config(state=tk.DISABLED)
+        self.stop_dashboard_btn.config(state=tk.NORMAL)
+        self.channel_mode.set("Connecting...")
+        
+    def stop_dashboard(self):
+        """Oprește vizualizarea live a canalelor"""
+        if self.dashboard_stop is not None:
+            self.dashboard_stop.set()
+            self.dashboard_stop = None
+        self.start_dashboard_btn.config(state=tk.NORMAL)
+        self.stop_dashboard_btn.config(state=tk.DISABLED)
+        self.channel_mode.set("Stopped")
+        
+    def _dashboard_thread(self, host, stop):
+        """
+        Thread: evenimente "channel" prin subscribe (conexiune proprie pe portul 3364)
+        Fallback: un get_all_status (ambele extendere) la CHANNEL_POLL_INTERVAL
+        stop: Event-ul acestui thread (setat de stop_dashboard)
+        """
+        client = ConfigClient(host)
+        client.on_event = self._dashboard_event
+        try:
+            self._dashboard_poll(client)
+            response = client.request("subscribe", {"topics": ["channel"], "max_pending": 4})
+            if response.get("status") == "success":
+                self.root.after(0, lambda: self._dashboard_mode(stop, "Live events"))
+                while not stop.is_set():
+                    event = client.next_event(timeout=1.0)
+                    if event is not None:
+                        self._dashboard_event(event)
+                        if event["event"] == "overflow":
+                            # Evenimente pierdute - recitește starea completă
+                            self._dashboard_poll(client)
+            else:
+                self.root.after(0, lambda: self._dashboard_mode(
+                    stop, f"Polling every {self.CHANNEL_POLL_INTERVAL:g} s"))
+                while not stop.wait(self.CHANNEL_POLL_INTERVAL):
+                    self._dashboard_poll(client)
+        except Exception as e:
+            # Orice eroare oprește thread-ul - butoanele revin la starea "oprit"
+            if not stop.is_set():
+                msg = str(e)
+                self.root.after(0, lambda m=msg: self._dashboard_failed(stop, m))
+        finally:
+            client.close()
+            
+    def _dashboard_mode(self, stop, text):
+        """Actualizează modul afișat - doar pentru thread-ul încă activ (thread Tk)"""
+        if self.dashboard_stop is stop:
+            self.channel_mode.set(text)
+            
+    def _dashboard_failed(self, stop, message):
+        """Thread-ul dashboard s-a oprit cu eroare (thread Tk)"""
+        if self.dashboard_stop is not stop:
+            return
+        self.stop_dashboard()
+        self.channel_mode.set(f"Error: {message}")
+            
+    def _dashboard_poll(self, client):
+        """Citește ambele extendere într-un singur request"""
+        response = client.request("get_all_status")
+        if response.get("status") != "success":
+            raise ConfigClientError(response.get("message", "get_all_status failed"))
+        for name, status in response["data"]["extenders"].items():
+            self.root.after(0, lambda n=name, st=status: self._show_channel(n, st["channel"]))
+            
+    def _dashboard_event(self, event):
+        """Eveniment de schimbare canal (thread dashboard) -> UI"""
+        if event["event"] != "channel":
+            return
+        data = event["data"]
+        switch = f"{data['switch_ms']:.3f} ms ({data['source']})"
+        self.root.after(0, lambda: self._show_channel(data["extender"], data["channel"], switch))
+        
+    def _show_channel(self, extender, channel, switch=None):
+        """Afișează starea unui extender (thread Tk)"""
+        variables = self.channel_vars.get(extender)
+        if variables is None:
+            return
+        variables['channel'].set("none" if channel == 0 else str(channel))
+        if switch is not None:
+            variables['switch'].set(switch)
+        variables['updated'].set(datetime.now().strftime("%H:%M:%S"))
+        
+    def select_channel(self, extender):
+        """Comută canalul unui extender prin config server"""
+        if not self.config_client:
+            return
+            
+        channel = int(self.channel_vars[extender]['select'].get())
+        client = self.config_client
+        
+        def work(cancel_event):
+            start = time.perf_counter()
+            response = client.request("select_channel", {"extender": extender, "channel": channel})
+            if response.get("status") != "success":
+                raise Exception(response.get("message", "select_channel failed"))
+            return response["data"], (time.perf_counter() - start) * 1000
+            
+        def selected(result):
+            data, round_trip_ms = result
+            switch = f"{data['switch_ms']:.3f} ms (gui, round trip {round_trip_ms:.1f} ms)"
+            self._show_channel(extender, data["channel"], switch)
+            self.set_status(f"{extender.title()} switched to channel {channel}", "green")
+            
+        self.run_device_operation(
+            f"select_{extender}", work, selected,
+            lambda e: self.set_status(f"Channel switch failed: {e}", "red")
+        )
+        
     def on_closing(self):
         """Handler pentru închiderea aplicației"""
         # Stop live log
         if hasattr(self, 'log_running'):
             self.log_running = False
+        if self.log_channel is not None:
+            self.log_channel.close()
+        if self.dashboard_stop is not None:
+            self.dashboard_stop.set()
+            
+        # Stop background device operations
+        self.cancel_all_operations()
+        self.executor.shutdown(wait=False, cancel_futures=True)
             
         # Disconnect SSH
         if self.ssh_client:
             self.ssh_client.close()
             
+        if self.config_client:
+            self.config_client.close()
+            
+        self.fleet.close_all()
+            
         self.root.destroy()
 
 def main():
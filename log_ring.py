@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Log Ring - in-memory ring of structured log records for the CAN MUX daemon
+Everything the daemon prints is captured here (level inferred from the
+emoji markers used across the code) and can be streamed to GUI clients by
+the configuration server ("stream_logs" command on port 3364)
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+
+# Level names and their severity (same values as the logging module)
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+# Default number of records kept for backlog replay
+DEFAULT_CAPACITY = 2000
+
+def infer_level(message):
+    """Level of a printed line, from the markers used by the daemon"""
+    if "❌" in message or "ERROR" in message:
+        return "ERROR"
+    if "⚠️" in message or "WARNING" in message:
+        return "WARNING"
+    return "INFO"
+
+class LogRing:
+    """
+    Bounded ring of log records
+    Each record gets an increasing sequence number, so a reader can follow
+    the ring with records_after(seq) and detect records it missed
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self):
+        """Sequence number of the newest record (0 when empty)"""
+        return self._seq
+
+    def append(self, level, source, message, timestamp=None):
+        """Add one record and wake the streaming readers"""
+        with self._cond:
+            self._seq += 1
+            self._records.append({
+                "seq": self._seq,
+                "timestamp": timestamp if timestamp is not None else time.time(),
+                "level": level,
+                "source": source,
+                "message": message
+            })
+            self._cond.notify_all()
+
+    def records_after(self, seq, min_level="DEBUG", limit=None):
+        """
+        Records newer than seq with at least min_level
+        Returns: (records, number of records lost because the ring wrapped)
+        """
+        threshold = LEVELS[min_level]
+        with self._cond:
+            oldest = self._records[0]["seq"] if self._records else self._seq + 1
+            missed = max(0, oldest - seq - 1)
+            records = [r for r in self._records
+                       if r["seq"] > seq and LEVELS[r["level"]] >= threshold]
+        if limit is not None:
+            records = records[-limit:] if limit else []
+        return records, missed
+
+    def wait(self, seq, timeout=None):
+        """Wait until a record newer than seq exists - returns True if one does"""
+        with self._cond:
+            if self._seq <= seq:
+                self._cond.wait(timeout)
+            return self._seq > seq
+
+class StreamCapture:
+    """
+    File-like wrapper for stdout/stderr: output still reaches the original
+    stream (journald), complete lines are also appended to the ring
+    """
+
+    def __init__(self, stream, ring, level=None):
+        self._stream = stream
+        self._ring = ring
+        # Fixed level for the whole stream (stderr), otherwise inferred per line
+        self._level = level
+        # print() writes text and newline separately - keep partial lines per thread
+        self._partial = threading.local()
+
+    def write(self, text):
+        self._stream.write(text)
+        buffered = getattr(self._partial, 'text', '') + text
+        *lines, rest = buffered.split('\n')
+        self._partial.text = rest
+        source = threading.current_thread().name
+        for line in lines:
+            message = line.rstrip()
+            if message.strip():
+                self._ring.append(self._level or infer_level(message), source, message)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    @property
+    def wrapped(self):
+        """The original stream (for writers that feed the ring themselves)"""
+        return self._stream
+
+    def __getattr__(self, name):
+        # fileno(), encoding, isatty(), ... come from the wrapped stream
+        return getattr(self._stream, name)
+
+def install_capture(ring):
+    """Route sys.stdout and sys.stderr through the ring (idempotent)"""
+    if not isinstance(sys.stdout, StreamCapture):
+        sys.stdout = StreamCapture(sys.stdout, ring)
+    if not isinstance(sys.stderr, StreamCapture):
+        sys.stderr = StreamCapture(sys.stderr, ring, level="ERROR")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Logger - structured, non-blocking logging for the CAN MUX daemon
+Modules log through get_logger("<module>"); records are put on a queue by
+a QueueHandler and written by one QueueListener thread, so the telegram and
+config threads never block on journald. Every record also goes to the
+LogRing streamed to the GUI ("stream_logs" on port 3364).
+
+Levels are set globally and per module (--log-level / --log-module in main.py):
+
+    log = get_logger("ethernet")
+    log.info("Client connected from %s", address)
+    log.debug("Telegram %s", data.hex(" "))     # costs one cached level check when off
+    log.info("Channel switched", extra=fields(extender="master", channel=3))
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Parent of all daemon loggers ("canmux.ethernet", "canmux.config", ...)
+ROOT_LOGGER = "canmux"
+DEFAULT_LEVEL = "INFO"
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+FORMAT = "%(levelname)s %(module_name)s: %(message)s%(fields_text)s"
+
+def get_logger(module):
+    """Logger of one daemon module (name without the "canmux." prefix)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{module}")
+
+def fields(**values):
+    """Structured key=value fields for a record: log.info(msg, extra=fields(...))"""
+    return {"fields": values}
+
+def _fields_text(record):
+    values = getattr(record, "fields", None)
+    if not values:
+        return ""
+    return " " + " ".join(f"{key}={value}" for key, value in values.items())
+
+class StructuredFormatter(logging.Formatter):
+    """Level, module and message, followed by the record's key=value fields"""
+
+    def format(self, record):
+        record.module_name = record.name[len(ROOT_LOGGER) + 1:] if record.name.startswith(ROOT_LOGGER + ".") else record.name
+        record.fields_text = _fields_text(record)
+        return super().format(record)
+
+class RingHandler(logging.Handler):
+    """Appends records to a log_ring.LogRing (runs on the listener thread)"""
+
+    def __init__(self, ring):
+        super().__init__()
+        self.ring = ring
+
+    def emit(self, record):
+        try:
+            level = record.levelname if record.levelno < logging.CRITICAL else "ERROR"
+            source = record.name[len(ROOT_LOGGER) + 1:] or record.name
+            self.ring.append(level, source, record.getMessage() + _fields_text(record), record.created)
+        except Exception:
+            self.handleError(record)
+
+class LogSetup:
+    """Queue handler + listener installed on the "canmux" logger"""
+
+    def __init__(self, handler, listener):
+        self.handler = handler
+        self.listener = listener
+
+    def stop(self):
+        """Flush the queue and detach (records logged afterwards go to the last-resort handler)"""
+        self.listener.stop()
+        logging.getLogger(ROOT_LOGGER).removeHandler(self.handler)
+
+_active = None
+
+def _level(name):
+    name = str(name).upper()
+    if name not in LEVEL_NAMES:
+        raise ValueError(f"Unknown log level '{name}' (expected {', '.join(LEVEL_NAMES)})")
+    return getattr(logging, name)
+
+def set_level(level, module=None):
+    """Change the global level, or the level of one module"""
+    logging.getLogger(ROOT_LOGGER if module is None else f"{ROOT_LOGGER}.{module}").setLevel(_level(level))
+
+def parse_module_levels(items):
+    """["ethernet=DEBUG", "config=WARNING"] -> {"ethernet": "DEBUG", "config": "WARNING"}"""
+    levels = {}
+    for item in items or ():
+        module, separator, level = item.partition("=")
+        if not separator or not module:
+            raise ValueError(f"Expected MODULE=LEVEL, got '{item}'")
+        _level(level)
+        levels[module.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging(level=DEFAULT_LEVEL, module_levels=None, log_ring=None, stream=None):
+    """
+    Install the queue handler on the "canmux" logger (replaces a previous setup)
+    stream: where text lines go (default: the real stdout, not a LogRing capture)
+    Returns: LogSetup
+    """
+    global _active
+    if _active is not None:
+        _active.stop()
+
+    if stream is None:
+        # A StreamCapture would put every line into the ring a second time
+        stream = getattr(sys.stdout, "wrapped", sys.stdout)
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(StructuredFormatter(FORMAT))
+    handlers = [stream_handler]
+    if log_ring is not None:
+        handlers.append(RingHandler(log_ring))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.addHandler(queue_handler)
+    root.propagate = False
+    set_level(level)
+    for module, module_level in (module_levels or {}).items():
+        set_level(module_level, module)
+
+    listener.start()
+    _active = LogSetup(queue_handler, listener)
+    return _active
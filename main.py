@@ -4,6 +4,8 @@ CAN MUX - Raspberry Pi Python Port cu Configuration Server
 Main application file - equivalent to CanMux.ino cu server de configurare integrat
 """
 
+import argparse
+import sys
 import time
 import threading
 from gpio_pi5 import GPIO, digitalWrite, digitalRead, pinMode, delay
@@ -12,35 +14,86 @@ from led_control import LEDControl
 from serial_menu import SerialMenu
 from port_extender import InitPortExtender, MASTER, SLAVE
 from config_server import ConfigurationServer
+from event_bus import EventBus, TOPIC_CONFIG
+from log_ring import LogRing, install_capture
+from readiness import Readiness, COMPONENT_EXTENDERS, COMPONENT_TELEGRAM_LISTENER, COMPONENT_CONFIG_LISTENER
+from metrics import REGISTRY, MetricsServer, METRICS_PORT
+from telegram_capture import CaptureWriter
+from flight_recorder import RECORDER, Watchdog
+from logger import get_logger, setup_logging, parse_module_levels, DEFAULT_LEVEL, LEVEL_NAMES
+from unix_socket import DEFAULT_TELEGRAM_PATH, DEFAULT_CONFIG_PATH, DEFAULT_MODE
+
+log = get_logger("main")
 
 # Arduino-like constants
 SERIAL_MODE_BUTTON_PORT = 18  # BCM pin 18 (equivalent to A0)
 
+# Max seconds to wait for the config server listener at startup
+CONFIG_SERVER_START_TIMEOUT = 5.0
+
 class CanMux:
-    def __init__(self):
+    def __init__(self, metrics_port=METRICS_PORT, capture_path=None, capture_size_mb=4, flight_dir=".",
+                 log_level=DEFAULT_LEVEL, module_log_levels=None, udp=True,
+                 unix_telegram=None, unix_config=None, unix_mode=DEFAULT_MODE, unix_group=None):
+        # Keep recent output in memory - streamed to the GUI by the config server
+        self.log_ring = LogRing()
+        install_capture(self.log_ring)
+        # Queue-based logging: the daemon threads never block on journald
+        self.logging = setup_logging(log_level, module_log_levels, log_ring=self.log_ring)
+        
+        # Startup state - READY=1 to systemd and "health" on port 3364
+        self.readiness = Readiness()
+        
         self.led = LEDControl()
-        self.ethernet = EthernetReceive()
+        # Shared bus: channel switches from telegrams + config commits -> GUI subscribers
+        self.event_bus = EventBus()
+        self.ethernet = EthernetReceive(event_bus=self.event_bus)
+        # Telegrams also accepted as UDP datagrams on port 3363
+        self.ethernet.udp_enabled = udp
+        # Local controllers: telegrams over a Unix socket file (None = off)
+        self.ethernet.unix_path = unix_telegram
+        self.ethernet.unix_mode = unix_mode
+        self.ethernet.unix_group = unix_group
         self.serial_menu = SerialMenu()
-        self.config_server = ConfigurationServer()  # Server pentru GUI
+        # Server pentru GUI - also drives channels through the same telegram engine
+        self.config_server = ConfigurationServer(event_bus=self.event_bus,
+                                                 telegram_engine=self.ethernet,
+                                                 log_ring=self.log_ring,
+                                                 readiness=self.readiness,
+                                                 unix_path=unix_config,
+                                                 unix_mode=unix_mode,
+                                                 unix_group=unix_group)
+        
+        # Prometheus endpoint (0 = disabled)
+        self.metrics_port = metrics_port
+        self.metrics_server = None
+        
+        # Port 3363 traffic recorder for replay (None = off)
+        self.capture_path = capture_path
+        self.capture_size_mb = capture_size_mb
+        
+        # Post-mortem ring - dumped on crashes, SIGUSR1 and failed heartbeats
+        self.flight_dir = flight_dir
+        self.watchdog = Watchdog(RECORDER, check=self.ethernet.heartbeat)
         
     def setup(self):
         """
         Arduino setup() equivalent
         This function runs all the instructions once
         """
-        print("🚀 Initializing CAN MUX...")
+        log.info("🚀 Initializing CAN MUX...")
         
         # Initialize LEDs
         self.led.init_leds()
-        print("💡 LEDs initialized")
+        log.info("💡 LEDs initialized")
         
         # Init the pin for the serial button
         GPIO.setup(SERIAL_MODE_BUTTON_PORT, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        print("🔘 Serial button configured")
+        log.info("🔘 Serial button configured")
         
         # Check if we should enter serial mode or not
         if GPIO.input(SERIAL_MODE_BUTTON_PORT) == GPIO.LOW:
-            print("🔵 Serial mode button pressed - entering configuration mode")
+            log.info("🔵 Serial mode button pressed - entering configuration mode")
             # Turn on blue LED
             self.led.digital_write(self.led.BLUE_LED_PIN, GPIO.HIGH)
             self.serial_menu.serial_function()
@@ -48,38 +101,67 @@ class CanMux:
             self.led.digital_write(self.led.BLUE_LED_PIN, GPIO.LOW)
             
         # Initialize port extenders (exact Arduino calls)
-        print("🔌 Initializing port extenders...")
-        InitPortExtender(MASTER)    # InitPortExtender(MASTER)
-        InitPortExtender(SLAVE)     # InitPortExtender(SLAVE)
-        print("✅ Port extenders initialized")
+        log.info("🔌 Initializing port extenders...")
+        master_error = InitPortExtender(MASTER)    # InitPortExtender(MASTER)
+        slave_error = InitPortExtender(SLAVE)      # InitPortExtender(SLAVE)
+        # The I2C driver only logs write errors - the read back tells whether the chips answered
+        extender_errors = [f"{name} {error}" for name, error in (("master", master_error), ("slave", slave_error))
+                           if error]
+        if extender_errors:
+            log.error("❌ Port extenders not responding: %s", "; ".join(extender_errors))
+            self.readiness.mark_failed(COMPONENT_EXTENDERS, "; ".join(extender_errors))
+        else:
+            log.info("✅ Port extenders initialized")
+            self.readiness.mark_ready(COMPONENT_EXTENDERS)
         
         # Start Configuration Server în thread separat ÎNAINTE de ethernet
-        print("🔧 Starting configuration server...")
+        log.info("🔧 Starting configuration server...")
         self.start_config_server()
         
+        # Record telegram traffic before the first client can connect
+        self.start_capture()
+        
         # Initialize Ethernet
-        print("🌐 Initializing Ethernet...")
+        log.info("🌐 Initializing Ethernet...")
         if self.ethernet.eth_init() == "RETURN_ERROR":
             # If we enter this branch, there is a fault with the ethernet module
             # Turn Red LED on. This means a fatal fault has been detected.
             self.led.digital_write(self.led.RED_LED_PIN, GPIO.HIGH)
-            print("❌ FATAL ERROR: Ethernet initialization failed!")
-            print("🔴 Red LED ON - check Ethernet connection")
-            while True:
-                time.sleep(1)  # Infinite loop equivalent
+            self.readiness.mark_failed(COMPONENT_TELEGRAM_LISTENER, "Ethernet initialization failed")
+            log.error("❌ FATAL ERROR: Ethernet initialization failed!")
+            log.error("🔴 Red LED ON - check Ethernet connection")
+            # Exit instead of the Arduino endless loop: under Type=notify systemd would
+            # kill the unready process at TimeoutStartSec anyway - now it restarts
+            # right away (RestartSec) and retries the network. GPIO is left as is,
+            # so the red LED stays on.
+            sys.exit(1)
                 
-        print("✅ Ethernet initialized successfully")
+        log.info("✅ Ethernet initialized successfully")
+        self.readiness.mark_ready(COMPONENT_TELEGRAM_LISTENER,
+                                  f"{self.ethernet.bound_ip}:{self.ethernet.ETH_PORT}")
+        
+        # Apply network config commits live (no service restart needed)
+        self.start_network_watcher()
+        
+        # Metrics for the fleet scraper
+        self.start_metrics_server()
                 
         # Everything is ok with initialization turn green led on
         self.led.digital_write(self.led.GREEN_LED_PIN, GPIO.HIGH)
-        print("🟢 All systems initialized - Green LED ON")
-        print("")
-        print("📋 CAN MUX Status:")
-        print("   🔌 Main TCP Server: Port 3363 (for Hercules)")
-        print("   🔧 Config Server: Port 3364 (for GUI)")
-        print("   💡 Status: Green LED (ready)")
-        print("   🔘 Serial Config: Available via button")
-        print("")
+        log.info("🟢 All systems initialized - Green LED ON")
+        log.info("📋 CAN MUX Status:")
+        log.info("   🔌 Main TCP Server: Port 3363 (for Hercules)")
+        if self.ethernet.udp_socket is not None:
+            log.info("   📨 UDP Telegrams: Port 3363 (one telegram per datagram)")
+        log.info("   🔧 Config Server: Port 3364 (for GUI)")
+        if self.ethernet.unix_socket is not None:
+            log.info("   🔗 Local Telegrams: %s", self.ethernet.unix_path)
+        if self.config_server.unix_socket is not None:
+            log.info("   🔗 Local Config: %s", self.config_server.unix_path)
+        if self.metrics_server:
+            log.info("   📈 Metrics: http://<ip>:%s/metrics", self.metrics_port)
+        log.info("   💡 Status: Green LED (ready)")
+        log.info("   🔘 Serial Config: Available via button")
         
     def start_config_server(self):
         """Pornește serverul de configurare într-un thread separat"""
@@ -90,12 +172,96 @@ class CanMux:
                 name="ConfigServer"
             )
             config_thread.start()
-            print("✅ Configuration server started in background")
-            time.sleep(0.5)  # Give server time to start
+            # Wait for the listener to be bound (or fail) instead of a fixed delay
+            if self.readiness.wait(CONFIG_SERVER_START_TIMEOUT, components=(COMPONENT_CONFIG_LISTENER,)):
+                log.info("✅ Configuration server started in background")
+            else:
+                if self.readiness.detail(COMPONENT_CONFIG_LISTENER) == "starting":
+                    # Optional listener - settle it so READY=1 is not held back
+                    self.readiness.mark_failed(COMPONENT_CONFIG_LISTENER,
+                                               f"no listener after {CONFIG_SERVER_START_TIMEOUT:.0f} s")
+                log.warning("⚠️  WARNING: Configuration server not listening: %s",
+                            self.readiness.detail(COMPONENT_CONFIG_LISTENER))
+                log.warning("   GUI configuration will not be available")
+                log.warning("   You can still use serial configuration mode")
         except Exception as e:
-            print(f"⚠️  WARNING: Could not start configuration server: {e}")
-            print("   GUI configuration will not be available")
-            print("   You can still use serial configuration mode")
+            self.readiness.mark_failed(COMPONENT_CONFIG_LISTENER, str(e))
+            log.warning("⚠️  WARNING: Could not start configuration server: %s", e)
+            log.warning("   GUI configuration will not be available")
+            log.warning("   You can still use serial configuration mode")
+        
+    def start_capture(self):
+        """Record port 3363 traffic to the capture ring - optional, failures are not fatal"""
+        if not self.capture_path:
+            return
+        try:
+            self.ethernet.capture = CaptureWriter(
+                self.capture_path, int(self.capture_size_mb * 1024 * 1024),
+                state=lambda: bytes([self.ethernet.read_output_status(0), self.ethernet.read_output_status(1)]))
+            log.info("📼 Capturing telegram traffic to %s (%s MB ring)", self.capture_path, self.capture_size_mb)
+        except (OSError, ValueError) as e:
+            log.warning("⚠️  WARNING: Could not start telegram capture: %s", e)
+        
+    def start_metrics_server(self):
+        """Serve /metrics over HTTP - optional, failures are not fatal"""
+        REGISTRY.register_collector(self.ethernet.stats.collect)
+        if not self.metrics_port:
+            return
+        try:
+            self.metrics_server = MetricsServer(self.metrics_port)
+            self.metrics_server.start()
+        except OSError as e:
+            self.metrics_server = None
+            log.warning("⚠️  WARNING: Could not start metrics server on port %s: %s", self.metrics_port, e)
+        
+    def start_network_watcher(self):
+        """Watch config commits and rebind the listeners when the IP changes"""
+        self.config_events = self.event_bus.subscribe(topics=(TOPIC_CONFIG,), max_pending=4)
+        threading.Thread(
+            target=self._network_watcher,
+            daemon=True,
+            name="NetworkWatcher"
+        ).start()
+        
+    def _network_watcher(self):
+        """Thread: hot-apply network configuration commits"""
+        while True:
+            event = self.config_events.get()
+            if event is None:
+                if self.config_events.closed:
+                    return
+                continue
+            if event['event'] == TOPIC_CONFIG:
+                self.apply_network_config(event['data']['config'])
+            else:
+                # Overflow - events were dropped, re-read the stored config
+                self.apply_network_config(self.config_server.config_manager.load_network_config())
+                
+    def apply_network_config(self, config):
+        """Rebind telegram and config listeners to the configured IP"""
+        ip = config['ip']
+        if ip == self.ethernet.bound_ip and ip == self.config_server.bound_ip:
+            return
+            
+        log.info("🔁 Applying network configuration: listeners -> %s", ip)
+        previous_ip = self.ethernet.bound_ip
+        if self.ethernet.rebind(ip) != "RETURN_SUCCESS":
+            log.warning("⚠️  WARNING: could not bind %s:%s - previous listeners kept", ip, self.ethernet.ETH_PORT)
+            log.warning("   Check that the address is assigned to a network interface")
+            return
+        
+        if self.config_server.rebind(ip):
+            log.info("✅ Listening on %s (ports %s, %s) - existing sessions kept", ip, self.ethernet.ETH_PORT, self.config_server.port)
+            return
+        
+        # Keep both listeners on the same address - move the telegram listener back
+        log.warning("⚠️  WARNING: could not bind %s:%s", ip, self.config_server.port)
+        log.warning("   Check that the address is assigned to a network interface")
+        if previous_ip is not None and self.ethernet.rebind(previous_ip) == "RETURN_SUCCESS":
+            log.warning("   Telegram listener moved back to %s - previous listeners kept", previous_ip)
+        else:
+            log.error("❌ Telegram listener stays on %s:%s, config server on %s:%s",
+                      ip, self.ethernet.ETH_PORT, self.config_server.bound_ip, self.config_server.port)
         
     def loop(self):
         """
@@ -107,21 +273,21 @@ class CanMux:
     def run(self):
         """Main execution function"""
         try:
-            print("=" * 60)
-            print("🚀 CAN MUX - Raspberry Pi Python Port")
-            print("=" * 60)
-            print("📡 Network Configuration Tool for CAN Multiplexer")
-            print("🍓 Optimized for Raspberry Pi 5")
-            print("🔗 Ethernet connection ready")
-            print("")
+            log.info("=" * 60)
+            log.info("🚀 CAN MUX - Raspberry Pi Python Port")
+            log.info("=" * 60)
+            log.info("📡 Network Configuration Tool for CAN Multiplexer")
+            log.info("🍓 Optimized for Raspberry Pi 5")
+            log.info("🔗 Ethernet connection ready")
             
+            RECORDER.install(self.flight_dir)
             self.setup()
+            self.watchdog.start()
             
-            print("🔄 Starting main communication loop...")
-            print("   ⏹️  Press Ctrl+C to stop")
-            print("   📨 Waiting for Hercules telegrams on port 3363...")
-            print("   🖥️  GUI can connect on port 3364 for configuration")
-            print("")
+            log.info("🔄 Starting main communication loop...")
+            log.info("   ⏹️  Press Ctrl+C to stop")
+            log.info("   📨 Waiting for Hercules telegrams on port 3363...")
+            log.info("   🖥️  GUI can connect on port 3364 for configuration")
             
             # Main loop pentru procesarea telegramelor
             while True:
@@ -129,45 +295,61 @@ class CanMux:
                 time.sleep(0.001)  # Small delay to prevent excessive CPU usage
                 
         except KeyboardInterrupt:
-            print("\n" + "=" * 60)
-            print("🛑 Shutdown initiated by user (Ctrl+C)")
-            print("🧹 Cleaning up resources...")
+            log.info("=" * 60)
+            log.info("🛑 Shutdown initiated by user (Ctrl+C)")
+            log.info("🧹 Cleaning up resources...")
             self.cleanup()
-            print("✅ CAN MUX stopped successfully")
-            print("=" * 60)
+            log.info("✅ CAN MUX stopped successfully")
+            log.info("=" * 60)
             
         except Exception as e:
-            print(f"\n❌ Unexpected error: {e}")
-            print("🧹 Cleaning up resources...")
+            log.error("❌ Unexpected error: %s", e)
+            RECORDER.dump("exception", sys.exc_info())
+            log.info("🧹 Cleaning up resources...")
             self.cleanup()
-            print("❌ CAN MUX stopped due to error")
+            log.error("❌ CAN MUX stopped due to error")
+            
+        finally:
+            # Flush queued log records before the process exits
+            self.logging.stop()
             
     def cleanup(self):
         """Cleanup GPIO resources and servers"""
-        print("   🔧 Stopping configuration server...")
+        if hasattr(self, 'config_events'):
+            self.event_bus.unsubscribe(self.config_events)
+            
+        self.watchdog.stop()
+        
+        if self.metrics_server:
+            self.metrics_server.stop()
+            
+        log.info("   🔧 Stopping configuration server...")
         try:
             self.config_server.stop_server()
-            print("   ✅ Configuration server stopped")
+            log.info("   ✅ Configuration server stopped")
         except Exception as e:
-            print(f"   ⚠️  Config server cleanup warning: {e}")
+            log.warning("   ⚠️  Config server cleanup warning: %s", e)
             
-        print("   🌐 Stopping ethernet server...")
+        log.info("   🌐 Stopping ethernet server...")
         try:
             self.ethernet.cleanup()
-            print("   ✅ Ethernet server stopped")
+            log.info("   ✅ Ethernet server stopped")
         except Exception as e:
-            print(f"   ⚠️  Ethernet cleanup warning: {e}")
+            log.warning("   ⚠️  Ethernet cleanup warning: %s", e)
             
-        print("   🔌 Cleaning up GPIO...")
+        if self.ethernet.capture is not None:
+            self.ethernet.capture.close()
+            
+        log.info("   🔌 Cleaning up GPIO...")
         try:
             # Turn off all LEDs
             self.led.digital_write(self.led.RED_LED_PIN, False)
             self.led.digital_write(self.led.GREEN_LED_PIN, False)
             self.led.digital_write(self.led.BLUE_LED_PIN, False)
             GPIO.cleanup()
-            print("   ✅ GPIO cleaned up")
+            log.info("   ✅ GPIO cleaned up")
         except Exception as e:
-            print(f"   ⚠️  GPIO cleanup warning: {e}")
+            log.warning("   ⚠️  GPIO cleanup warning: %s", e)
 
 # Arduino-like helper functions to maintain familiar syntax
 def digitalWrite(pin, value):
@@ -191,11 +373,49 @@ def delay(ms):
     """Arduino delay equivalent"""
     time.sleep(ms / 1000.0)
 
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="CAN MUX daemon")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help=f"HTTP port for Prometheus metrics (default {METRICS_PORT}, 0 disables)")
+    parser.add_argument("--capture", metavar="FILE",
+                        help="record port 3363 traffic to FILE (replay with telegram_replay.py)")
+    parser.add_argument("--capture-size", type=float, default=4, metavar="MB",
+                        help="capture ring size in MB, oldest records are overwritten (default 4)")
+    parser.add_argument("--log-level", default=DEFAULT_LEVEL, type=str.upper, choices=LEVEL_NAMES,
+                        help=f"log level for all modules (default {DEFAULT_LEVEL})")
+    parser.add_argument("--log-module", action="append", default=[], metavar="MODULE=LEVEL",
+                        help="level for one module, e.g. ethernet=DEBUG (main, ethernet, config, i2c)")
+    parser.add_argument("--flight-dir", default=".", metavar="DIR",
+                        help="directory for flight recorder dumps (default: working directory)")
+    parser.add_argument("--no-udp", dest="udp", action="store_false",
+                        help="do not accept telegrams as UDP datagrams on port 3363")
+    parser.add_argument("--unix-telegram", nargs="?", const=DEFAULT_TELEGRAM_PATH, metavar="PATH",
+                        help=f"also serve telegrams on a Unix socket (default path {DEFAULT_TELEGRAM_PATH})")
+    parser.add_argument("--unix-config", nargs="?", const=DEFAULT_CONFIG_PATH, metavar="PATH",
+                        help=f"also serve the config protocol on a Unix socket (default path {DEFAULT_CONFIG_PATH})")
+    parser.add_argument("--unix-mode", type=lambda value: int(value, 8), default=DEFAULT_MODE, metavar="OCTAL",
+                        help=f"permissions of the Unix socket files (default {DEFAULT_MODE:o})")
+    parser.add_argument("--unix-group", metavar="GROUP",
+                        help="group owning the Unix socket files (default: the daemon's group)")
+    args = parser.parse_args()
+    try:
+        args.module_log_levels = parse_module_levels(args.log_module)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
 if __name__ == "__main__":
+    args = parse_args()
+    
     # Initialize GPIO with BCM numbering (optimized for Pi 5)
     GPIO.setmode(GPIO.BCM)
     GPIO.setwarnings(False)
     
     # Create and run the main application
-    can_mux = CanMux()
+    can_mux = CanMux(metrics_port=args.metrics_port, capture_path=args.capture,
+                     capture_size_mb=args.capture_size, flight_dir=args.flight_dir,
+                     log_level=args.log_level, module_log_levels=args.module_log_levels,
+                     udp=args.udp, unix_telegram=args.unix_telegram, unix_config=args.unix_config,
+                     unix_mode=args.unix_mode, unix_group=args.unix_group)
     can_mux.run()
\ No newline at end of file
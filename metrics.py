@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Metrics - Prometheus text exposition for the CAN MUX daemon
+Counters, gauges and histograms are sharded per thread: the hot path only
+adds to its own thread's cell (no lock), the cells are summed when the
+metrics endpoint is scraped (HTTP, port 3365 by default)
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# psutil is optional - without it CPU/RSS come from os.times() and /proc
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+METRICS_PORT = 3365
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default latency buckets in seconds (50 us .. 100 ms)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+class _Shards:
+    """
+    Per-thread cells of numbers
+    Each thread only ever writes its own cell, so updates need no lock;
+    cells of finished threads are folded into a retired cell whenever a
+    new thread registers or the totals are read, so memory stays bounded
+    by the live threads even when nobody scrapes the endpoint
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._cells = []
+        self._retired = [0] * size
+        self._lock = threading.Lock()
+
+    def cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0] * self._size
+            with self._lock:
+                self._retire_dead()
+                self._cells.append((threading.current_thread(), cell))
+            self._local.cell = cell
+            return cell
+
+    def _retire_dead(self):
+        """Fold the cells of finished threads into the retired cell (lock held)"""
+        live = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                live.append((thread, cell))
+            else:
+                for i, value in enumerate(cell):
+                    self._retired[i] += value
+        self._cells = live
+
+    def totals(self):
+        with self._lock:
+            self._retire_dead()
+            totals = list(self._retired)
+            for _, cell in self._cells:
+                for i, value in enumerate(cell):
+                    totals[i] += value
+        return totals
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount=1):
+        self._shards.cell()[0] += amount
+
+    def samples(self):
+        return [("", {}, self._shards.totals()[0])]
+
+class Gauge:
+    """Value that goes up and down (e.g. open connections)"""
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount=1):
+        self._shards.cell()[0] += amount
+
+    def dec(self, amount=1):
+        self._shards.cell()[0] -= amount
+
+    def samples(self):
+        return [("", {}, self._shards.totals()[0])]
+
+class Histogram:
+    """Cumulative-bucket histogram (observe values in seconds)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One slot per bucket, one for +Inf, one for the sum
+        self._shards = _Shards(len(self.buckets) + 2)
+
+    def observe(self, value):
+        cell = self._shards.cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self):
+        totals = self._shards.totals()
+        samples = []
+        cumulative = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], totals[:-1]):
+            cumulative += count
+            samples.append(("_bucket", {"le": str(bound)}, cumulative))
+        samples.append(("_sum", {}, totals[-1]))
+        samples.append(("_count", {}, cumulative))
+        return samples
+
+class MetricFamily:
+    """A named metric, optionally split by label values"""
+
+    def __init__(self, name, kind, help_text, labelnames=(), factory=Counter):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+        # Unlabelled metrics are used directly
+        self._default = factory() if not self.labelnames else None
+
+    def labels(self, *values):
+        """Child metric for one combination of label values"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    # Shortcuts for unlabelled metrics
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def samples(self):
+        if self._default is not None:
+            return self._default.samples()
+        samples = []
+        for values, child in sorted(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            for suffix, extra, value in child.samples():
+                samples.append((suffix, {**labels, **extra}, value))
+        return samples
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class MetricsRegistry:
+    """All metric families plus collectors evaluated at scrape time"""
+
+    def __init__(self):
+        self._families = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _add(self, family):
+        with self._lock:
+            self._families.append(family)
+        return family
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(MetricFamily(name, "counter", help_text, labelnames, Counter))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(MetricFamily(name, "gauge", help_text, labelnames, Gauge))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(MetricFamily(name, "histogram", help_text, labelnames,
+                                      lambda: Histogram(buckets)))
+
+    def register_collector(self, collector):
+        """
+        collector() -> [(name, kind, help, [(labels dict, value), ...]), ...]
+        For values that already live elsewhere (telegram stats, process info)
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self):
+        """Text exposition format 0.0.4"""
+        with self._lock:
+            families = list(self._families)
+            collectors = list(self._collectors)
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for suffix, labels, value in family.samples():
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {value}")
+
+        for collector in collectors:
+            try:
+                collected = collector()
+            except Exception:
+                continue
+            for name, kind, help_text, samples in collected:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+def process_collector():
+    """CPU, memory, threads and start time of this process"""
+    if psutil is not None:
+        process = psutil.Process()
+        cpu = process.cpu_times()
+        cpu_seconds = cpu.user + cpu.system
+        rss = process.memory_info().rss
+        threads = process.num_threads()
+        start_time = process.create_time()
+    else:
+        times = os.times()
+        cpu_seconds = times.user + times.system
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        threads = threading.active_count()
+        start_time = _START_TIME
+    return [
+        ("process_cpu_seconds_total", "counter", "User and system CPU time in seconds", [({}, cpu_seconds)]),
+        ("process_resident_memory_bytes", "gauge", "Resident memory size in bytes", [({}, rss)]),
+        ("process_threads", "gauge", "Number of OS threads", [({}, threads)]),
+        ("process_start_time_seconds", "gauge", "Start time of the process (unix time)", [({}, start_time)]),
+    ]
+
+_START_TIME = time.time()
+
+# Registry shared by the whole daemon
+REGISTRY = MetricsRegistry()
+REGISTRY.register_collector(process_collector)
+
+# Hot-path metrics
+I2C_SECONDS = REGISTRY.histogram(
+    "canmux_i2c_operation_seconds", "Duration of port extender I2C transactions", ("operation",))
+I2C_ERRORS = REGISTRY.counter(
+    "canmux_i2c_errors_total", "Failed port extender I2C transactions", ("operation",))
+ACTIVE_CONNECTIONS = REGISTRY.gauge(
+    "canmux_active_connections", "Open client connections", ("server",))
+CONNECTIONS = REGISTRY.counter(
+    "canmux_connections_total", "Accepted client connections", ("server",))
+UDP_DATAGRAMS = REGISTRY.counter(
+    "canmux_udp_datagrams_total", "Datagrams on the UDP telegram port", ("result",))
+CONFIG_REQUESTS = REGISTRY.counter(
+    "canmux_config_requests_total", "Configuration server commands processed", ("command",))
+CONFIG_REQUEST_ERRORS = REGISTRY.counter(
+    "canmux_config_request_errors_total", "Configuration server commands answered with an error", ("command",))
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per scrape would flood the log
+        pass
+
+class MetricsServer:
+    """HTTP listener serving /metrics in a background thread"""
+
+    def __init__(self, port=METRICS_PORT, host="", registry=REGISTRY):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self._server = None
+
+    def start(self):
+        """Bind and start serving - raises OSError if the port is taken"""
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="MetricsServer").start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
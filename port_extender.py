@@ -32,7 +32,9 @@ def init_port_extenders(i2c_bus=1):
 def InitPortExtender(lb_MasterSlave):
     """
     Initialize port extender - equivalent to InitPortExtender(byte lb_MasterSlave)
-    Exact same function name and logic as Arduino
+    Exact same function name and logic as Arduino, plus a read back of the
+    written registers
+    Returns: None if the extender answered, otherwise the reason
     """
     global PortExtenderMaster, PortExtenderSlave
     
@@ -44,10 +46,12 @@ def InitPortExtender(lb_MasterSlave):
         PortExtenderMaster.configuration()
         # Clear all ports
         PortExtenderMaster.setAllClear()
+        return PortExtenderMaster.verifyConfiguration()
     else:
         PortExtenderSlave.configuration()
         # Clear all ports
         PortExtenderSlave.setAllClear()
+        return PortExtenderSlave.verifyConfiguration()
 
 def PortExtenderSetPin(lb_Pin, lb_MasterSlave):
     """
@@ -117,11 +121,11 @@ class PortExtender:
     def init_port_extender(self, master_slave):
         """Wrapper for InitPortExtender function"""
         if master_slave == "MASTER":
-            InitPortExtender(MASTER)
+            return InitPortExtender(MASTER)
         elif master_slave == "SLAVE":
-            InitPortExtender(SLAVE)
+            return InitPortExtender(SLAVE)
         else:
-            InitPortExtender(master_slave)
+            return InitPortExtender(master_slave)
     
     def set_pin(self, pin, master_slave):
         """Wrapper for PortExtenderSetPin function"""
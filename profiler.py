@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Profiler - on-demand profiling of the running daemon (all threads)
+Driven by the configuration server ("start_profile" / "stop_profile" on
+port 3364), so a unit under real load can be profiled without a restart.
+A session always ends by itself after its window (max MAX_DURATION s).
+
+Modes:
+    sample          a background thread samples the stacks of every thread
+                    (sys._current_frames) - low overhead, safe in production;
+                    samples of threads parked in a blocking call (idle
+                    listeners, sleeping timers) are counted per thread but
+                    left out of the table, which shows where CPU time goes
+    deterministic   every Python and built-in call in every thread is timed
+                    (threading.setprofile_all_threads, Python 3.12+) - exact
+                    call counts, but slows the daemon down noticeably
+
+Results come back as a compact top-N table; optionally the full profile is
+written to PROFILE_DIR: collapsed stacks (flamegraph.pl / speedscope) for
+"sample", a pstats file (python3 -m pstats <file>) for "deterministic"
+"""
+
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+MODE_SAMPLE = "sample"
+MODE_DETERMINISTIC = "deterministic"
+MODES = (MODE_SAMPLE, MODE_DETERMINISTIC)
+
+DEFAULT_DURATION = 30.0
+MAX_DURATION = 300.0
+DEFAULT_INTERVAL = 0.005
+MIN_INTERVAL = 0.001
+DEFAULT_TOP = 25
+MAX_STACK_DEPTH = 64
+
+# A thread that used less CPU than this fraction of the sampling interval
+# since its previous sample is idle (blocked in accept/recv/wait/sleep)
+IDLE_CPU_FRACTION = 0.1
+# Leaf frames of a parked thread, used when per-thread CPU clocks are not
+# available (first sample of a thread, non-Linux platforms)
+BLOCKING_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("socket.py", "accept"), ("selectors.py", "select"), ("queue.py", "get"),
+}
+
+# Profile files are only written here (relative to the working directory)
+PROFILE_DIR = "profiles"
+
+class ProfilerError(Exception):
+    """Profiling request that cannot be served"""
+
+def _label(key):
+    filename, line, name = key
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+class _SampleCollector:
+    """Stack sampler running in its own thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = 0
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.stacks = Counter()
+        self.thread_samples = Counter()
+        self.idle_samples = Counter()
+        # ident -> CPU seconds of the thread at its previous sample
+        self._cpu = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ProfileSampler")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _idle(self, ident, leaf, elapsed):
+        """True if the thread spent the last interval blocked rather than running"""
+        try:
+            cpu = time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (AttributeError, OSError, OverflowError):
+            cpu = None
+        previous = self._cpu.get(ident)
+        self._cpu[ident] = cpu
+        if cpu is not None and previous is not None:
+            return cpu - previous < IDLE_CPU_FRACTION * elapsed
+        return (os.path.basename(leaf[0]), leaf[2]) in BLOCKING_LEAVES
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.monotonic()
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            elapsed, last = now - last, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for ident in list(self._cpu):
+                if ident not in frames:
+                    del self._cpu[ident]
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                thread_name = names.get(ident, str(ident))
+                if self._idle(ident, stack[0], elapsed):
+                    self.idle_samples[thread_name] += 1
+                    continue
+                self.samples += 1
+                self.thread_samples[thread_name] += 1
+                self.self_counts[stack[0]] += 1
+                for key in set(stack):
+                    self.total_counts[key] += 1
+                self.stacks[(thread_name,) + tuple(reversed(stack))] += 1
+
+    def summary(self, top):
+        rows = []
+        for key, count in self.self_counts.most_common(top):
+            rows.append({
+                "function": _label(key),
+                "self": count,
+                "total": self.total_counts[key],
+                "self_pct": round(100.0 * count / self.samples, 1) if self.samples else 0.0
+            })
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000.0,
+            "threads": dict(self.thread_samples.most_common()),
+            "idle_samples": sum(self.idle_samples.values()),
+            "idle_threads": dict(self.idle_samples.most_common()),
+            "top": rows
+        }
+
+    def write(self, path):
+        """Collapsed stacks: "thread;outer;...;leaf count" per line"""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(";".join([stack[0]] + [_label(key) for key in stack[1:]]) + f" {count}\n")
+
+class _CallCollector:
+    """Per-call timing through a profile hook installed in every thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._thread_stats = []
+        self._lock = threading.Lock()
+        self._clock = time.perf_counter
+
+    def start(self):
+        if not hasattr(threading, "setprofile_all_threads"):
+            raise ProfilerError("deterministic mode needs Python 3.12+ "
+                                "(threading.setprofile_all_threads) - use mode 'sample'")
+        threading.setprofile_all_threads(self._hook)
+
+    def stop(self):
+        threading.setprofile_all_threads(None)
+
+    def _state(self):
+        try:
+            return self._local.stack, self._local.stats
+        except AttributeError:
+            # stats: key -> [calls, self time, total time, {caller: calls}]
+            stack, stats = [], defaultdict(lambda: [0, 0.0, 0.0, Counter()])
+            self._local.stack, self._local.stats = stack, stats
+            with self._lock:
+                self._thread_stats.append(stats)
+            return stack, stats
+
+    def _hook(self, frame, event, arg):
+        now = self._clock()
+        stack, stats = self._state()
+        if event == "call":
+            code = frame.f_code
+            stack.append([(code.co_filename, code.co_firstlineno, code.co_name), now, 0.0])
+        elif event == "c_call":
+            stack.append([("~", 0, f"<built-in {getattr(arg, '__qualname__', arg)}>"), now, 0.0])
+        elif stack:
+            # return / c_return / c_exception - frames entered before start have no entry
+            key, start, children = stack.pop()
+            elapsed = now - start
+            entry = stats[key]
+            entry[0] += 1
+            entry[1] += elapsed - children
+            entry[2] += elapsed
+            if stack:
+                stack[-1][2] += elapsed
+                entry[3][stack[-1][0]] += 1
+
+    def _merged(self):
+        merged = defaultdict(lambda: [0, 0.0, 0.0, Counter()])
+        with self._lock:
+            thread_stats = list(self._thread_stats)
+        for stats in thread_stats:
+            for key, (calls, self_time, total, callers) in list(stats.items()):
+                entry = merged[key]
+                entry[0] += calls
+                entry[1] += self_time
+                entry[2] += total
+                entry[3].update(callers)
+        return merged
+
+    def summary(self, top):
+        merged = self._merged()
+        rows = sorted(merged.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "calls": sum(entry[0] for entry in merged.values()),
+            "threads": len(self._thread_stats),
+            "top": [{
+                "function": _label(key),
+                "calls": calls,
+                "self_ms": round(self_time * 1000.0, 3),
+                "total_ms": round(total * 1000.0, 3)
+            } for key, (calls, self_time, total, _) in rows]
+        }
+
+    def write(self, path):
+        """pstats-compatible marshal dump"""
+        stats = {}
+        for key, (calls, self_time, total, callers) in self._merged().items():
+            stats[key] = (calls, calls, self_time, total,
+                          {caller: (count, count, 0.0, 0.0) for caller, count in callers.items()})
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+class Profiler:
+    """One profiling session at a time, bounded by a timer"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collector = None
+        self._mode = None
+        self._started = None
+        self._stopped = None
+        self._timer = None
+
+    def status(self):
+        with self._lock:
+            if self._collector is None:
+                return {"running": False}
+            return {
+                "running": self._stopped is None,
+                "mode": self._mode,
+                "elapsed_s": round((self._stopped or time.monotonic()) - self._started, 3),
+                "duration_s": self._timer.interval if self._timer else None
+            }
+
+    def start(self, mode=MODE_SAMPLE, duration=DEFAULT_DURATION, interval=DEFAULT_INTERVAL):
+        """Start a session; it stops by itself after `duration` seconds"""
+        if mode not in MODES:
+            raise ProfilerError(f"Unknown profile mode '{mode}' (expected {', '.join(MODES)})")
+        duration = float(duration)
+        if not 0 < duration <= MAX_DURATION:
+            raise ProfilerError(f"duration must be between 0 and {MAX_DURATION:.0f} s")
+        interval = max(float(interval), MIN_INTERVAL)
+
+        with self._lock:
+            if self._collector is not None and self._stopped is None:
+                raise ProfilerError("A profile is already running - stop_profile first")
+            collector = _SampleCollector(interval) if mode == MODE_SAMPLE else _CallCollector()
+            collector.start()
+            self._collector = collector
+            self._mode = mode
+            self._started = time.monotonic()
+            self._stopped = None
+            self._timer = threading.Timer(duration, self._finish)
+            self._timer.daemon = True
+            self._timer.start()
+        return self.status()
+
+    def _finish(self):
+        """End of the window - stop collecting, keep the results for stop()"""
+        with self._lock:
+            if self._collector is None or self._stopped is not None:
+                return
+            self._collector.stop()
+            self._stopped = time.monotonic()
+
+    def stop(self, top=DEFAULT_TOP, output=None):
+        """
+        Stop the session (if still running) and return its summary
+        output: file name written into PROFILE_DIR (directories are stripped)
+        If the file cannot be written the error is raised and the results are
+        kept, so stop() can be called again (e.g. without output)
+        """
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+        self._finish()
+
+        with self._lock:
+            collector = self._collector
+            if collector is None:
+                raise ProfilerError("No profile has been started")
+            result = {
+                "mode": self._mode,
+                "duration_s": round(self._stopped - self._started, 3),
+                **collector.summary(max(1, int(top)))
+            }
+
+        if output:
+            name = os.path.basename(str(output))
+            if not name:
+                raise ProfilerError("Invalid output file name")
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.abspath(os.path.join(PROFILE_DIR, name))
+            collector.write(path)
+            result["file"] = path
+
+        # Results are handed out - only now the session is forgotten
+        with self._lock:
+            if self._collector is collector:
+                self._collector = None
+                self._timer = None
+        return result
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Readiness - startup state of the CAN MUX daemon
+Tracks the components that must be up before the mux can serve requests
+(port extenders, telegram listener) and the optional ones (config listener).
+Readiness is reported to systemd (sd_notify, Type=notify service) and through
+the "health" command of the configuration server (port 3364). A failed
+optional component does not hold back READY=1 - the daemon starts degraded
+and says so in STATUS=
+"""
+
+import os
+import socket
+import threading
+import time
+
+COMPONENT_EXTENDERS = "extenders"
+COMPONENT_TELEGRAM_LISTENER = "telegram_listener"
+COMPONENT_CONFIG_LISTENER = "config_listener"
+# Components required before the daemon reports READY
+REQUIRED_COMPONENTS = (COMPONENT_EXTENDERS, COMPONENT_TELEGRAM_LISTENER)
+# Components that only have to be settled (ready or failed) - the mux works without them
+OPTIONAL_COMPONENTS = (COMPONENT_CONFIG_LISTENER,)
+
+def sd_notify(state):
+    """
+    Send a state string to systemd ("READY=1", "STATUS=...")
+    No-op when not started by systemd with NOTIFY_SOCKET
+    Returns: True if the message was sent
+    """
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return False
+    if address.startswith("@"):
+        # Abstract namespace socket
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as notify_socket:
+            notify_socket.connect(address)
+            notify_socket.sendall(state.encode())
+        return True
+    except OSError:
+        return False
+
+class Readiness:
+    """Component states plus a waitable "all ready" / "failed" signal"""
+
+    def __init__(self, components=REQUIRED_COMPONENTS + OPTIONAL_COMPONENTS, optional=OPTIONAL_COMPONENTS):
+        self.started_at = time.time()
+        self.ready_at = None
+        self._components = {name: {"ready": False, "failed": False, "detail": "starting"} for name in components}
+        self._optional = set(optional) & set(components)
+        self._failed = None
+        self._cond = threading.Condition()
+
+    @property
+    def ready(self):
+        return self.ready_at is not None
+
+    @property
+    def failed(self):
+        """Description of the first required component failure (None if none)"""
+        return self._failed
+
+    @property
+    def degraded(self):
+        """Failed optional components as "name: detail" strings"""
+        with self._cond:
+            return self._degraded()
+
+    def _degraded(self):
+        return [f"{name}: {state['detail']}" for name, state in self._components.items()
+                if name in self._optional and state["failed"]]
+
+    def detail(self, component):
+        """Last detail text of one component"""
+        with self._cond:
+            return self._components[component]["detail"]
+
+    def _check_ready(self):
+        """Send READY=1 once required components are up and optional ones settled"""
+        if self.ready_at is not None or self._failed is not None:
+            return
+        for name, state in self._components.items():
+            if not state["ready"] and not (name in self._optional and state["failed"]):
+                return
+        self.ready_at = time.time()
+        startup = self.ready_at - self.started_at
+        degraded = self._degraded()
+        if degraded:
+            sd_notify(f"READY=1\nSTATUS=Ready in {startup:.2f} s, degraded - {'; '.join(degraded)}")
+        else:
+            sd_notify(f"READY=1\nSTATUS=Ready in {startup:.2f} s")
+
+    def mark_ready(self, component, detail="ready"):
+        """Mark one component as up - READY=1 goes out when the last one is"""
+        with self._cond:
+            self._components[component] = {"ready": True, "failed": False, "detail": detail}
+            self._check_ready()
+            self._cond.notify_all()
+
+    def mark_failed(self, component, detail):
+        """
+        Mark one component as failed - waiters are released immediately
+        A required component fails the startup, an optional one degrades it
+        """
+        with self._cond:
+            self._components[component] = {"ready": False, "failed": True, "detail": detail}
+            if component in self._optional:
+                if self.ready_at is not None:
+                    sd_notify(f"STATUS=Running degraded - {'; '.join(self._degraded())}")
+                self._check_ready()
+            else:
+                if self._failed is None:
+                    self._failed = f"{component}: {detail}"
+                sd_notify(f"STATUS=Startup failed - {self._failed}")
+            self._cond.notify_all()
+
+    def wait(self, timeout=None, components=None):
+        """
+        Wait until the given components (default: all) are ready or one failed
+        Returns: True if ready, False on failure or timeout
+        """
+        names = components or list(self._components)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if all(self._components[name]["ready"] for name in names):
+                    return True
+                if self._failed is not None or any(self._components[name]["failed"] for name in names):
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    def snapshot(self):
+        """JSON-serializable state for the health command"""
+        with self._cond:
+            return {
+                "ready": self.ready,
+                "failed": self._failed,
+                "degraded": self._degraded(),
+                "components": {name: dict(state) for name, state in self._components.items()},
+                "uptime_s": round(time.time() - self.started_at, 3),
+                "startup_s": round(self.ready_at - self.started_at, 3) if self.ready_at else None
+            }
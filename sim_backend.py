@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Simulated hardware backend - GPIO and I2C without a Raspberry Pi
+Enabled with the environment variable CANMUX_SIMULATE=1, e.g.
+
+    CANMUX_SIMULATE=1 python3 main.py
+
+The daemon then runs unchanged on any Linux box: LEDs and the serial
+button go to SimulatedGPIO, the PCAL6408 port extenders to SimulatedSMBus.
+Used for benchmarks and capture replay against the real telegram path
+"""
+
+import os
+import threading
+import time
+
+SIMULATE = os.environ.get("CANMUX_SIMULATE", "") not in ("", "0")
+
+# Optional emulated I2C transaction time in microseconds (0 = as fast as possible)
+SIM_I2C_LATENCY_US = float(os.environ.get("CANMUX_SIM_I2C_US", "0"))
+
+class SimulatedGPIO:
+    """RPi.GPIO-compatible module stand-in that only remembers pin states"""
+
+    HIGH = 1
+    LOW = 0
+    OUT = 0
+    IN = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    BCM = 11
+    BOARD = 10
+
+    pins = {}
+
+    @staticmethod
+    def setmode(mode):
+        pass
+
+    @staticmethod
+    def setwarnings(state):
+        pass
+
+    @staticmethod
+    def setup(pin, mode, pull_up_down=PUD_OFF):
+        # Inputs read HIGH (serial mode button not pressed)
+        SimulatedGPIO.pins[pin] = SimulatedGPIO.HIGH if mode == SimulatedGPIO.IN else SimulatedGPIO.LOW
+
+    @staticmethod
+    def output(pin, value):
+        SimulatedGPIO.pins[pin] = value
+
+    @staticmethod
+    def input(pin):
+        return SimulatedGPIO.pins.get(pin, SimulatedGPIO.HIGH)
+
+    @staticmethod
+    def cleanup():
+        SimulatedGPIO.pins.clear()
+
+class SimulatedSMBus:
+    """
+    smbus2.SMBus stand-in: every address answers, registers are kept in memory
+    Shared between instances so master/slave extenders see one bus
+    """
+
+    _registers = {}
+    _lock = threading.Lock()
+
+    def __init__(self, bus=1):
+        self.bus = bus
+
+    @staticmethod
+    def _transaction():
+        if SIM_I2C_LATENCY_US:
+            # Busy wait - sleep() granularity is far coarser than an I2C transfer
+            end = time.perf_counter() + SIM_I2C_LATENCY_US / 1e6
+            while time.perf_counter() < end:
+                pass
+
+    def write_byte_data(self, i2c_addr, register, value):
+        self._transaction()
+        with self._lock:
+            self._registers[(i2c_addr, register)] = value & 0xFF
+
+    def read_byte_data(self, i2c_addr, register):
+        self._transaction()
+        with self._lock:
+            return self._registers.get((i2c_addr, register), 0)
+
+    def read_byte(self, i2c_addr):
+        self._transaction()
+        return 0
+
+    def close(self):
+        pass
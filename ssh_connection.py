@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+CAN MUX SSH Connection
+One managed SSH transport per Raspberry Pi, used by the GUI, the deployer
+and the fleet view. Commands and SFTP sessions are multiplexed as channels
+over the same transport; keepalives detect dead links and a dropped
+transport is re-established transparently on the next use
+"""
+
+import threading
+import paramiko
+
+# Seconds between SSH keepalive packets
+KEEPALIVE_INTERVAL = 15
+
+class SSHConnection:
+    """
+    Drop-in replacement for the paramiko.SSHClient calls used by the tools
+    (exec_command, get_transport, open_sftp, close) with automatic reconnect
+    """
+
+    def __init__(self, host, username, password, timeout=10, keepalive=KEEPALIVE_INTERVAL):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.reconnects = 0
+        self._client = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self):
+        """True while the transport is up"""
+        client = self._client
+        if client is None:
+            return False
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def connect(self):
+        """Open the transport (raises on authentication / network errors)"""
+        with self._lock:
+            self._closed = False
+            self._ensure_locked()
+        return self
+
+    def _ensure(self):
+        """Connected paramiko client - reconnects if the transport died"""
+        with self._lock:
+            return self._ensure_locked()
+
+    def _ensure_locked(self):
+        if self._closed:
+            raise paramiko.SSHException("Connection closed")
+        if self._client is not None:
+            transport = self._client.get_transport()
+            if transport is not None and transport.is_active():
+                return self._client
+            # Transport died (network drop, Pi reboot) - replace it
+            self._client.close()
+            self._client = None
+            self.reconnects += 1
+
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(hostname=self.host, username=self.username, password=self.password,
+                       timeout=self.timeout, banner_timeout=self.timeout, auth_timeout=self.timeout)
+        client.get_transport().set_keepalive(self.keepalive)
+        self._client = client
+        return client
+
+    def _drop(self, client):
+        """Forget a client whose transport failed (if it is still the current one)"""
+        with self._lock:
+            if self._client is client:
+                client.close()
+                self._client = None
+
+    def exec_command(self, command, **kwargs):
+        """
+        Run a command on a new channel of the shared transport
+        A failure to open the channel triggers one reconnect and retry
+        Returns: (stdin, stdout, stderr) like paramiko.SSHClient.exec_command
+        """
+        for attempt in range(2):
+            client = self._ensure()
+            try:
+                return client.exec_command(command, **kwargs)
+            except (paramiko.SSHException, EOFError, OSError):
+                self._drop(client)
+                if attempt == 1:
+                    raise
+
+    def get_transport(self):
+        """The shared transport (re-established if needed)"""
+        return self._ensure().get_transport()
+
+    def open_sftp(self):
+        """SFTP session on the shared transport"""
+        return paramiko.SFTPClient.from_transport(self.get_transport())
+
+    def close(self):
+        """Close the transport - no reconnect after this"""
+        with self._lock:
+            self._closed = True
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Telegram Bench - load generator for the CAN MUX telegram server (port 3363)
+Opens N connections and sends a mix of SELECT_CHANNEL, GET_CHANNEL_STATUS and
+GET_FIRMWARE_VERSION telegrams with correct CRC32, closed-loop (as fast as
+responses come back) or open-loop (fixed rate), with optional pipelining.
+Reports throughput and p50/p99/p999 latency
+
+Against a device without hardware, run the daemon with the simulated
+backend (CANMUX_SIMULATE=1 python3 main.py, configured IP reachable):
+
+    python3 telegram_bench.py 127.0.0.1 -c 4 -d 10 --mix select=70,status=20,firmware=10
+    python3 telegram_bench.py 127.0.0.1 -c 8 --rate 2000 --pipeline 4 --json result.json
+"""
+
+import argparse
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from zlib import crc32
+
+from unix_socket import connect
+
+TELEGRAM_PORT = 3363
+
+SELECT_CHANNEL = 0x01
+GET_CHANNEL_STATUS = 0x02
+GET_FIRMWARE_VERSION = 0x03
+ERROR_RESPONSE = 0xFF
+
+# Telegram kind -> (telegram ID, response length)
+KINDS = {
+    "select": (SELECT_CHANNEL, 6),
+    "status": (GET_CHANNEL_STATUS, 6),
+    "firmware": (GET_FIRMWARE_VERSION, 7),
+}
+ERROR_RESPONSE_LENGTH = 6
+
+DEFAULT_MIX = "select=70,status=20,firmware=10"
+
+def with_crc(body):
+    """Append the big-endian CRC32 used by the telegram protocol"""
+    return body + struct.pack(">I", crc32(body) & 0xFFFFFFFF)
+
+def build_telegram(kind, extender=0, channel=0):
+    """Encoded telegram for one kind (extender 0 = master, 1 = slave)"""
+    if kind == "select":
+        return with_crc(bytes([SELECT_CHANNEL, (extender << 4) | channel]))
+    if kind == "status":
+        return with_crc(bytes([GET_CHANNEL_STATUS, extender]))
+    return with_crc(bytes([GET_FIRMWARE_VERSION]))
+
+def parse_mix(text):
+    """"select=70,status=20,firmware=10" -> ([kinds], [weights])"""
+    kinds, weights = [], []
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in KINDS:
+            raise ValueError(f"Unknown telegram kind '{name}' (expected {', '.join(KINDS)})")
+        kinds.append(name)
+        weights.append(float(weight or 1))
+    return kinds, weights
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class ConnectionWorker:
+    """
+    One connection: a sender thread and a receiver thread
+    Up to `pipeline` telegrams are in flight; responses arrive in order
+    Open-loop latency is measured from the scheduled send time, so a slow
+    server is not hidden by the client backing off (coordinated omission)
+    """
+
+    def __init__(self, host, port, kinds, weights, rate, pipeline, deadline, max_requests, seed):
+        self.host = host
+        self.port = port
+        self.kinds = kinds
+        self.weights = weights
+        self.rate = rate
+        self.pipeline = pipeline
+        self.deadline = deadline
+        self.max_requests = max_requests
+        self.random = random.Random(seed)
+
+        self.latencies = {kind: [] for kind in KINDS}
+        self.sent = 0
+        self.completed = 0
+        self.error_responses = {}
+        self.crc_errors = 0
+        self.timeouts = 0
+        self.failure = None
+
+        self._in_flight = deque()
+        self._slots = threading.Semaphore(pipeline)
+        self._done_sending = threading.Event()
+
+    def run(self):
+        try:
+            self.socket = connect(self.host, self.port, timeout=5.0)
+        except OSError as e:
+            self.failure = f"connect: {e}"
+            return
+        receiver = threading.Thread(target=self._receive_loop, daemon=True)
+        receiver.start()
+        try:
+            self._send_loop()
+        finally:
+            self._done_sending.set()
+            receiver.join()
+            self.socket.close()
+
+    def _next_telegram(self):
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        extender = self.random.randint(0, 1)
+        channel = self.random.randint(0, 8)
+        return kind, build_telegram(kind, extender, channel)
+
+    def _send_loop(self):
+        interval = 1.0 / self.rate if self.rate else 0.0
+        next_send = time.perf_counter()
+        while self.failure is None and time.perf_counter() < self.deadline:
+            if self.max_requests and self.sent >= self.max_requests:
+                break
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                scheduled = next_send
+                next_send += interval
+            # Pipelining bound - wait for a response slot
+            while not self._slots.acquire(timeout=0.5):
+                if self.failure is not None or time.perf_counter() >= self.deadline + 5:
+                    return
+            if not interval:
+                scheduled = time.perf_counter()
+            kind, telegram = self._next_telegram()
+            self._in_flight.append((kind, scheduled))
+            try:
+                self.socket.sendall(telegram)
+            except OSError as e:
+                self.failure = f"send: {e}"
+                return
+            self.sent += 1
+
+    def _recv_exact(self, count):
+        data = b""
+        while len(data) < count:
+            chunk = self.socket.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("connection closed by server")
+            data += chunk
+        return data
+
+    def _receive_loop(self):
+        while True:
+            if not self._in_flight:
+                if self._done_sending.is_set():
+                    return
+                time.sleep(0.0001)
+                continue
+            kind, scheduled = self._in_flight[0]
+            try:
+                first = self._recv_exact(1)
+                length = ERROR_RESPONSE_LENGTH if first[0] == ERROR_RESPONSE else KINDS[kind][1]
+                response = first + self._recv_exact(length - 1)
+            except socket.timeout:
+                self.timeouts += 1
+                self.failure = "timeout waiting for response"
+                return
+            except OSError as e:
+                self.failure = f"receive: {e}"
+                return
+            finished = time.perf_counter()
+            self._in_flight.popleft()
+            self._slots.release()
+
+            if struct.unpack(">I", response[-4:])[0] != crc32(response[:-4]) & 0xFFFFFFFF:
+                self.crc_errors += 1
+            if response[0] == ERROR_RESPONSE:
+                code = response[1]
+                self.error_responses[code] = self.error_responses.get(code, 0) + 1
+            self.latencies[kind].append(finished - scheduled)
+            self.completed += 1
+
+def summarize(latencies_s):
+    """Latency summary in microseconds"""
+    values = sorted(latencies_s)
+    if not values:
+        return {"count": 0}
+    to_us = lambda v: round(v * 1e6, 1)
+    return {
+        "count": len(values),
+        "mean_us": to_us(sum(values) / len(values)),
+        "p50_us": to_us(percentile(values, 0.50)),
+        "p99_us": to_us(percentile(values, 0.99)),
+        "p999_us": to_us(percentile(values, 0.999)),
+        "max_us": to_us(values[-1])
+    }
+
+def run_benchmark(host, port=TELEGRAM_PORT, connections=1, duration=10.0, requests=0,
+                  mix=DEFAULT_MIX, rate=0.0, pipeline=1, seed=1):
+    """
+    Run one benchmark and return the result dict
+    rate: total telegrams/s over all connections (0 = closed loop)
+    requests: stop each connection after this many telegrams (0 = duration only)
+    """
+    kinds, weights = parse_mix(mix)
+    start = time.perf_counter()
+    deadline = start + duration
+    per_connection_rate = rate / connections if rate else 0.0
+    per_connection_requests = -(-requests // connections) if requests else 0
+
+    workers = [ConnectionWorker(host, port, kinds, weights, per_connection_rate, pipeline,
+                                deadline, per_connection_requests, seed + i)
+               for i in range(connections)]
+    threads = [threading.Thread(target=worker.run, daemon=True) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = []
+    per_kind = {}
+    for kind in KINDS:
+        values = [v for worker in workers for v in worker.latencies[kind]]
+        if values:
+            per_kind[kind] = summarize(values)
+            all_latencies.extend(values)
+
+    error_responses = {}
+    for worker in workers:
+        for code, count in worker.error_responses.items():
+            error_responses[f"0x{code:02X}"] = error_responses.get(f"0x{code:02X}", 0) + count
+
+    completed = sum(worker.completed for worker in workers)
+    return {
+        "config": {
+            "host": host, "port": port, "connections": connections, "duration_s": duration,
+            "requests": requests, "mix": mix, "rate": rate, "pipeline": pipeline,
+            "mode": "open-loop" if rate else "closed-loop"
+        },
+        "elapsed_s": round(elapsed, 3),
+        "sent": sum(worker.sent for worker in workers),
+        "completed": completed,
+        "throughput_per_s": round(completed / elapsed, 1) if elapsed else 0.0,
+        "latency": summarize(all_latencies),
+        "per_kind": per_kind,
+        "error_responses": error_responses,
+        "crc_errors": sum(worker.crc_errors for worker in workers),
+        "timeouts": sum(worker.timeouts for worker in workers),
+        "failures": [worker.failure for worker in workers if worker.failure]
+    }
+
+def print_report(result):
+    config = result["config"]
+    print(f"📊 {config['mode']}: {config['connections']} connection(s), pipeline {config['pipeline']}"
+          + (f", target {config['rate']:g}/s" if config['rate'] else ""))
+    print(f"   Sent {result['sent']}, completed {result['completed']} in {result['elapsed_s']} s "
+          f"-> {result['throughput_per_s']} telegrams/s")
+    latency = result["latency"]
+    if latency["count"]:
+        print(f"   Latency: p50 {latency['p50_us']} us, p99 {latency['p99_us']} us, "
+              f"p999 {latency['p999_us']} us, max {latency['max_us']} us")
+    for kind, summary in result["per_kind"].items():
+        print(f"   {kind:<9} {summary['count']:>8}  p50 {summary['p50_us']} us  p99 {summary['p99_us']} us")
+    if result["error_responses"] or result["crc_errors"] or result["timeouts"]:
+        print(f"   ⚠️  Error responses {result['error_responses']}, CRC errors {result['crc_errors']}, "
+              f"timeouts {result['timeouts']}")
+    for failure in result["failures"]:
+        print(f"   ❌ {failure}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the CAN MUX telegram server")
+    parser.add_argument("host", help="CAN MUX IP address, or the path of its Unix telegram socket")
+    parser.add_argument("-p", "--port", type=int, default=TELEGRAM_PORT)
+    parser.add_argument("-c", "--connections", type=int, default=1, help="concurrent connections")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("-n", "--requests", type=int, default=0,
+                        help="total telegrams to send (0 = until --duration)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"telegram weights (default {DEFAULT_MIX})")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="open-loop total rate in telegrams/s (default: closed loop)")
+    parser.add_argument("--pipeline", type=int, default=1, help="telegrams in flight per connection")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the telegram mix")
+    parser.add_argument("--json", metavar="FILE", help="also write the result as JSON")
+    args = parser.parse_args()
+
+    if args.connections < 1 or args.pipeline < 1:
+        parser.error("--connections and --pipeline must be at least 1")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    result = run_benchmark(args.host, args.port, args.connections, args.duration, args.requests,
+                           args.mix, args.rate, args.pipeline, args.seed)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Result written to {args.json}")
+    return 1 if result["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Telegram Capture - record port 3363 traffic into a memory-mapped ring file
+Every received chunk and every sent response is stored with a nanosecond
+timestamp and a connection id. The file has a fixed size: when it is full
+the oldest records are overwritten, so capture can stay on in production.
+
+    python3 main.py --capture /var/tmp/canmux.cap --capture-size 16
+    python3 telegram_capture.py /var/tmp/canmux.cap        # list records
+    python3 telegram_replay.py /var/tmp/canmux.cap 127.0.0.1
+
+File layout (little endian):
+    header  magic "CMXCAP01", version, capacity, head, tail, start time
+    ring    records at absolute byte positions head/tail (modulo capacity):
+            u16 size, u64 time_ns, u32 connection, u8 direction, data
+    Every accept is preceded by a state record (connection 0) holding the
+    master and slave output registers, so a replay can start from the
+    channels the original traffic saw.
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b"CMXCAP01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")   # magic, version, capacity, head, tail, start_ns
+HEADER_SIZE = 64
+RECORD = struct.Struct("<HQIB")      # size (incl. this header), time_ns, connection, direction
+MAX_DATA = 0xFFFF - RECORD.size
+
+DEFAULT_CAPACITY = 4 * 1024 * 1024
+
+# Record directions
+DIR_IN = 0        # bytes received from the client
+DIR_OUT = 1       # bytes sent to the client
+DIR_OPEN = 2      # connection accepted (data = "ip:port")
+DIR_CLOSE = 3     # connection closed
+DIR_STATE = 4     # extender output registers (data = master, slave)
+DIRECTION_NAMES = {DIR_IN: "in", DIR_OUT: "out", DIR_OPEN: "open", DIR_CLOSE: "close", DIR_STATE: "state"}
+
+class CaptureWriter:
+    """
+    Fixed-size ring of records in a memory-mapped file
+    Thread safe; tail is advanced in the header before old records are
+    overwritten and head is published after the record bytes, so a reader
+    (or a crash) never sees a half-written record
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, state=None):
+        if capacity < 4096:
+            raise ValueError("capacity must be at least 4096 bytes")
+        self.path = path
+        self.capacity = capacity
+        # state() -> bytes([master, slave]) output registers, None = not recorded
+        self._state = state
+        self._lock = threading.Lock()
+        self._file = open(path, "w+b")
+        self._file.truncate(HEADER_SIZE + capacity)
+        self._map = mmap.mmap(self._file.fileno(), HEADER_SIZE + capacity)
+        # Records never exceed a quarter of the ring
+        self._max_data = min(MAX_DATA, capacity // 4 - RECORD.size)
+        self._head = 0
+        self._tail = 0
+        self._next_connection = 0
+        self.start_ns = time.time_ns()
+        self.records = 0
+        self.overwritten = 0
+        self._write_header()
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.capacity, self._head, self._tail, self.start_ns)
+
+    def _copy_in(self, position, data):
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        self._map[HEADER_SIZE + offset:HEADER_SIZE + offset + first] = data[:first]
+        if first < len(data):
+            self._map[HEADER_SIZE:HEADER_SIZE + len(data) - first] = data[first:]
+
+    def _size_at(self, position):
+        offset = position % self.capacity
+        if offset + 2 <= self.capacity:
+            raw = self._map[HEADER_SIZE + offset:HEADER_SIZE + offset + 2]
+        else:
+            raw = self._map[HEADER_SIZE + offset:HEADER_SIZE + offset + 1] + self._map[HEADER_SIZE:HEADER_SIZE + 1]
+        return struct.unpack("<H", raw)[0]
+
+    def new_connection(self, peer):
+        """Allocate a connection id and record the extender state and the accept"""
+        with self._lock:
+            self._next_connection += 1
+            connection = self._next_connection
+        if self._state is not None:
+            try:
+                self.write(0, DIR_STATE, self._state())
+            except Exception:
+                # A failed register read must not cost the client its connection
+                pass
+        self.write(connection, DIR_OPEN, f"{peer[0]}:{peer[1]}".encode() if peer else b"")
+        return connection
+
+    def write(self, connection, direction, data):
+        """Append one record, dropping the oldest records if the ring is full"""
+        now = time.time_ns()
+        for start in range(0, max(len(data), 1), self._max_data):
+            chunk = bytes(data[start:start + self._max_data])
+            record = RECORD.pack(RECORD.size + len(chunk), now, connection, direction) + chunk
+            with self._lock:
+                if self._map is None:
+                    return
+                if self._head + len(record) - self._tail > self.capacity:
+                    while self._head + len(record) - self._tail > self.capacity:
+                        self._tail += self._size_at(self._tail)
+                        self.overwritten += 1
+                    # Drop the overwritten records from the header before
+                    # their bytes are reused
+                    self._write_header()
+                self._copy_in(self._head, record)
+                self._head += len(record)
+                self.records += 1
+                self._write_header()
+
+    def wrap(self, client_socket, peer=None):
+        """Socket proxy that records everything received and sent"""
+        return CapturingSocket(client_socket, self, self.new_connection(peer))
+
+    def stats(self):
+        with self._lock:
+            return {"path": self.path, "capacity": self.capacity, "used": self._head - self._tail,
+                    "records": self.records, "overwritten": self.overwritten}
+
+    def close(self):
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map.close()
+            self._map = None
+            self._file.close()
+
+class CapturingSocket:
+    """Client socket wrapper used by the telegram server while capturing"""
+
+    def __init__(self, sock, writer, connection):
+        self._sock = sock
+        self._writer = writer
+        self.connection = connection
+
+    def recv(self, bufsize, *flags):
+        data = self._sock.recv(bufsize, *flags)
+        if data:
+            self._writer.write(self.connection, DIR_IN, data)
+        return data
+
+    def send(self, data, *flags):
+        sent = self._sock.send(data, *flags)
+        self._writer.write(self.connection, DIR_OUT, data[:sent])
+        return sent
+
+    def sendall(self, data, *flags):
+        self._sock.sendall(data, *flags)
+        self._writer.write(self.connection, DIR_OUT, data)
+
+    def close(self):
+        self._writer.write(self.connection, DIR_CLOSE, b"")
+        self._sock.close()
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+def read_capture(path):
+    """
+    Read a capture file (also while it is being written)
+    Returns: (start_ns, [(time_ns, connection, direction, data), ...]) oldest first
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: not a capture file")
+        magic, version, capacity, head, tail, start_ns = HEADER.unpack_from(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a capture file (or unsupported version)")
+        ring = f.read(capacity)
+
+    def take(position, count):
+        offset = position % capacity
+        data = ring[offset:offset + count]
+        if len(data) < count:
+            data += ring[:count - len(data)]
+        return data
+
+    records = []
+    position = tail
+    while position + RECORD.size <= head:
+        size, time_ns, connection, direction = RECORD.unpack(take(position, RECORD.size))
+        if size < RECORD.size or position + size > head:
+            break
+        records.append((time_ns, connection, direction, take(position + RECORD.size, size - RECORD.size)))
+        position += size
+    return start_ns, records
+
+def main():
+    parser = argparse.ArgumentParser(description="List the records of a telegram capture file")
+    parser.add_argument("capture", help="capture file written by main.py --capture")
+    parser.add_argument("-c", "--connection", type=int, help="only this connection id")
+    args = parser.parse_args()
+
+    try:
+        start_ns, records = read_capture(args.capture)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    connections = sorted({record[1] for record in records})
+    print(f"📼 {args.capture}: {len(records)} records, {len(connections)} connection(s)")
+    first_ns = records[0][0] if records else start_ns
+    for time_ns, connection, direction, data in records:
+        if args.connection is not None and connection != args.connection:
+            continue
+        if direction == DIR_OPEN:
+            text = data.decode(errors="replace")
+        elif direction == DIR_STATE and len(data) == 2:
+            text = f"master 0x{data[0]:02x}, slave 0x{data[1]:02x}"
+        else:
+            text = data.hex(" ")
+        print(f"{(time_ns - first_ns) / 1e6:12.3f} ms  #{connection:<5} {DIRECTION_NAMES.get(direction, direction):<5} {text}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
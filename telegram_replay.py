@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Telegram Replay - feed a capture (telegram_capture) back to a CAN MUX
+Every captured connection is reopened and its received bytes are sent again
+with the original timing (or faster with --speed), then the responses are
+compared telegram by telegram with the captured responses.
+Before the replay the master and slave channels are switched back to the
+state recorded when the first replayed connection was accepted. Channel
+status responses of connections that overlapped in time (or all of them
+with --speed 0) depend on how their telegrams interleave, so their
+mismatches are listed but do not fail the replay.
+
+    python3 telegram_replay.py canmux.cap 127.0.0.1              # original speed
+    python3 telegram_replay.py canmux.cap 127.0.0.1 --speed 10   # 10x faster
+    python3 telegram_replay.py canmux.cap 127.0.0.1 --speed 0    # no pauses
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+
+from telegram_capture import read_capture, DIR_IN, DIR_OUT, DIR_OPEN, DIR_STATE
+from telegram_bench import TELEGRAM_PORT, ERROR_RESPONSE, GET_CHANNEL_STATUS, build_telegram
+from unix_socket import connect
+
+# Response length by first byte (telegram ID or error marker)
+RESPONSE_LENGTHS = {0x01: 6, 0x02: 6, 0x03: 7, ERROR_RESPONSE: 6}
+
+# Seconds to wait for outstanding responses after the last send
+RESPONSE_TIMEOUT = 2.0
+
+def split_responses(data):
+    """Response stream -> list of responses (unknown bytes end the split)"""
+    responses = []
+    position = 0
+    while position < len(data):
+        length = RESPONSE_LENGTHS.get(data[position])
+        if length is None:
+            responses.append(data[position:])
+            break
+        responses.append(data[position:position + length])
+        position += length
+    return responses
+
+class ReplayConnection:
+    """One captured connection: its inbound chunks and the captured responses"""
+
+    def __init__(self, connection, peer, opened_ns):
+        self.connection = connection
+        self.peer = peer
+        self.opened_ns = opened_ns
+        self.last_ns = opened_ns
+        # Set when another connection was open at the same time
+        self.concurrent = False
+        self.sends = []           # (time_ns, data)
+        self.expected = b""
+        self.received = b""
+        self.failure = None
+
+    def run(self, host, port, first_ns, start, speed):
+        try:
+            sock = connect(host, port, timeout=5.0)
+        except OSError as e:
+            self.failure = f"connect: {e}"
+            return
+        receiver = threading.Thread(target=self._receive, args=(sock,), daemon=True)
+        receiver.start()
+        try:
+            for time_ns, data in self.sends:
+                if speed:
+                    delay = start + (time_ns - first_ns) / 1e9 / speed - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                sock.sendall(data)
+            # Wait for the responses, then close so the receiver stops
+            deadline = time.perf_counter() + RESPONSE_TIMEOUT
+            while len(self.received) < len(self.expected) and time.perf_counter() < deadline:
+                time.sleep(0.01)
+        except OSError as e:
+            self.failure = f"send: {e}"
+        finally:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+            receiver.join(1.0)
+
+    def _receive(self, sock):
+        try:
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    return
+                self.received += data
+        except OSError:
+            return
+
+    def diff(self):
+        """
+        Compare the responses one by one
+        Returns: (matching, [(index, expected, received), ...] mismatches,
+                  [(index, expected, received), ...] order-dependent mismatches)
+        """
+        expected = split_responses(self.expected)
+        received = split_responses(self.received)
+        matching = 0
+        mismatches = []
+        order_dependent = []
+        for index in range(max(len(expected), len(received))):
+            want = expected[index] if index < len(expected) else None
+            got = received[index] if index < len(received) else None
+            if want == got:
+                matching += 1
+            elif self.concurrent and want and got and want[0] == got[0] == GET_CHANNEL_STATUS:
+                order_dependent.append((index, want, got))
+            else:
+                mismatches.append((index, want, got))
+        return matching, mismatches, order_dependent
+
+def load_connections(path):
+    """
+    Captured connections that start inside the capture, in accept order
+    Returns: (connections, skipped ids, initial state) - state is the
+             (master, slave) output registers before the first connection
+             or None if the capture does not hold them
+    """
+    _, records = read_capture(path)
+    connections = {}
+    skipped = set()
+    states = {}
+    state = None
+    for time_ns, connection, direction, data in records:
+        if direction == DIR_STATE:
+            if len(data) == 2:
+                state = (data[0], data[1])
+            continue
+        if direction == DIR_OPEN:
+            connections[connection] = ReplayConnection(connection, data.decode(errors="replace"), time_ns)
+            states[connection] = state
+            continue
+        replay = connections.get(connection)
+        if replay is None:
+            # Beginning of this connection was overwritten - framing unknown
+            skipped.add(connection)
+            continue
+        if direction == DIR_IN:
+            replay.sends.append((time_ns, data))
+            replay.last_ns = time_ns
+        elif direction == DIR_OUT:
+            replay.expected += data
+            replay.last_ns = time_ns
+    replayed = [c for c in connections.values() if c.sends]
+    for c in replayed:
+        c.concurrent = any(other is not c and other.opened_ns <= c.last_ns and c.opened_ns <= other.last_ns
+                           for other in replayed)
+    return replayed, skipped, states[replayed[0].connection] if replayed else None
+
+def decode_channel(output_status):
+    """Output register -> selected channel (0 = none, None = several pins set)"""
+    if output_status == 0:
+        return 0
+    if output_status & (output_status - 1):
+        return None
+    return output_status.bit_length()
+
+def restore_state(host, port, state):
+    """
+    Switch master and slave to the channels of a recorded state
+    Returns: list of problems (empty when both extenders were restored)
+    """
+    problems = []
+    try:
+        sock = connect(host, port, timeout=5.0)
+    except OSError as e:
+        return [f"connect: {e}"]
+    try:
+        for extender, name in ((0, "master"), (1, "slave")):
+            channel = decode_channel(state[extender])
+            if channel is None:
+                problems.append(f"{name} had several channels on (0x{state[extender]:02x}) - not restorable")
+                continue
+            telegram = build_telegram("select", extender, channel)
+            sock.sendall(telegram)
+            response = b""
+            while len(response) < len(telegram):
+                data = sock.recv(len(telegram) - len(response))
+                if not data:
+                    break
+                response += data
+            if response != telegram:
+                problems.append(f"{name} channel {channel}: unexpected response {response.hex(' ') or '-'}")
+    except OSError as e:
+        problems.append(str(e))
+    finally:
+        sock.close()
+    return problems
+
+def replay(path, host, port=TELEGRAM_PORT, speed=1.0):
+    """
+    Restore the recorded channels, then replay all connections concurrently
+    Returns: (connections, skipped ids, initial state, restore problems, elapsed s)
+    """
+    connections, skipped, state = load_connections(path)
+    if not connections:
+        return connections, skipped, state, [], 0.0
+    problems = restore_state(host, port, state) if state is not None else []
+    if not speed:
+        # Without pauses every connection runs at once, whatever the capture says
+        for c in connections:
+            c.concurrent = len(connections) > 1
+    first_ns = min(c.sends[0][0] for c in connections)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=c.run, args=(host, port, first_ns, start, speed), daemon=True)
+               for c in connections]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return connections, skipped, state, problems, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a telegram capture and diff the responses")
+    parser.add_argument("capture", help="capture file written by main.py --capture")
+    parser.add_argument("host", help="CAN MUX IP address, or the path of its Unix telegram socket")
+    parser.add_argument("-p", "--port", type=int, default=TELEGRAM_PORT)
+    parser.add_argument("-s", "--speed", type=float, default=1.0,
+                        help="time scale: 1 = original timing, 10 = 10x faster, 0 = no pauses")
+    parser.add_argument("--show", type=int, default=10, help="mismatches to print per connection")
+    args = parser.parse_args()
+
+    try:
+        connections, skipped, state, problems, elapsed = replay(args.capture, args.host, args.port, args.speed)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if skipped:
+        print(f"⚪ Skipped {len(skipped)} connection(s) whose start was overwritten in the ring")
+    if not connections:
+        print("⚠️  Nothing to replay")
+        return 1
+    if state is None:
+        print("⚠️  No extender state in the capture - channel status responses may differ")
+    else:
+        print(f"🔁 Restored master 0x{state[0]:02x}, slave 0x{state[1]:02x} before the replay")
+    for problem in problems:
+        print(f"❌ Restore: {problem}")
+
+    total_matching = total_mismatches = total_order_dependent = 0
+    for c in connections:
+        matching, mismatches, order_dependent = c.diff()
+        total_matching += matching
+        total_mismatches += len(mismatches)
+        total_order_dependent += len(order_dependent)
+        marker = "✅" if not mismatches and not c.failure else "❌"
+        print(f"{marker} #{c.connection} ({c.peer}): {len(c.sends)} chunks sent, "
+              f"{matching} responses match, {len(mismatches)} differ"
+              + (f", {len(order_dependent)} order-dependent" if order_dependent else ""))
+        if c.failure:
+            print(f"   {c.failure}")
+        for index, want, got in mismatches[:args.show]:
+            print(f"   response {index}: expected {want.hex(' ') if want else '-'}, "
+                  f"got {got.hex(' ') if got else '-'}")
+        for index, want, got in order_dependent[:args.show]:
+            print(f"   ⚪ response {index} (concurrent status read): expected {want.hex(' ')}, got {got.hex(' ')}")
+
+    print(f"📊 {len(connections)} connection(s) in {elapsed:.2f} s: "
+          f"{total_matching} responses match, {total_mismatches} differ, "
+          f"{total_order_dependent} order-dependent")
+    return 1 if total_mismatches or problems or any(c.failure for c in connections) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Telegram Stats - latency histograms and counters for the telegram path (port 3363)
+Every telegram is timed per stage (parse, CRC, I2C, LED, send) with
+monotonic nanosecond timestamps and aggregated into fixed-bucket histograms
+per telegram type. Queried at runtime through the configuration server
+("telegram_stats" command on port 3364)
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Stages of one telegram, in processing order ("total" = first byte -> last stage)
+STAGES = ("parse", "crc", "i2c", "led", "send", "total")
+
+# Histogram bucket upper bounds in microseconds (last bucket is +Inf)
+BUCKET_BOUNDS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+class Histogram:
+    """Fixed-bucket latency histogram (values in microseconds)"""
+
+    __slots__ = ("counts", "count", "sum_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_US) + 1)
+        self.count = 0
+        self.sum_us = 0.0
+        self.max_us = 0.0
+
+    def observe(self, value_us):
+        self.counts[bisect_left(BUCKET_BOUNDS_US, value_us)] += 1
+        self.count += 1
+        self.sum_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_US, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max_us
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum_us": round(self.sum_us, 1),
+            "avg_us": round(self.sum_us / self.count, 1) if self.count else None,
+            "max_us": round(self.max_us, 1),
+            "p50_us": self.percentile(0.50),
+            "p99_us": self.percentile(0.99),
+            "buckets": [[bound, count] for bound, count in
+                        zip(list(BUCKET_BOUNDS_US) + ["+Inf"], self.counts)]
+        }
+
+class TelegramTrace:
+    """
+    Stage timer for one telegram
+    lap(stage) charges the time since the previous lap to that stage, so the
+    handlers only mark the end of each stage
+    """
+
+    __slots__ = ("start_ns", "last_ns", "stages")
+
+    def __init__(self):
+        self.start_ns = self.last_ns = time.perf_counter_ns()
+        self.stages = {}
+
+    def lap(self, stage):
+        now = time.perf_counter_ns()
+        self.stages[stage] = self.stages.get(stage, 0) + (now - self.last_ns)
+        self.last_ns = now
+
+class TelegramStats:
+    """Histograms per (telegram type, stage) plus error counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all histograms and counters"""
+        with self._lock:
+            self.started_at = time.time()
+            self.telegrams = 0
+            self.crc_errors = 0
+            self.payload_errors = 0
+            self.telegram_id_errors = 0
+            self._histograms = {}
+
+    def record(self, telegram_type, trace):
+        """Aggregate one finished telegram"""
+        total_ns = trace.last_ns - trace.start_ns
+        with self._lock:
+            self.telegrams += 1
+            histograms = self._histograms.get(telegram_type)
+            if histograms is None:
+                histograms = self._histograms[telegram_type] = {stage: Histogram() for stage in STAGES}
+            for stage, elapsed_ns in trace.stages.items():
+                histograms[stage].observe(elapsed_ns / 1000.0)
+            histograms["total"].observe(total_ns / 1000.0)
+
+    def count_error(self, kind):
+        """kind: "crc", "payload" or "telegram_id" """
+        with self._lock:
+            if kind == "crc":
+                self.crc_errors += 1
+            elif kind == "payload":
+                self.payload_errors += 1
+            else:
+                self.telegram_id_errors += 1
+
+    def collect(self):
+        """Counters in metrics collector form (see metrics.MetricsRegistry)"""
+        with self._lock:
+            per_type = {telegram_type: histograms["total"].count
+                        for telegram_type, histograms in self._histograms.items()}
+            errors = {"crc": self.crc_errors, "payload": self.payload_errors,
+                      "telegram_id": self.telegram_id_errors}
+        return [
+            ("canmux_telegrams_total", "counter", "Telegrams processed on port 3363",
+             [({"type": telegram_type}, count) for telegram_type, count in sorted(per_type.items())]),
+            ("canmux_telegram_errors_total", "counter", "Telegrams answered with an error response",
+             [({"kind": kind}, count) for kind, count in errors.items()]),
+        ]
+
+    def snapshot(self):
+        """JSON-serializable view of all counters and histograms"""
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-9)
+            return {
+                "since": self.started_at,
+                "telegrams": self.telegrams,
+                "telegrams_per_s": round(self.telegrams / elapsed, 2),
+                "crc_errors": self.crc_errors,
+                "payload_errors": self.payload_errors,
+                "telegram_id_errors": self.telegram_id_errors,
+                "bucket_bounds_us": list(BUCKET_BOUNDS_US),
+                "types": {
+                    telegram_type: {stage: histogram.snapshot()
+                                    for stage, histogram in histograms.items() if histogram.count}
+                    for telegram_type, histograms in self._histograms.items()
+                }
+            }
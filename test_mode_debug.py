@@ -35,13 +35,13 @@ def debug_server_loop(self):
                 debug_print(f"❌ Server error: {e}")
                 time.sleep(1)
 
-def debug_process_byte(self, byte_val, client_socket):
-    if self.index == 0:
+def debug_process_byte(self, byte_val, client_socket, state):
+    if state.index == 0:
         debug_print(f"📡 New telegram: 0x{byte_val:02X}")
         
-    original_process_byte(self, byte_val, client_socket)
+    original_process_byte(self, byte_val, client_socket, state)
     
-    if self.index == 0:  # After processing (reset happened)
+    if state.index == 0:  # After processing (reset happened)
         debug_print(f"✅ Telegram processed and sent back")
 
 # Apply patches
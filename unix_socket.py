@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unix Socket - local listeners for the telegram and configuration servers
+Controllers running on the mux Pi itself can connect through a socket file
+instead of TCP over loopback: same protocols, no network port, access limited
+by the file permissions (--unix-mode / --unix-group in main.py).
+
+Clients pass the socket path where they would pass the host:
+
+    python3 telegram_bench.py /run/canmux/telegram.sock
+    ConfigClient("/run/canmux/config.sock")
+"""
+
+import errno
+import os
+import socket
+import stat
+
+# grp only exists on Unix - the GUI imports this module on Windows too
+try:
+    import grp
+except ImportError:
+    grp = None
+
+# Socket files used when main.py gets --unix-telegram / --unix-config without a path
+DEFAULT_TELEGRAM_PATH = "/run/canmux/telegram.sock"
+DEFAULT_CONFIG_PATH = "/run/canmux/config.sock"
+# Owner and group may connect
+DEFAULT_MODE = 0o660
+
+def is_unix_path(address):
+    """True if a client address is a socket file path rather than a host"""
+    return isinstance(address, str) and address.startswith("/")
+
+def group_id(group):
+    """Group name or number -> gid"""
+    if isinstance(group, int) or str(group).isdigit():
+        return int(group)
+    if grp is None:
+        raise ValueError("Group names are not supported on this platform")
+    try:
+        return grp.getgrnam(group).gr_gid
+    except KeyError:
+        raise ValueError(f"Unknown group '{group}'")
+
+def _remove_stale(path):
+    """Remove a socket file left behind by a crashed daemon, refuse anything else"""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(errno.EEXIST, f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        # Nobody listening - safe to take over
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, f"{path} is in use by another process")
+
+def create_unix_listener(path, mode=DEFAULT_MODE, group=None, backlog=5):
+    """Create, bind and listen a Unix stream socket at path (directory created if missing)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _remove_stale(path)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    bound = False
+    try:
+        listener.bind(path)
+        bound = True
+        # Permissions are set before listen() - nobody can connect in between
+        os.chmod(path, mode)
+        if group is not None:
+            os.chown(path, -1, group_id(group))
+        listener.listen(backlog)
+    except Exception:
+        listener.close()
+        if bound:
+            os.unlink(path)
+        raise
+    return listener
+
+def close_unix_listener(listener, path):
+    """Close the listener (waking up accept()) and remove its socket file"""
+    try:
+        listener.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    listener.close()
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def connect(address, port, timeout=5.0):
+    """Client connection to host:port over TCP, or to a socket file (port ignored)"""
+    if not is_unix_path(address):
+        sock = socket.create_connection((address, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock